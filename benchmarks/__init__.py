@@ -0,0 +1,4 @@
+"""End-to-end benchmarks of camomilla's public and editor endpoints.
+
+Run them with ``python -m benchmarks``, see ``benchmarks/README.md``.
+"""
@@ -0,0 +1,97 @@
+"""Deterministic datasets of a given size.
+
+``seed(size)`` builds ``size`` published pages in a tree, half as many
+articles, a tenth as many media rows, a main menu, a renamed page (so a
+redirect exists) and a superuser for the editor endpoints.
+"""
+
+from datetime import timedelta
+from random import Random
+from typing import List, NamedTuple
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.translation import activate
+
+from camomilla.models import Article, Media, Menu, Page, Tag, UrlRedirect
+from camomilla.types import LinkTypes
+
+PASSWORD = "benchmarks"
+MENU_NODES = 50
+
+
+class Dataset(NamedTuple):
+    size: int
+    user: User
+    # A page deep in the tree, and one of its old permalinks.
+    page: Page
+    redirect_from: str
+    pages: List[Page]
+
+
+def _pages(size: int, rng: Random) -> List[Page]:
+    published_at = timezone.now() - timedelta(days=1)
+    pages = []
+    for index in range(size):
+        # A twentieth of the pages are roots, the others hang under an earlier page.
+        parent = rng.choice(pages) if pages and index % 20 else None
+        pages.append(
+            Page.objects.create(
+                title_en=f"page {index}",
+                title_it=f"pagina {index}",
+                template="website/pages/default.html",
+                parent_page=parent,
+                published_at=published_at,
+            )
+        )
+    return pages
+
+
+def _link(page: Page) -> dict:
+    return {"link_type": LinkTypes.relational, "url_node": page.url_node_id}
+
+
+def _menu(pages: List[Page]) -> None:
+    nodes = [
+        {
+            "title": page.title,
+            "link": _link(page),
+            "nodes": [
+                {"title": child.title, "link": _link(child)}
+                for child in pages[slice(index + 1, index + 3)]
+            ],
+        }
+        for index, page in enumerate(pages[:MENU_NODES])
+    ]
+    Menu.objects.update_or_create(key="main", defaults={"nodes": nodes})
+
+
+def seed(size: int) -> Dataset:
+    activate("en")
+    rng = Random(size)
+    user = User.objects.create_superuser("benchmarks", "bench@example.com", PASSWORD)
+    pages = _pages(size, rng)
+    tags = [Tag.objects.create(name=f"tag {index}") for index in range(10)]
+    for index in range(size // 2):
+        article = Article.objects.create(
+            title_en=f"article {index}",
+            author=user,
+            published_at=pages[0].published_at,
+        )
+        article.tags.set(rng.sample(tags, 3))
+    Media.objects.bulk_create(
+        Media(title=f"media {index}", file=f"benchmarks/media-{index}.txt")
+        for index in range(max(size // 10, 1))
+    )
+    for index, page in enumerate(pages[:20]):
+        page.contents.create(identifier=f"content {index}", content="<p>text</p>")
+    _menu(pages)
+    renamed = pages[1]
+    old_permalink = renamed.permalink
+    renamed.title_en = "renamed page"
+    renamed.save()
+    assert UrlRedirect.objects.filter(from_url=old_permalink).exists()
+    page = max(pages, key=lambda page: page.permalink.count("/"))
+    # Renaming moved the permalinks of the subtree.
+    page.refresh_from_db()
+    return Dataset(size, user, page, old_permalink, pages)
@@ -0,0 +1,180 @@
+"""Benchmark runner.
+
+Builds a fresh dataset for every size, times every scenario on it and
+prints one line per scenario. ``--output`` writes the results as JSON,
+``--compare`` prints the change between two such files.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from time import perf_counter
+from typing import List
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+DEFAULT_SIZES = "100,1000"
+
+
+def _setup_database() -> None:
+    from django.conf import settings
+    from django.core.management import call_command
+
+    for module in settings.MIGRATION_MODULES.values():
+        if not os.path.exists(module):
+            os.makedirs(module)
+            open(os.path.join(module, "__init__.py"), "w").close()
+    call_command("makemigrations", interactive=False, verbosity=0)
+    call_command("migrate", interactive=False, verbosity=0)
+
+
+def _reset_database() -> None:
+    from django.core.management import call_command
+
+    from camomilla.testing import reset_caches
+
+    call_command("flush", interactive=False, verbosity=0)
+    reset_caches()
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def measure(scenario, size: int, iterations: int, warmup: int) -> dict:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from camomilla.testing import Measurement
+
+    iterations = max(int(iterations * scenario.weight), 1)
+    timings, queries = [], 0
+    for iteration in range(warmup + iterations):
+        if scenario.setup is not None:
+            scenario.setup()
+        with CaptureQueriesContext(connection) as captured:
+            started = perf_counter()
+            response = scenario.run()
+            elapsed = perf_counter() - started
+        status_code = getattr(response, "status_code", 200)
+        if status_code >= 400:
+            raise RuntimeError(f"{scenario.name} answered {status_code}")
+        if iteration >= warmup:
+            timings.append(elapsed)
+            queries = max(queries, len(captured))
+    measurement = Measurement(size, queries, tuple(timings))
+    return {
+        "scenario": scenario.name,
+        **measurement.as_dict(),
+        "p99": round(measurement.percentile(99), 3),
+        "mean": round(sum(timings) / len(timings) * 1000, 3),
+        "ops": round(len(timings) / sum(timings), 2),
+        "iterations": len(timings),
+    }
+
+
+def run(sizes: List[int], iterations: int, warmup: int, only: List[str]) -> dict:
+    django.setup()
+    from django.db import connection
+
+    from benchmarks.dataset import seed
+    from benchmarks.scenarios import scenarios
+
+    _setup_database()
+    results = []
+    for size in sizes:
+        _reset_database()
+        started = perf_counter()
+        dataset = seed(size)
+        print(
+            f"size {size}: seeded in {perf_counter() - started:.1f}s", file=sys.stderr
+        )
+        for scenario in scenarios(dataset):
+            if only and not any(scenario.name.startswith(name) for name in only):
+                continue
+            result = measure(scenario, size, iterations, warmup)
+            results.append(result)
+            print(
+                "{scenario:<24} size={size:<6} p50={p50:>9.3f}ms p90={p90:>9.3f}ms "
+                "p99={p99:>9.3f}ms {ops:>9.2f} ops/s {queries:>4} queries".format(
+                    **result
+                ),
+                file=sys.stderr,
+            )
+    return {
+        "meta": {
+            "commit": _commit(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "iterations": iterations,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    baseline = {(r["scenario"], r["size"]): r for r in before["results"]}
+    print(
+        f"{before['meta']['commit'] or before_path} -> {after['meta']['commit'] or after_path}"
+    )
+    for result in after["results"]:
+        previous = baseline.get((result["scenario"], result["size"]))
+        if previous is None:
+            continue
+        change = (result["p50"] - previous["p50"]) / previous["p50"] * 100
+        print(
+            f"{result['scenario']:<24} size={result['size']:<6} "
+            f"p50 {previous['p50']:>9.3f} -> {result['p50']:>9.3f}ms ({change:+.1f}%) "
+            f"queries {previous['queries']} -> {result['queries']}"
+        )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument(
+        "--sizes", default=DEFAULT_SIZES, help="Comma separated page counts to seed."
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--only", default="", help="Comma separated scenario name prefixes to run."
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BEFORE", "AFTER"),
+        help="Compare two result files.",
+    )
+    args = parser.parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+    report = run(
+        [int(size) for size in args.sizes.split(",")],
+        args.iterations,
+        args.warmup,
+        [name for name in args.only.split(",") if name],
+    )
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
@@ -0,0 +1,100 @@
+"""What gets measured.
+
+A scenario is a request (``run``) timed over a number of iterations, with
+an optional untimed ``setup`` before each of them. Add one by appending a
+``Scenario`` to the list :func:`scenarios` returns.
+"""
+
+import json
+from io import BytesIO
+from itertools import count
+from typing import Callable, List, NamedTuple, Optional
+
+from django.core.cache import caches
+from django.test import Client
+from PIL import Image
+from rest_framework.test import APIClient
+
+from camomilla.models import Draft
+from benchmarks.dataset import PASSWORD, Dataset
+
+
+class Scenario(NamedTuple):
+    name: str
+    run: Callable
+    setup: Optional[Callable] = None
+    # Share of the run's iterations, for the expensive scenarios.
+    weight: float = 1.0
+
+
+def clear_caches() -> None:
+    """Drop cached payloads and pages, keep the route table."""
+    for cache in caches.all():
+        cache.clear()
+
+
+def _image() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (1600, 1000), (180, 120, 60)).save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def scenarios(dataset: Dataset) -> List[Scenario]:
+    public = Client()
+    api = APIClient()
+    token = api.post(
+        "/api/camomilla/token-auth/",
+        {"username": dataset.user.username, "password": PASSWORD},
+    ).json()["token"]
+    api.credentials(HTTP_AUTHORIZATION="Token " + token)
+    router = "/api/camomilla/pages-router" + dataset.page.permalink + "/"
+    image = _image()
+    uploads = count()
+    publish_targets = iter(dataset.pages * 10)
+
+    def stage_draft():
+        page = next(publish_targets)
+        Draft.objects.create(
+            content_object=page,
+            language="en",
+            serialized={"translations": {"en": {"title": f"{page.title} *"}}},
+        )
+        stage_draft.page = page
+
+    def upload():
+        file = BytesIO(image)
+        file.name = f"benchmark-{next(uploads)}.jpg"
+        return api.post(
+            "/api/camomilla/media/",
+            {"file": file, "data": json.dumps({"title": file.name})},
+            format="multipart",
+        )
+
+    return [
+        Scenario("pages_router.hit", lambda: public.get(router)),
+        Scenario("pages_router.miss", lambda: public.get(router), clear_caches),
+        Scenario(
+            "pages_router.redirect",
+            lambda: public.get("/api/camomilla/pages-router" + dataset.redirect_from),
+            clear_caches,
+        ),
+        Scenario(
+            "fetch", lambda: public.get(dataset.page.permalink + "/"), clear_caches
+        ),
+        Scenario(
+            "menus_router",
+            lambda: public.get("/api/camomilla/menus-router/main"),
+            clear_caches,
+        ),
+        Scenario(
+            "pages.list", lambda: api.get("/api/camomilla/pages/?items=30&page=2")
+        ),
+        Scenario(
+            "articles.list", lambda: api.get("/api/camomilla/articles/?items=30&page=2")
+        ),
+        Scenario(
+            "media.list", lambda: api.get("/api/camomilla/media/?items=30&page=2")
+        ),
+        Scenario("draft.publish", lambda: stage_draft.page.publish(), stage_draft),
+        Scenario("media.upload", upload, weight=0.2),
+    ]
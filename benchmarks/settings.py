@@ -0,0 +1,28 @@
+"""The example project, tuned for benchmarks: no debug, no toolbar, scratch media and database.
+
+The database follows the ``CAMOMILLA_TEST_DB_*`` variables of the example
+settings, so ``CAMOMILLA_TEST_DB_BACKEND=postgres`` benchmarks postgres.
+SQLite runs on a scratch file.
+"""
+
+import os
+import tempfile
+
+from example.camomilla_example.settings import *  # noqa: F401,F403
+from example.camomilla_example.settings import DATABASES, INSTALLED_APPS, MIDDLEWARE
+
+SCRATCH_DIR = os.environ.get(
+    "CAMOMILLA_BENCHMARK_DIR",
+    os.path.join(tempfile.gettempdir(), "camomilla-benchmarks"),
+)
+os.makedirs(SCRATCH_DIR, exist_ok=True)
+
+DEBUG = False
+ENABLE_DEBUG_TOOLBAR = False
+ALLOWED_HOSTS = ["testserver", "localhost"]
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+MIDDLEWARE = [m for m in MIDDLEWARE if not m.startswith("debug_toolbar.")]
+MEDIA_ROOT = os.path.join(SCRATCH_DIR, "media")
+
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    DATABASES["default"]["NAME"] = os.path.join(SCRATCH_DIR, "benchmarks.sqlite3")
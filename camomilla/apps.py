@@ -19,3 +19,21 @@ class CamomillaConfig(AppConfig):
         from camomilla.preview import auto_register_page_models
 
         auto_register_page_models()
+        # Connects the route table invalidation receivers.
+        import camomilla.routing  # noqa: F401
+
+        # Connects the due drafts, page tree, html cache and sitemap receivers.
+        import camomilla.due_drafts  # noqa: F401
+        import camomilla.html_cache  # noqa: F401
+        import camomilla.sitemap  # noqa: F401
+        import camomilla.tree  # noqa: F401
+        from camomilla.tagged_cache import track_camomilla_models
+
+        track_camomilla_models()
+
+        # Plans the queryset optimizations of the core API serializers.
+        from camomilla.serializers.mixins.optimize import (
+            warm_optimization_plans_on_first_request,
+        )
+
+        warm_optimization_plans_on_first_request()
@@ -0,0 +1,99 @@
+"""Conditional GET validators checked before a public page is built.
+
+Cached ``pages-router`` payloads and cached html pages answer conditional
+requests from the cache. Everything else (cache misses, staff requests,
+``ROUTER_CACHE = None``, the html route with ``HTML_CACHE.ENABLE`` off)
+would have to run ``RouteSerializer`` or the template before it could
+compare the body. :func:`page_validators` instead derives a strong
+``ETag`` from stamps that are at hand once the route is resolved (the
+page itself comes with the url node, in one query):
+
+* the page's and its url node's ``date_updated_at``;
+* the tag versions (see :mod:`camomilla.tagged_cache`) of the page, of
+  its url node and of the rows the page points to (media, parent page):
+  content blocks, drafts and child pages bump the tag of their page;
+* the ``pages-html`` counter, bumped by site-wide rows such as menus and
+  by :func:`camomilla.html_cache.invalidate_page_html`;
+* the lifecycle generation, the active language and the full path.
+
+``Last-Modified`` is when this server first handed out the ``ETag``.
+
+Rows reached through many-to-many relations, or more than one relation
+away, aren't part of the stamps: code whose pages render them should call
+:func:`~camomilla.html_cache.invalidate_page_html` when they change.
+
+The counters must be shared by every process for the stamps to move
+everywhere at once, so the validators follow the same gate as the routing
+indexes (:func:`camomilla.routing.base.indexes_enabled`).
+"""
+
+import hashlib
+import time
+from typing import Optional, Tuple
+
+from django.http import HttpRequest
+from django.utils.translation import get_language
+
+from camomilla.html_cache import (
+    PAGE_HTML_NAMESPACE,
+    lifecycle_generation,
+    page_html_cache,
+)
+from camomilla.models.page import AbstractPage, UrlNode
+from camomilla.routing.base import indexes_enabled
+from camomilla.tagged_cache import changed_tags, model_tags, tagged_cache
+from camomilla.utils.cache import get_cache, get_version
+
+FIRST_SEEN_KEY = "camomilla:validators:first-seen:%s"
+FIRST_SEEN_TIMEOUT = 60 * 60 * 24
+
+# ``(etag, last_modified)``, as taken by
+# :func:`camomilla.utils.http.conditional_response`.
+Validators = Tuple[str, float]
+
+
+def _first_seen(etag: str) -> float:
+    cache = get_cache()
+    key = FIRST_SEEN_KEY % etag
+    moment = cache.get(key)
+    if moment is None:
+        cache.add(key, time.time(), FIRST_SEEN_TIMEOUT)
+        moment = cache.get(key) or time.time()
+    return moment
+
+
+def page_validators(
+    request: HttpRequest, page: AbstractPage, name: str
+) -> Optional[Validators]:
+    """Validators of the ``name`` representation of ``page`` for ``request``.
+
+    ``None`` when they can't be trusted: the counters aren't shared, or
+    this thread changed rows whose stamps only move once it commits.
+    """
+    if (
+        not indexes_enabled()
+        or tagged_cache.in_uncommitted_change()
+        or page_html_cache.in_uncommitted_change()
+    ):
+        return None
+    tags = changed_tags(page) | model_tags(UrlNode, page.url_node_id)
+    lifecycle, _ = lifecycle_generation()
+    generation = get_version(PAGE_HTML_NAMESPACE)
+    versions = tagged_cache.versions(tags)
+    if lifecycle is None or generation is None or None in versions.values():
+        return None
+    node = page.url_node
+    stamps = (
+        name,
+        request.get_full_path(),
+        get_language(),
+        lifecycle,
+        generation,
+        page._meta.label_lower,
+        page.pk,
+        page.date_updated_at and page.date_updated_at.isoformat(),
+        node and node.date_updated_at and node.date_updated_at.isoformat(),
+        list(versions.items()),
+    )
+    etag = hashlib.sha1(repr(stamps).encode("utf-8")).hexdigest()
+    return etag, _first_seen(etag)
@@ -0,0 +1,84 @@
+"""Shared watermark of the earliest scheduled Draft.
+
+Every public read calls :meth:`AbstractPage.publish_if_due`, which used to
+ask the database whether the page has a due Draft, although scheduled
+drafts are rare. :class:`DueDraftWatermark` keeps the earliest
+``Draft.scheduled_for`` in the shared cache (see
+:mod:`camomilla.utils.cache`): until that moment has passed no draft can
+be due anywhere, and ``publish_if_due`` returns without a query.
+
+The watermark embeds the ``drafts`` counter, bumped once a transaction
+that saved or deleted a Draft commits; the next reader recomputes it with
+one aggregate query. The thread that changed drafts asks the database
+until its transaction ends.
+
+Drafts that can't be published don't count: those whose page is gone
+(deleting a page deletes its drafts; older orphans are filtered out) and
+those marked failed (``Draft.failed_at``), which only
+``camomilla_publish_scheduled`` retries. Otherwise a single stuck draft
+would keep the watermark in the past, and every read asking the database.
+
+Writes that bypass model signals (``QuerySet.update`` on ``scheduled_for``)
+must call :meth:`DueDraftWatermark.track_change` themselves.
+"""
+
+from typing import Optional
+
+from django.db.models import Min
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from camomilla.models.draft import Draft
+from camomilla.routing.base import TransactionAwareIndex
+from camomilla.utils.cache import bump_version, get_cache, get_version
+
+DRAFTS_NAMESPACE = "drafts"
+NEXT_DUE_KEY = "camomilla:drafts:next-due:%s"
+# Stored when no draft is scheduled.
+NOTHING_SCHEDULED = 0
+
+
+class DueDraftWatermark(TransactionAwareIndex):
+    def next_due(self) -> Optional[float]:
+        """Earliest ``scheduled_for`` of any publishable draft (epoch
+        seconds), if any.
+
+        Drafts already due count too: they stay until a read publishes them.
+        """
+        cache = get_cache()
+        key = NEXT_DUE_KEY % get_version(DRAFTS_NAMESPACE)
+        moment = cache.get(key)
+        if moment is None:
+            earliest = (
+                Draft.objects.scheduled()
+                .retryable()
+                .live()
+                .aggregate(moment=Min("scheduled_for"))["moment"]
+            )
+            moment = earliest.timestamp() if earliest else NOTHING_SCHEDULED
+            if not self.in_uncommitted_change():
+                cache.set(key, moment, None)
+        return None if moment == NOTHING_SCHEDULED else moment
+
+    def may_be_due(self) -> bool:
+        """``False`` when no draft can be due yet, whatever the page."""
+        if self.in_uncommitted_change():
+            return True
+        moment = self.next_due()
+        return moment is not None and moment <= timezone.now().timestamp()
+
+    def track_change(self) -> None:
+        """Have readers recompute the watermark once the transaction commits."""
+        self._track_uncommitted(
+            DRAFTS_NAMESPACE, lambda: bump_version(DRAFTS_NAMESPACE)
+        )
+
+
+due_drafts = DueDraftWatermark()
+
+
+@receiver(post_save, sender=Draft)
+@receiver(post_delete, sender=Draft)
+def draft_changed(sender, instance, **kwargs):
+    due_drafts.track_change()
@@ -4,7 +4,12 @@ from django.urls import path
 
 from camomilla import settings
 from django.conf import settings as django_settings
+from .conditional import page_validators
+from .html_cache import page_html_cache
+from .instrumentation import span
 from .models import Page, UrlRedirect
+from .tagged_cache import tagged_cache
+from .utils.http import not_modified
 
 
 def fetch(request, *args, **kwargs):
@@ -19,6 +24,12 @@ def fetch(request, *args, **kwargs):
     triggers ``publish()`` and renders the freshly-applied content.
     Subsequent visitors see a normal public read. The cron command is the
     safety net for pages that no one ever visits.
+
+    With ``CAMOMILLA.RENDER.HTML_CACHE.ENABLE`` anonymous renders are served
+    from :mod:`camomilla.html_cache` until a page changes or the next
+    lifecycle transition is due. Either way anonymous conditional requests
+    matching the page's validators (see :mod:`camomilla.conditional`) get a
+    ``304`` before the context is built and the template rendered.
     """
     append_slash = getattr(django_settings, "APPEND_SLASH", True)
     redirect_obj = UrlRedirect.find_redirect(request)
@@ -27,30 +38,46 @@ def fetch(request, *args, **kwargs):
     if append_slash and not request.path.endswith("/"):
         q_string = request.META.get("QUERY_STRING", "")
         return redirect(request.path + "/" + ("?" + q_string if q_string else ""))
-    if "permalink" in kwargs:
-        # ``get_or_404`` filters through ``Page.get``, which raises when
-        # ``is_public`` is False — trashed, draft, and scheduled rows 404 here.
-        page = Page.get_or_404(request, bypass_type_check=True)
-    elif settings.AUTO_CREATE_HOMEPAGE is False:
-        page = Page.get_or_404(request, permalink="/", bypass_type_check=True)
-    else:
-        # Auto-created homepages are stamped as public on creation, but an
-        # existing homepage that was later trashed (or whose ``published_at``
-        # was cleared) must NOT be served. The ``is_public`` check below
-        # enforces that — and runs after ``publish_if_due()`` so a Draft-based
-        # first-publish can still promote the homepage on the way in.
-        page, _ = Page.get_or_create_homepage()
-
-    # First visitor whose active language has a due Draft wins the publish;
-    # everyone else gets a regular read. Safe under concurrent traffic
-    # and no-op when no Draft is due.
-    page.publish_if_due()
-
-    if not page.is_public:
-        raise Http404("Page is not public")
-
-    context = page.get_context(request)
-    return render(request, page.get_template_path(request), context)
+    cached = page_html_cache.get(request)
+    if cached is not None:
+        return cached
+    # Every row loaded from here on tags the cached response.
+    with tagged_cache.collect() as tags:
+        with span("route"):
+            if "permalink" in kwargs:
+                # ``get_or_404`` filters through ``Page.get``, which raises when
+                # ``is_public`` is False — trashed, draft, and scheduled rows 404 here.
+                page = Page.get_or_404(request, bypass_type_check=True)
+            elif settings.AUTO_CREATE_HOMEPAGE is False:
+                page = Page.get_or_404(request, permalink="/", bypass_type_check=True)
+            else:
+                # Auto-created homepages are stamped as public on creation, but an
+                # existing homepage that was later trashed (or whose ``published_at``
+                # was cleared) must NOT be served. The ``is_public`` check below
+                # enforces that — and runs after ``publish_if_due()`` so a Draft-based
+                # first-publish can still promote the homepage on the way in.
+                page, _ = Page.get_or_create_homepage()
+
+        # First visitor whose active language has a due Draft wins the publish;
+        # everyone else gets a regular read. Safe under concurrent traffic
+        # and no-op when no Draft is due.
+        page.publish_if_due()
+
+        if not page.is_public:
+            raise Http404("Page is not public")
+
+        validators = None
+        if page_html_cache.shared(request):
+            validators = page_validators(request, page, "pages-html")
+        if validators is not None:
+            unchanged = not_modified(request, *validators)
+            if unchanged is not None:
+                return unchanged
+
+        context = page.get_context(request)
+        with span("template"):
+            response = render(request, page.get_template_path(request), context)
+    return page_html_cache.set(request, response, tags, validators)
 
 
 urlpatterns = [
@@ -0,0 +1,240 @@
+"""Rendered HTML cache for the public page route.
+
+``camomilla.dynamic_pages_urls.fetch`` renders the page template, runs the
+context registry and checks for due drafts on every request. With
+``CAMOMILLA.RENDER.HTML_CACHE.ENABLE`` the rendered response of anonymous
+``GET`` requests is stored in the shared cache under the page's path and
+language, so a hit costs no query and no template rendering.
+
+Entries are stored in the tagged cache (see :mod:`camomilla.tagged_cache`)
+with the tags of every row loaded while the page was resolved and
+rendered: saving its page, url node, content blocks, media or child pages
+drops that page only. Site-wide rows, menus, move the ``pages-html``
+counter (see :mod:`camomilla.utils.cache`) embedded in every key instead,
+which drops every entry. Other models rendered by your templates can be
+tracked with :func:`camomilla.tagged_cache.track_model`, or call
+:func:`invalidate_page_html` when they change.
+
+The cache is also lifecycle-aware (:func:`lifecycle_generation`): keys
+embed the ``pages-lifecycle`` counter, which remembers the next moment a
+page becomes public (a future ``published_at``) or a scheduled draft is
+due. Entry timeouts are capped at it, and the counter moves on once it
+passes: the first request after that renders again, which is also when
+``publish_if_due`` applies the due draft.
+
+Rendered ``GET`` responses carry a strong ``ETag`` and a
+``Last-Modified`` whether the cache is enabled or not: a matching
+conditional request gets a ``304 Not Modified``. ``fetch`` computes them
+before rendering from the page's stamps (see :mod:`camomilla.conditional`)
+and skips the template on a match; when the stamps can't be trusted the
+``ETag`` is a digest of the rendered content, and only cached responses
+carry a ``Last-Modified`` (when they were rendered).
+
+Responses that set cookies (``{% csrf_token %}``, sessions) and requests
+with a query string or an authenticated user are never cached.
+"""
+
+import hashlib
+import time
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import Min, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.translation import get_language
+
+from camomilla import settings
+from camomilla.models import Menu, UrlNode
+from camomilla.models.draft import Draft
+from camomilla.models.page import AbstractPage
+from camomilla.routing.base import TransactionAwareIndex
+from camomilla.tagged_cache import tagged_cache
+from camomilla.utils import localized_fieldname
+from camomilla.utils.cache import bump_version, get_cache, get_version
+from camomilla.utils.http import conditional_response
+
+PAGE_HTML_NAMESPACE = "pages-html"
+PAGE_HTML_KEY = "pages-html:%s:%s:%s:%s"
+# Rows rendered by every page: changing one drops every entry.
+SITE_WIDE_MODELS = (Menu,)
+LIFECYCLE_NAMESPACE = "pages-lifecycle"
+NEXT_TRANSITION_KEY = "camomilla:pages-lifecycle:next:%s"
+# Stored when no transition is scheduled.
+NO_TRANSITION = 0
+
+
+def next_lifecycle_transition(now: Optional[datetime] = None) -> Optional[datetime]:
+    """Earliest future ``published_at`` or ``Draft.scheduled_for``, if any.
+
+    Two queries: the url nodes (which mirror their page's ``published_at``)
+    and the drafts.
+    """
+    now = now or timezone.now()
+    languages = settings.LANGUAGE_CODES if settings.ENABLE_TRANSLATIONS else [None]
+    columns = {localized_fieldname("published_at", lang, UrlNode) for lang in languages}
+    moments = UrlNode._base_manager.filter(deleted_at__isnull=True).aggregate(
+        **{
+            column: Min(column, filter=Q(**{f"{column}__gt": now}))
+            for column in columns
+        }
+    )
+    moments["draft"] = Draft.objects.filter(scheduled_for__gt=now).aggregate(
+        moment=Min("scheduled_for")
+    )["moment"]
+    return min((moment for moment in moments.values() if moment), default=None)
+
+
+def lifecycle_generation() -> Tuple[int, Optional[float]]:
+    """Current ``pages-lifecycle`` counter and when it expires (or ``None``).
+
+    The expiry, the next lifecycle transition, is computed by the first
+    reader of a generation and shared through the cache; once it's past,
+    the counter moves on. Caches of public page state embed the counter
+    in their keys and cap their timeouts at the expiry.
+    """
+    cache = get_cache()
+    while True:
+        generation = get_version(LIFECYCLE_NAMESPACE)
+        moment = cache.get(NEXT_TRANSITION_KEY % generation)
+        if moment is None:
+            transition = next_lifecycle_transition()
+            moment = transition.timestamp() if transition else NO_TRANSITION
+            cache.set(NEXT_TRANSITION_KEY % generation, moment, None)
+        if moment == NO_TRANSITION:
+            return generation, None
+        if moment > timezone.now().timestamp():
+            return generation, moment
+        bump_version(LIFECYCLE_NAMESPACE)
+
+
+def forget_next_lifecycle_transition() -> None:
+    """Have the next reader recompute the transition (a page or draft changed).
+
+    The counter itself doesn't move: entries stay valid until the
+    (possibly earlier) transition is due.
+    """
+    get_cache().delete(NEXT_TRANSITION_KEY % get_version(LIFECYCLE_NAMESPACE))
+
+
+def lifecycle_timeout(timeout: int, moment: Optional[float]) -> int:
+    """``timeout`` capped at the ``moment`` returned by :func:`lifecycle_generation`."""
+    if moment is None:
+        return timeout
+    return max(1, min(timeout, int(moment - timezone.now().timestamp()) + 1))
+
+
+class PageHtmlCache(TransactionAwareIndex):
+    @staticmethod
+    def shared(request: HttpRequest) -> bool:
+        """Whether every visitor gets the same page for ``request``: an
+        anonymous ``GET`` without query string."""
+        user = getattr(request, "user", None)
+        return bool(
+            request.method in ("GET", "HEAD")
+            and not request.META.get("QUERY_STRING")
+            and not (user and user.is_authenticated)
+        )
+
+    def enabled(self, request: HttpRequest) -> bool:
+        return bool(
+            settings.HTML_CACHE_ENABLE
+            and self.shared(request)
+            and not self.in_uncommitted_change()
+        )
+
+    @staticmethod
+    def _key(lifecycle: int, request: HttpRequest) -> str:
+        path = hashlib.sha1(request.path.encode("utf-8")).hexdigest()
+        generation = get_version(PAGE_HTML_NAMESPACE)
+        return PAGE_HTML_KEY % (generation, lifecycle, get_language(), path)
+
+    def get(self, request: HttpRequest) -> Optional[HttpResponse]:
+        """Cached response for ``request`` (or a ``304``), if any."""
+        if not self.enabled(request):
+            return None
+        lifecycle, _ = lifecycle_generation()
+        entry = tagged_cache.get_entry(self._key(lifecycle, request))
+        if entry is None:
+            return None
+        content, content_type = entry.value
+        return conditional_response(
+            request,
+            HttpResponse(content, content_type=content_type),
+            entry.etag,
+            entry.last_modified,
+        )
+
+    def set(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        tags: Iterable[str] = (),
+        validators: Optional[Tuple[str, float]] = None,
+    ) -> HttpResponse:
+        """Store ``response`` under ``tags``, until the next lifecycle
+        transition at most.
+
+        ``tags`` are those collected while the page was resolved and
+        rendered (:meth:`camomilla.tagged_cache.TaggedCache.collect`).
+        Returns the response to send: ``response`` stamped with its
+        validators, or a ``304`` when the client already holds it. The
+        validators are ``validators`` (``(etag, last_modified)``) when
+        given, else a digest of the content and the current time; they are
+        set even when the response can't be cached.
+        """
+        if (
+            request.method not in ("GET", "HEAD")
+            or response.status_code != 200
+            or response.streaming
+            or response.cookies
+            or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        ):
+            return response
+        if validators is None:
+            etag = hashlib.sha1(response.content).hexdigest()
+            if not self.enabled(request):
+                return conditional_response(request, response, etag)
+            validators = (etag, time.time())
+        if self.enabled(request):
+            lifecycle, moment = lifecycle_generation()
+            tagged_cache.set(
+                self._key(lifecycle, request),
+                (response.content, response["Content-Type"]),
+                tags,
+                lifecycle_timeout(settings.HTML_CACHE_TIMEOUT, moment),
+                validators=validators,
+            )
+        return conditional_response(request, response, *validators)
+
+    def track_change(self) -> None:
+        """Record that every rendered page may change once the transaction
+        commits (a site-wide row changed)."""
+        self._track_uncommitted(PAGE_HTML_NAMESPACE, invalidate_page_html)
+
+    def track_lifecycle_change(self) -> None:
+        """Record that the next lifecycle transition may move once the
+        transaction commits (a page, url node or draft changed).
+
+        The rendered pages themselves are dropped through their tags.
+        """
+        self._track_uncommitted(LIFECYCLE_NAMESPACE, forget_next_lifecycle_transition)
+
+
+page_html_cache = PageHtmlCache()
+
+
+def invalidate_page_html() -> None:
+    """Drop every cached page (moves the cache to a new generation)."""
+    bump_version(PAGE_HTML_NAMESPACE)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def page_html_changed(sender, instance, **kwargs):
+    if sender in (UrlNode, Draft) or issubclass(sender, AbstractPage):
+        page_html_cache.track_lifecycle_change()
+    elif issubclass(sender, SITE_WIDE_MODELS):
+        page_html_cache.track_change()
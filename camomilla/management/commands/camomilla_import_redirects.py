@@ -0,0 +1,92 @@
+"""Bulk-import legacy redirects from a CSV or NDJSON file.
+
+CSV files need a header row; NDJSON files hold one object per line. Both
+use the ``UrlRedirect`` field names::
+
+    from_url,to_url,language_code,permanent
+    /old-about,/about,en,1
+    /it/vecchio,/chi-siamo,,0
+
+``language_code`` and ``permanent`` are optional (see ``--language`` and
+``--temporary``). The whole file is imported in a single transaction by
+``UrlRedirect.objects.bulk_import``; unresolvable rows are reported and
+skipped::
+
+    python manage.py camomilla_import_redirects redirects.csv
+"""
+
+import csv
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from camomilla.models import UrlRedirect
+
+
+class Command(BaseCommand):
+    help = "Import redirects from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="File format. Guessed from the extension when omitted.",
+        )
+        parser.add_argument(
+            "--language",
+            help="Language of rows without a language_code or language prefix.",
+        )
+        parser.add_argument(
+            "--temporary",
+            action="store_true",
+            help="Import rows without a permanent column as temporary (302).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be imported, then roll back.",
+        )
+
+    def read_records(self, handle, file_format):
+        if file_format == "csv":
+            yield from csv.DictReader(handle)
+            return
+        for number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise CommandError(f"Line {number}: invalid JSON ({exc})")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options.get("format")
+        if not file_format:
+            extension = os.path.splitext(path)[1].lower()
+            file_format = "csv" if extension == ".csv" else "ndjson"
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+        with open(path, newline="", encoding="utf-8") as handle:
+            with transaction.atomic():
+                result = UrlRedirect.objects.bulk_import(
+                    self.read_records(handle, file_format),
+                    language_code=options.get("language"),
+                    permanent=not options.get("temporary", False),
+                    batch_size=options["batch_size"],
+                )
+                if options.get("dry_run"):
+                    transaction.set_rollback(True)
+        for index, reason in result.skipped:
+            self.stderr.write(f"Skipped record {index + 1}: {reason}")
+        prefix = "[dry-run] would import" if options.get("dry_run") else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix} {result.imported} redirects "
+                f"({len(result.skipped)} skipped)."
+            )
+        )
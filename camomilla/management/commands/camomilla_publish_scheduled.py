@@ -10,12 +10,30 @@ deletes the Draft.
 Intended to be run from cron/celery-beat/systemd-timer::
 
     python manage.py camomilla_publish_scheduled
+
+or as a long-running worker, which sleeps until the next ``scheduled_for``
+moment and claims due drafts with ``SELECT … FOR UPDATE SKIP LOCKED`` so
+several workers can run side by side::
+
+    python manage.py camomilla_publish_scheduled --daemon
+
+Drafts that fail to publish are marked failed: the daemon retries them
+after ``--retry-after`` seconds, a cron run on its next run. Saving the
+draft again clears the mark.
 """
 
+import time
+
 from django.core.management.base import BaseCommand
-from django.utils import translation
+from django.db import close_old_connections
+from django.utils import timezone, translation
 
-from camomilla.preview import resolve_scheduled_pages
+from camomilla.due_drafts import due_drafts
+from camomilla.preview import (
+    mark_scheduled_publish_failed,
+    publish_due_drafts,
+    resolve_scheduled_pages,
+)
 
 
 class Command(BaseCommand):
@@ -27,14 +45,46 @@ class Command(BaseCommand):
             action="store_true",
             help="List drafts that would be published without changing state.",
         )
+        parser.add_argument(
+            "--daemon",
+            action="store_true",
+            help="Keep running, publishing drafts as soon as they are due.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10,
+            help="Drafts claimed per transaction in daemon mode (default: 10).",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=30,
+            help=(
+                "Max seconds the daemon sleeps before looking for newly "
+                "scheduled drafts (default: 30)."
+            ),
+        )
+        parser.add_argument(
+            "--retry-after",
+            type=float,
+            default=300,
+            help=(
+                "Seconds the daemon waits before retrying a draft that "
+                "failed to publish (default: 300)."
+            ),
+        )
 
     def handle(self, *args, **options):
+        if options.get("daemon"):
+            return self.run_daemon(
+                options["batch_size"], options["poll"], options["retry_after"]
+            )
         dry_run = options.get("dry_run", False)
         count = 0
         for page, lang in resolve_scheduled_pages():
             count += 1
-            lang_label = f" [{lang}]" if lang else ""
-            label = f"{page._meta.label} pk={page.pk}{lang_label} -> {page}"
+            label = self.label(page, lang)
             if dry_run:
                 self.stdout.write(f"[dry-run] would publish {label}")
                 continue
@@ -45,6 +95,7 @@ class Command(BaseCommand):
                 page.publish(comment="Scheduled publish")
             except Exception as exc:  # noqa: BLE001
                 self.stderr.write(f"Failed to publish {label}: {exc}")
+                mark_scheduled_publish_failed(page, lang)
                 continue
             finally:
                 if original_language:
@@ -52,3 +103,48 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f"Published {label}"))
         if count == 0:
             self.stdout.write("No scheduled drafts to publish.")
+
+    @staticmethod
+    def label(page, lang) -> str:
+        lang_label = f" [{lang}]" if lang else ""
+        return f"{page._meta.label} pk={page.pk}{lang_label} -> {page}"
+
+    def run_daemon(self, batch_size: int, poll: float, retry_after: float) -> None:
+        self.stdout.write("Waiting for scheduled drafts (Ctrl-C to stop).")
+        try:
+            while True:
+                close_old_connections()
+                results = publish_due_drafts(batch_size, retry_after)
+                self.report(results)
+                # A full batch may leave due drafts behind, even when it
+                # failed: failed drafts aren't claimed again right away.
+                if len(results) < batch_size:
+                    time.sleep(self.seconds_to_next_due(poll))
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    def report(self, results) -> None:
+        for result in results:
+            label = self.label(result.page, result.language)
+            if result.error is not None:
+                self.stderr.write(f"Failed to publish {label}: {result.error}")
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Published {label} "
+                    f"(lag {result.lag:.2f}s, took {result.duration * 1000:.0f}ms)"
+                )
+            )
+
+    @staticmethod
+    def seconds_to_next_due(poll: float) -> float:
+        """Sleep until the next due draft, re-checking at least every ``poll``.
+
+        Drafts already due at this point are claimed by another worker:
+        wait a full ``poll`` before looking again. Failed drafts don't
+        count (see :mod:`camomilla.due_drafts`); they are retried by the
+        first pass after their back-off.
+        """
+        moment = due_drafts.next_due()
+        remaining = moment - timezone.now().timestamp() if moment else 0
+        return min(poll, remaining) if remaining > 0 else poll
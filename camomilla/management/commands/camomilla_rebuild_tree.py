@@ -0,0 +1,38 @@
+"""Backfill or verify the materialized page hierarchy on ``UrlNode``.
+
+``AbstractPage.save`` keeps each node's ``tree_path`` in sync with its
+page's parent. Run this once after upgrading, and after moving pages
+through ``QuerySet.update()`` or raw SQL::
+
+    python manage.py camomilla_rebuild_tree
+    python manage.py camomilla_rebuild_tree --verify
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from camomilla.tree import rebuild_tree_paths, stale_tree_paths
+
+
+class Command(BaseCommand):
+    help = "Recompute the tree_path of every UrlNode."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report stale tree paths; exit with an error if any.",
+        )
+
+    def handle(self, *args, **options):
+        if options.get("verify"):
+            stale = stale_tree_paths()
+            if stale:
+                preview = ", ".join(str(pk) for pk in stale[:20])
+                more = "..." if len(stale) > 20 else ""
+                raise CommandError(
+                    f"{len(stale)} url nodes with a stale tree path (pk {preview}{more})."
+                )
+            self.stdout.write(self.style.SUCCESS("Tree paths are up to date."))
+            return
+        updated = rebuild_tree_paths()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {updated} tree paths."))
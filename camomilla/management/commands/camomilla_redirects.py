@@ -0,0 +1,76 @@
+"""Redirect maintenance.
+
+Without options, collapses redirects whose ``from_url`` only differ by a
+trailing slash and flattens chains (``A → B → C`` into ``A → C``),
+reporting redirect loops. ``--prune`` also deletes redirects nobody hit
+within the retention window (``CAMOMILLA.ROUTER.REDIRECTS.RETENTION_DAYS``
+unless ``--retention-days`` is given).
+
+Intended to be run periodically from cron/celery-beat/systemd-timer::
+
+    python manage.py camomilla_redirects --prune
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from camomilla import settings
+from camomilla.models import UrlRedirect
+
+
+class Command(BaseCommand):
+    help = "Deduplicate, flatten and prune redirects."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--break-cycles",
+            action="store_true",
+            help="Delete the redirects that form a loop.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete redirects nobody hit within the retention window.",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.REDIRECTS_RETENTION_DAYS,
+            help="Retention window used by --prune.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change, then roll back.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options.get("dry_run", False)
+        prefix = "[dry-run] " if dry_run else ""
+        with transaction.atomic():
+            deduplicated = UrlRedirect.objects.deduplicate()
+            report = UrlRedirect.objects.flatten_chains(
+                break_cycles=options.get("break_cycles", False)
+            )
+            pruned = None
+            if options.get("prune"):
+                older_than = timezone.now() - timedelta(days=options["retention_days"])
+                pruned = UrlRedirect.objects.prune(older_than)
+            if dry_run:
+                transaction.set_rollback(True)
+
+        for language, loop in report.cycles:
+            lang_label = f"[{language}] " if language else ""
+            self.stderr.write(
+                f"Redirect loop: {lang_label}{' -> '.join(loop + loop[:1])}"
+            )
+        self.stdout.write(f"{prefix}Removed {deduplicated} duplicate redirects.")
+        self.stdout.write(f"{prefix}Flattened {report.flattened} redirect chains.")
+        if report.broken:
+            self.stdout.write(f"{prefix}Deleted {report.broken} looping redirects.")
+        if pruned is not None:
+            self.stdout.write(f"{prefix}Pruned {pruned} unused redirects.")
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Redirects are up to date."))
@@ -0,0 +1,107 @@
+"""Pre-generate the pages sitemap as static, gzipped files.
+
+Writes ``sitemap.xml`` (a sitemap index) and one ``sitemap-<n>.xml.gz``
+shard per ``CAMOMILLA.SITEMAP.SHARD_SIZE`` urls into ``--output``, ready
+to be served by the web server. A manifest remembers each shard's
+digest, so later runs only rewrite the shards whose pages changed::
+
+    python manage.py camomilla_sitemap --output /srv/sitemaps --base-url https://example.com
+    python manage.py camomilla_sitemap --output /srv/sitemaps --base-url https://example.com --force
+"""
+
+import gzip
+import json
+import os
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+
+from camomilla.sitemap import PagesSitemapGenerator, render_index
+
+MANIFEST_NAME = "sitemap-manifest.json"
+INDEX_NAME = "sitemap.xml"
+SHARD_NAME = "sitemap-%d.xml.gz"
+SHARD_PATTERN = re.compile(r"^sitemap-(\d+)\.xml\.gz$")
+
+
+def _write_atomic(path, chunks, compress=False):
+    tmp = f"{path}.tmp"
+    opener = (lambda p: gzip.GzipFile(p, "wb", mtime=0)) if compress else (lambda p: open(p, "wb"))
+    with opener(tmp) as handle:
+        for chunk in chunks:
+            handle.write(chunk.encode("utf-8"))
+    os.replace(tmp, path)
+
+
+class Command(BaseCommand):
+    help = "Write the pages sitemap as gzipped shards plus a sitemap index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", required=True, help="Target directory.")
+        parser.add_argument(
+            "--base-url",
+            required=True,
+            help="Scheme and host prepended to page urls (https://example.com).",
+        )
+        parser.add_argument(
+            "--location",
+            help="Public url of the output directory (default: the base url).",
+        )
+        parser.add_argument(
+            "--force", action="store_true", help="Rewrite every shard."
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        os.makedirs(output, exist_ok=True)
+        generator = PagesSitemapGenerator(base_url=options["base_url"])
+        location = (options.get("location") or generator.base_url).rstrip("/")
+
+        settings_key = [generator.base_url, generator.languages, generator.shard_size]
+        manifest = self._read_manifest(output)
+        previous = manifest.get("shards", {})
+        if options.get("force") or manifest.get("settings") != settings_key:
+            previous = {}
+
+        digests, index, written = {}, [], 0
+        for shard in generator.shards():
+            name = SHARD_NAME % shard.number
+            digests[str(shard.number)] = shard.digest
+            index.append((f"{location}/{name}", shard.lastmod))
+            path = os.path.join(output, name)
+            if previous.get(str(shard.number)) == shard.digest and os.path.exists(path):
+                continue
+            _write_atomic(
+                path, generator.render_shard(shard.after, shard.until), compress=True
+            )
+            written += 1
+
+        removed = 0
+        for filename in os.listdir(output):
+            match = SHARD_PATTERN.match(filename)
+            if match and match.group(1) not in digests:
+                os.remove(os.path.join(output, filename))
+                removed += 1
+
+        _write_atomic(os.path.join(output, INDEX_NAME), render_index(index))
+        _write_atomic(
+            os.path.join(output, MANIFEST_NAME),
+            [json.dumps({"settings": settings_key, "shards": digests})],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sitemap: {len(digests)} shards, {written} written, "
+                f"{len(digests) - written} unchanged, {removed} removed."
+            )
+        )
+
+    @staticmethod
+    def _read_manifest(output) -> dict:
+        path = os.path.join(output, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as handle:
+                return json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Unreadable sitemap manifest {path}: {exc}")
@@ -0,0 +1,39 @@
+"""Backfill or verify the visibility columns mirrored on ``UrlNode``.
+
+``AbstractPage.save`` keeps each node's ``published_at`` / ``indexable``
+(per language), ``deleted_at`` and ``date_updated_at`` in sync with its
+page. Run this once after upgrading, and after writing pages through
+``QuerySet.update()`` or raw SQL::
+
+    python manage.py camomilla_sync_url_nodes
+    python manage.py camomilla_sync_url_nodes --verify
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from camomilla.models import UrlNode
+
+
+class Command(BaseCommand):
+    help = "Copy page visibility columns onto their UrlNode."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report out of sync nodes; exit with an error if any.",
+        )
+
+    def handle(self, *args, **options):
+        if options.get("verify"):
+            stale = UrlNode.objects.out_of_sync()
+            if stale:
+                preview = ", ".join(str(pk) for pk in stale[:20])
+                more = "..." if len(stale) > 20 else ""
+                raise CommandError(
+                    f"{len(stale)} url nodes out of sync (pk {preview}{more})."
+                )
+            self.stdout.write(self.style.SUCCESS("Url nodes are in sync."))
+            return
+        updated = UrlNode.objects.sync_visibility()
+        self.stdout.write(self.style.SUCCESS(f"Synced {updated} url nodes."))
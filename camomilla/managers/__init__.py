@@ -1,3 +1,12 @@
-from .pages import PageQuerySet
+from .pages import PageQuerySet, UrlNodeQuerySet, prefetch_pages, tree_path_ids
+from .redirects import RedirectChainReport, RedirectImportResult, UrlRedirectQuerySet
 
-__all__ = ["PageQuerySet"]
+__all__ = [
+    "PageQuerySet",
+    "RedirectChainReport",
+    "RedirectImportResult",
+    "UrlNodeQuerySet",
+    "UrlRedirectQuerySet",
+    "prefetch_pages",
+    "tree_path_ids",
+]
@@ -17,31 +17,40 @@ This module exposes:
 * filter helpers: ``.public()``, ``.scheduled()``, ``.due_for_publish()``,
                   ``.trashed()``, ``.alive()``, ``.draft()``,
                   ``.first_publish_pending()``
+* bulk lifecycle: ``.bulk_publish()``, ``.bulk_schedule()``,
+                  ``.bulk_discard_drafts()``
+
+``UrlNode`` carries a denormalized copy of its page's visibility columns
+(``published_at`` / ``indexable`` per language, ``deleted_at``,
+``date_updated_at``), so ``UrlNode.objects.public()`` and the
+``is_public`` / ``status`` annotations read the node row alone.
 """
 
-from typing import Sequence, Tuple
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, List, Optional, Tuple
 
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
+from django.db import models, transaction
 from django.db.models import (
     BooleanField,
     Case,
     CharField,
-    DateTimeField,
     Exists,
-    F,
     OuterRef,
     Q,
+    Subquery,
     Value,
     When,
+    prefetch_related_objects,
 )
 from django.db.models.query import QuerySet
-from django.db.utils import OperationalError, ProgrammingError
-from django.utils import timezone
+from django.utils import timezone, translation
+from django.utils.translation import get_language
 
-from camomilla.utils import localized_fieldname
+from camomilla import settings
+from camomilla.utils import get_nofallbacks, localized_fieldname
 
 
 URL_NODE_RELATED_NAME = "%(app_label)s_%(class)s"
@@ -136,6 +145,37 @@ def _status_q(label: str, now=None) -> Q:
     return alive & Q(**{f"{published_col}__isnull": True})
 
 
+@contextmanager
+def _lifecycle_revision(comment: str):
+    """One reversion revision around a bulk lifecycle change (if installed)."""
+    from camomilla.preview import reversion_available
+
+    if not reversion_available():
+        yield
+        return
+    import reversion
+
+    with reversion.create_revision():
+        reversion.set_comment(comment)
+        yield
+
+
+def _language(code: str):
+    """Activate a draft language (``NO_LANGUAGE`` keeps the active one)."""
+    return translation.override(code) if code else nullcontext()
+
+
+def _drafts_updated(drafts: Iterable) -> None:
+    """Notify the caches of drafts changed through ``QuerySet.update``."""
+    from camomilla.due_drafts import due_drafts
+    from camomilla.html_cache import page_html_cache
+    from camomilla.tagged_cache import changed_tags, tagged_cache
+
+    due_drafts.track_change()
+    page_html_cache.track_lifecycle_change()
+    tagged_cache.track_tags(tag for draft in drafts for tag in changed_tags(draft))
+
+
 class PageQuerySet(QuerySet):
     """Lifecycle-aware queryset for any ``AbstractPage`` subclass.
 
@@ -326,6 +366,21 @@ class PageQuerySet(QuerySet):
             _has_due_draft=_draft_exists_subquery(self.model, due_now=True)
         ).filter(_has_due_draft=True)
 
+    def descendants_of(self, page, include_self: bool = False):
+        """Pages of this model below ``page``, through ``url_node.tree_path``."""
+        tree_path = page.url_node.tree_path if page.url_node_id else ""
+        if not tree_path:
+            return self.none()
+        qs = self.filter(url_node__tree_path__startswith=tree_path)
+        return qs if include_self else qs.exclude(url_node_id=page.url_node_id)
+
+    def ancestors_of(self, page, include_self: bool = False):
+        """Pages of this model above ``page``, through ``url_node.tree_path``."""
+        pks = tree_path_ids(page.url_node.tree_path if page.url_node_id else "")
+        if not include_self:
+            pks = [pk for pk in pks if pk != page.url_node_id]
+        return self.filter(url_node_id__in=pks)
+
     def first_publish_pending(self):
         """Never-public pages with a future ``published_at``: the legacy
         "scheduled to first appear at X" bucket. Independent of Draft
@@ -337,8 +392,256 @@ class PageQuerySet(QuerySet):
             published_at__gt=now,
         )
 
+    # -- bulk lifecycle ---------------------------------------------------
+    #
+    # Batch counterparts of ``AbstractPage.publish`` / ``schedule`` /
+    # ``discard_draft``. ``languages`` is ``None`` (the active language),
+    # a list of codes applied to every page, or a ``{pk: [codes]}``
+    # mapping. Pages and their drafts are loaded with one query each and
+    # the whole batch runs in one transaction (one reversion revision), so
+    # caches are invalidated once, when it commits. Each returns the
+    # number of ``(page, language)`` pairs it went through; for
+    # ``bulk_schedule``, only the ones it actually scheduled.
+
+    def _lifecycle_targets(self, languages) -> List[Tuple[models.Model, List[str]]]:
+        from camomilla.models.draft import NO_LANGUAGE
+
+        targets = []
+        for page in self:
+            if languages is None:
+                codes = [get_language() or NO_LANGUAGE]
+            elif isinstance(languages, dict):
+                codes = list(languages.get(page.pk, ()))
+            else:
+                codes = list(languages)
+            if codes:
+                targets.append((page, codes))
+        return targets
+
+    def _lifecycle_drafts(self, targets) -> dict:
+        """Drafts of ``targets``, keyed by ``(page pk, language)``."""
+        from camomilla.models.draft import Draft
+
+        wanted = {(page.pk, code) for page, codes in targets for code in codes}
+        if not wanted:
+            return {}
+        drafts = Draft.objects.filter(
+            content_type=ContentType.objects.get_for_model(self.model),
+            object_id__in={pk for pk, _ in wanted},
+            language__in={code for _, code in wanted},
+        )
+        return {
+            (draft.object_id, draft.language): draft
+            for draft in drafts
+            if (draft.object_id, draft.language) in wanted
+        }
+
+    def bulk_publish(self, languages=None, *, comment: str = "") -> int:
+        """Apply the pending drafts and mark the pages public, in batch."""
+        from camomilla.models.draft import Draft
+
+        targets = self._lifecycle_targets(languages)
+        drafts = self._lifecycle_drafts(targets)
+        now = timezone.now()
+
+        def stamp(page, codes) -> bool:
+            stamped = False
+            for code in codes:
+                with _language(code):
+                    current = get_nofallbacks(page, "published_at")
+                    if current is None or current > now:
+                        page.published_at = now
+                        stamped = True
+            return stamped
+
+        with transaction.atomic(), _lifecycle_revision(comment or "Bulk publish"):
+            for page, codes in targets:
+                # Stamped before the drafts are applied, so the save that
+                # applies them records ``published_at`` too. The page is
+                # saved on its own only without a draft, or when a draft
+                # brought back an unset / future ``published_at``.
+                stamp(page, codes)
+                applied = False
+                for code in codes:
+                    draft = drafts.get((page.pk, code))
+                    if draft is not None:
+                        with _language(code):
+                            page._apply_draft_via_serializer(
+                                draft.serialized, refetch=False
+                            )
+                        applied = True
+                if stamp(page, codes) or not applied:
+                    page.save()
+            if drafts:
+                Draft.objects.filter(pk__in=[d.pk for d in drafts.values()]).delete()
+        return sum(len(codes) for _, codes in targets)
+
+    def bulk_schedule(self, when, languages=None) -> int:
+        """Batch :meth:`AbstractPage.schedule`: never-public languages get
+        ``published_at = when``, public ones schedule their pending draft
+        (languages without one are skipped)."""
+        from camomilla.models.draft import Draft
+
+        targets = self._lifecycle_targets(languages)
+        drafts = self._lifecycle_drafts(targets)
+        scheduled = []
+        first_published = 0
+        with transaction.atomic(), _lifecycle_revision(
+            f"Scheduled for {when.isoformat()}"
+        ):
+            for page, codes in targets:
+                first_publish = False
+                for code in codes:
+                    with _language(code):
+                        if get_nofallbacks(page, "published_at") is None:
+                            page.published_at = when
+                            first_publish = True
+                            first_published += 1
+                        elif (page.pk, code) in drafts:
+                            scheduled.append(drafts[page.pk, code])
+                if first_publish:
+                    page.save()
+            if scheduled:
+                # One UPDATE instead of a save per draft: the receivers
+                # those saves would have triggered are notified below.
+                Draft.objects.filter(pk__in=[d.pk for d in scheduled]).update(
+                    scheduled_for=when, updated_at=timezone.now(), failed_at=None
+                )
+                _drafts_updated(scheduled)
+        return first_published + len(scheduled)
+
+    def bulk_discard_drafts(self, languages=None) -> int:
+        """Batch :meth:`AbstractPage.discard_draft`."""
+        from camomilla.models.draft import Draft
+
+        targets = self._lifecycle_targets(languages)
+        drafts = self._lifecycle_drafts(targets)
+        if drafts:
+            Draft.objects.filter(pk__in=[d.pk for d in drafts.values()]).delete()
+        return sum(len(codes) for _, codes in targets)
+
+
+# Page columns mirrored onto ``UrlNode`` (see ``AbstractPage.save``), so
+# listing nodes by visibility never has to join the page tables.
+URL_NODE_VISIBILITY_FIELDS = (
+    "published_at",
+    "indexable",
+    "deleted_at",
+    "date_updated_at",
+)
+
+
+def url_node_visibility_columns(page_model) -> List[Tuple[str, str]]:
+    """``(url node column, page column)`` pairs kept in sync for ``page_model``.
+
+    Translated fields (``published_at``, ``indexable``) yield one pair per
+    language.
+    """
+    url_node_model = apps.get_model("camomilla", "UrlNode")
+    columns = []
+    for field_name in URL_NODE_VISIBILITY_FIELDS:
+        languages = [None]
+        if settings.ENABLE_TRANSLATIONS:
+            languages = settings.LANGUAGE_CODES
+        for language in languages:
+            node_column = localized_fieldname(field_name, language, url_node_model)
+            page_column = localized_fieldname(field_name, language, page_model)
+            if (node_column, page_column) not in columns:
+                columns.append((node_column, page_column))
+    return columns
+
+
+def tree_path_ids(tree_path: Optional[str]) -> List[int]:
+    """Url node pks in a ``UrlNode.tree_path``, root first."""
+    return [int(pk) for pk in (tree_path or "").strip("/").split("/") if pk]
+
+
+def prefetch_pages(nodes: Iterable) -> list:
+    """Attach their page to every ``UrlNode`` in ``nodes``.
+
+    Nodes are grouped by ``related_name`` and each concrete page model is
+    loaded with a single ``IN`` query; afterwards ``node.page`` (and
+    ``node.page.url_node``) don't query. Returns ``nodes`` as a list.
+    """
+    nodes = list(nodes)
+    prefetch_related_objects(nodes, "page")
+    return nodes
+
+
+class UrlNodeQuerySet(QuerySet):
+    def with_pages(self):
+        """Prefetch the page of every node (see :func:`prefetch_pages`)."""
+        return self.prefetch_related("page")
+
+    def public(self):
+        """Nodes whose page is reachable to the public right now."""
+        published_at = localized_fieldname("published_at", target=self.model)
+        return self.filter(
+            deleted_at__isnull=True, **{f"{published_at}__lte": timezone.now()}
+        )
+
+    def descendants_of(self, node, include_self: bool = False):
+        """Nodes below ``node`` at any depth, of any page model.
 
-class UrlNodeManager(models.Manager):
+        A prefix match on the indexed ``tree_path``; empty while ``node``'s
+        path is unknown (see ``camomilla_rebuild_tree``).
+        """
+        if not node.tree_path:
+            return self.none()
+        qs = self.filter(tree_path__startswith=node.tree_path)
+        return qs if include_self else qs.exclude(pk=node.pk)
+
+    def ancestors_of(self, node, include_self: bool = False):
+        """Nodes above ``node``, read from its ``tree_path``."""
+        pks = tree_path_ids(node.tree_path)
+        if not include_self:
+            pks = [pk for pk in pks if pk != node.pk]
+        return self.filter(pk__in=pks)
+
+    def sync_visibility(self) -> int:
+        """Copy the visibility columns of every node in the queryset from its page.
+
+        One ``UPDATE`` per concrete page model. ``AbstractPage.save`` keeps
+        nodes in sync one by one; this is for backfills and for pages
+        written through ``QuerySet.update()``.
+        """
+        updated = 0
+        for relation in self.model.objects.get_reverse_pages_relations():
+            pages = relation["model"]._base_manager.filter(url_node=OuterRef("pk"))
+            updated += self.filter(related_name=relation["name"]).update(
+                **{
+                    node_column: Subquery(pages.values(page_column)[:1])
+                    for node_column, page_column in url_node_visibility_columns(
+                        relation["model"]
+                    )
+                }
+            )
+        return updated
+
+    def out_of_sync(self) -> List[int]:
+        """Pks of the nodes whose visibility columns differ from their page's."""
+        stale = []
+        for relation in self.model.objects.get_reverse_pages_relations():
+            columns = url_node_visibility_columns(relation["model"])
+            nodes = dict(
+                (row[0], row[1:])
+                for row in self.filter(related_name=relation["name"])
+                .values_list("pk", *[node for node, _ in columns])
+                .iterator(chunk_size=2000)
+            )
+            pages = (
+                relation["model"]
+                ._base_manager.filter(url_node_id__in=nodes.keys())
+                .values_list("url_node_id", *[page for _, page in columns])
+                .iterator(chunk_size=2000)
+            )
+            for row in pages:
+                if nodes.pop(row[0]) != row[1:]:
+                    stale.append(row[0])
+        return sorted(stale)
+
+
+class UrlNodeManager(models.Manager.from_queryset(UrlNodeQuerySet)):
 
     def get_reverse_pages_relations(self):
         """
@@ -379,63 +682,22 @@ class UrlNodeManager(models.Manager):
             )
         return self._related_names
 
-    def _annotate_fields(
-        self,
-        qs: models.QuerySet,
-        field_names: Sequence[Tuple[str, models.Field, models.Value]],
-    ):
-        """Annotate UrlNode rows with fields pulled from the related page.
-
-        Each F-join target is resolved to the **active-language** column on
-        the related model (via ``localized_fieldname(target=model)``).
-        ``modeltranslation`` rewrites lookups on the page side automatically
-        but F expressions through a foreign-key join are NOT rewritten —
-        without this we'd read the base column (whose value bears no
-        per-language meaning when translations are enabled) and the
-        downstream ``is_public`` annotation would lie across languages.
-        """
-        relations_by_name = {
-            rel["name"]: rel["model"] for rel in self.get_reverse_pages_relations()
-        }
-        for field_name, output_field, default in field_names:
-            whens = [
-                When(
-                    related_name=related_name,
-                    then=F(
-                        "__".join(
-                            [
-                                related_name,
-                                localized_fieldname(
-                                    field_name,
-                                    target=relations_by_name[related_name],
-                                ),
-                            ]
-                        )
-                    ),
-                )
-                for related_name in self.related_names
-            ]
-            qs = qs.annotate(
-                **{field_name: Case(*whens, output_field=output_field, default=default)}
-            )
-        return self._annotate_lifecycle(qs)
-
     def _annotate_lifecycle(self, qs: models.QuerySet):
         """Annotate ``is_public`` + ``status`` on UrlNodes.
 
-        Both are derived from the page's ``published_at`` / ``deleted_at``
-        timestamps (already surfaced onto the UrlNode by
-        ``_annotate_fields`` via per-concrete-model joins). ``status``
-        no longer consults ``publish_at`` — that column doesn't exist
-        anymore; scheduled content swaps live in the ``Draft`` table
-        and don't affect the UrlNode's visibility label.
+        Both are derived from the ``published_at`` / ``deleted_at`` columns
+        mirrored from the page, resolved explicitly to the active language
+        (``Case``/``When`` references inside ``annotate()`` are not
+        rewritten by ``modeltranslation``). Scheduled content swaps live in
+        the ``Draft`` table and don't affect the UrlNode's visibility label.
         """
         now = timezone.now()
+        published_at = localized_fieldname("published_at", target=self.model)
         return qs.annotate(
             is_public=Case(
                 When(
                     deleted_at__isnull=True,
-                    published_at__lte=now,
+                    **{f"{published_at}__lte": now},
                     then=Value(True),
                 ),
                 default=Value(False),
@@ -443,9 +705,12 @@ class UrlNodeManager(models.Manager):
             ),
             status=Case(
                 When(deleted_at__isnull=False, then=Value(PAGE_STATUS_TRASHED)),
-                When(published_at__lte=now, then=Value(PAGE_STATUS_PUBLISHED)),
                 When(
-                    published_at__isnull=False,
+                    **{f"{published_at}__lte": now},
+                    then=Value(PAGE_STATUS_PUBLISHED),
+                ),
+                When(
+                    **{f"{published_at}__isnull": False},
                     then=Value(PAGE_STATUS_SCHEDULED),
                 ),
                 default=Value(PAGE_STATUS_DRAFT),
@@ -454,31 +719,4 @@ class UrlNodeManager(models.Manager):
         )
 
     def get_queryset(self):
-        try:
-            return self._annotate_fields(
-                super().get_queryset(),
-                [
-                    (
-                        "indexable",
-                        BooleanField(),
-                        Value(None, BooleanField()),
-                    ),
-                    (
-                        "published_at",
-                        DateTimeField(),
-                        Value(None, DateTimeField()),
-                    ),
-                    (
-                        "deleted_at",
-                        DateTimeField(),
-                        Value(None, DateTimeField()),
-                    ),
-                    (
-                        "date_updated_at",
-                        DateTimeField(),
-                        Value(timezone.now(), DateTimeField()),
-                    ),
-                ],
-            )
-        except (ProgrammingError, OperationalError):
-            return super().get_queryset()
+        return self._annotate_lifecycle(super().get_queryset())
@@ -0,0 +1,389 @@
+"""Queryset for ``UrlRedirect``.
+
+``bulk_import`` loads legacy redirects (tens of thousands of rows coming
+from a previous site) in a single transaction: targets are resolved to
+their ``UrlNode`` with one query per language and rows are upserted on
+``(from_url, language_code)`` in batches.
+
+``redirect_renames`` is what ``UrlNode`` renames go through, and
+``deduplicate`` / ``flatten_chains`` / ``prune`` back the
+``camomilla_redirects`` maintenance command. They all work on whole sets
+of rows and, since bulk inserts and updates don't send signals, tell the
+redirect index about their changes themselves. Deletes go through
+``QuerySet.delete()`` so ``post_delete`` receivers still see every row.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from django.db import connections, models, transaction
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+from modeltranslation.utils import build_localized_fieldname
+
+from camomilla import settings
+from camomilla.utils.translation import url_lang_decompose
+
+
+FALSY_STRINGS = {"", "0", "false", "f", "no", "n", "off"}
+UPSERT_FIELDS = ["to_url", "url_node", "permanent", "date_updated_at"]
+
+
+class RedirectImportResult(NamedTuple):
+    imported: int
+    # ``(record index, reason)`` for every record left out.
+    skipped: List[Tuple[int, str]]
+
+
+class RedirectChainReport(NamedTuple):
+    flattened: int
+    # ``(language_code, [from_url, ...])`` for every redirect loop found.
+    cycles: List[Tuple[Optional[str], List[str]]]
+    # Redirects deleted because they were part of a loop.
+    broken: int
+
+
+def _as_bool(value, default: bool) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in FALSY_STRINGS
+    return bool(value)
+
+
+def _split(url: str, language_code: Optional[str]) -> Tuple[str, str]:
+    decomposition = url_lang_decompose(url.strip())
+    language = language_code or decomposition["language"]
+    return language, decomposition["permalink"].rstrip("/") or "/"
+
+
+class UrlRedirectQuerySet(models.QuerySet):
+    def bulk_import(
+        self,
+        records: Iterable[Mapping],
+        language_code: Optional[str] = None,
+        permanent: bool = True,
+        batch_size: int = 1000,
+    ) -> RedirectImportResult:
+        """Create or update redirects from ``records``.
+
+        Each record is a mapping with ``from_url`` and ``to_url`` and,
+        optionally, ``language_code`` and ``permanent``. Urls may carry a
+        language prefix (``/it/vecchia-pagina``); the record's
+        ``language_code``, then the ``language_code`` argument, take
+        precedence over it. ``to_url`` must be the permalink of an
+        existing ``UrlNode`` in that language. Records are skipped, never
+        failing the import, when they can't be resolved; when two records
+        share a ``from_url`` the last one wins.
+        """
+        url_node_model = self.model._meta.get_field("url_node").related_model
+        skipped = []
+        pending = {}
+        for index, record in enumerate(records):
+            from_url, to_url = record.get("from_url"), record.get("to_url")
+            if not from_url or not to_url:
+                skipped.append((index, "missing from_url or to_url"))
+                continue
+            language = record.get("language_code") or language_code
+            language, from_url = _split(from_url, language)
+            _, to_url = _split(to_url, language)
+            if settings.ENABLE_TRANSLATIONS and language not in settings.LANGUAGE_CODES:
+                skipped.append((index, f"unknown language {language!r}"))
+                continue
+            if from_url.rstrip("/") == to_url.rstrip("/"):
+                skipped.append((index, "redirects to itself"))
+                continue
+            pending[(from_url.rstrip("/"), language)] = (
+                index,
+                to_url,
+                _as_bool(record.get("permanent"), permanent),
+            )
+
+        targets = {}
+        for language in {language for _, language in pending}:
+            column = (
+                build_localized_fieldname("permalink", language)
+                if settings.ENABLE_TRANSLATIONS
+                else "permalink"
+            )
+            permalinks = {
+                to_url
+                for (_, lang), (_, to_url, _) in pending.items()
+                if lang == language
+            }
+            for permalink, pk in url_node_model._base_manager.filter(
+                **{f"{column}__in": permalinks}
+            ).values_list(column, "pk"):
+                targets[(language, permalink)] = pk
+
+        redirects = []
+        for (from_url, language), (index, to_url, is_permanent) in pending.items():
+            url_node_id = targets.get((language, to_url))
+            if url_node_id is None:
+                skipped.append((index, f"no page at {to_url!r} [{language}]"))
+                continue
+            redirects.append(
+                self.model(
+                    from_url=from_url,
+                    to_url=to_url,
+                    language_code=language,
+                    url_node_id=url_node_id,
+                    permanent=is_permanent,
+                )
+            )
+
+        with transaction.atomic(using=self.db):
+            self._upsert(redirects, batch_size)
+            # ``bulk_create`` doesn't send signals.
+            self._track_change()
+        skipped.sort()
+        return RedirectImportResult(imported=len(redirects), skipped=skipped)
+
+    def redirect_renames(
+        self, url_node, renamed: Mapping[str, Tuple[Optional[str], Optional[str]]]
+    ) -> int:
+        """Record that ``url_node`` moved, ``renamed`` being ``{lang: (old, new)}``.
+
+        Redirects *from* a new permalink are dropped (they would shadow
+        the page), redirects *to* an old one are pointed to the new one so
+        chains never build up, and ``old → new`` redirects are upserted.
+        Returns the number of rows touched.
+        """
+        return self.redirect_renames_many({url_node: renamed})
+
+    def redirect_renames_many(
+        self,
+        renames: Mapping[object, Mapping[str, Tuple[Optional[str], Optional[str]]]],
+        batch_size: int = 500,
+    ) -> int:
+        """:meth:`redirect_renames` for many url nodes at once.
+
+        ``renames`` maps url nodes to ``{lang: (old, new)}``. It costs one
+        delete and one update per language and batch of urls, and one
+        upsert per batch of redirects, whatever the number of nodes.
+        """
+        targets = defaultdict(set)
+        moves = defaultdict(dict)
+        for url_node, renamed in renames.items():
+            for lang, (old, new) in renamed.items():
+                if old == new or not new:
+                    continue
+                targets[lang].add(new)
+                if old:
+                    moves[lang][old] = (new, url_node.pk)
+        redirects = [
+            self.model(
+                from_url=old, to_url=new, url_node_id=node_id, language_code=lang
+            )
+            for lang, moved in moves.items()
+            for old, (new, node_id) in moved.items()
+            # Another node of the batch now lives at ``old``.
+            if old not in targets[lang]
+        ]
+        changed = 0
+        with transaction.atomic(using=self.db):
+            for lang, urls in targets.items():
+                for batch in _batched(sorted(urls), batch_size):
+                    changed += self.filter(
+                        language_code=lang, from_url__in=batch
+                    ).delete()[0]
+            for lang, moved in moves.items():
+                for batch in _batched(sorted(moved), batch_size):
+                    changed += self.filter(language_code=lang, to_url__in=batch).update(
+                        to_url=Case(
+                            *(
+                                When(to_url=old, then=Value(moved[old][0]))
+                                for old in batch
+                            )
+                        ),
+                        url_node_id=Case(
+                            *(
+                                When(to_url=old, then=Value(moved[old][1]))
+                                for old in batch
+                            )
+                        ),
+                    )
+            changed += self._upsert(redirects, batch_size)
+            if changed:
+                self._track_change()
+        return changed
+
+    def deduplicate(self) -> int:
+        """Collapse redirects whose ``from_url`` only differ by a trailing slash.
+
+        Lookups strip the trailing slash, so of ``/a`` and ``/a/`` only the
+        first is ever served. The most recently updated row of each group
+        is kept (under the normalized url), the others are deleted.
+        Returns the number of deleted rows.
+        """
+        groups = defaultdict(list)
+        rows = self.order_by("-date_updated_at", "-pk").values_list(
+            "pk", "language_code", "from_url"
+        )
+        for pk, language, from_url in rows.iterator(chunk_size=2000):
+            groups[(language, from_url.rstrip("/"))].append((pk, from_url))
+        doomed, renames = [], []
+        for (_, normalized), group in groups.items():
+            (keep, from_url), *others = group
+            doomed.extend(pk for pk, _ in others)
+            if from_url != normalized:
+                renames.append((keep, normalized))
+        with transaction.atomic(using=self.db):
+            deleted = 0
+            for batch in _batched(doomed):
+                deleted += self.filter(pk__in=batch).delete()[0]
+            for pk, normalized in renames:
+                self.filter(pk=pk).update(from_url=normalized)
+            if deleted or renames:
+                self._track_change()
+        return deleted
+
+    def flatten_chains(self, break_cycles: bool = False) -> RedirectChainReport:
+        """Point every redirect straight at the end of its chain.
+
+        ``A → B → C`` becomes ``A → C`` (and ``B → C``), taking the
+        ``url_node`` of the last hop. Loops can't be flattened: they are
+        reported, and deleted when ``break_cycles`` is set. Redirects
+        leading into a loop are left alone.
+        """
+        sources = {}
+        for pk, language, from_url, to_url, url_node_id in self.values_list(
+            "pk", "language_code", "from_url", "to_url", "url_node_id"
+        ).iterator(chunk_size=2000):
+            sources[(language, from_url.rstrip("/"))] = (pk, to_url, url_node_id)
+
+        resolved, cycles = _resolve_chains(sources)
+
+        retarget = defaultdict(list)
+        for key, (pk, to_url, url_node_id) in sources.items():
+            end = resolved[key]
+            if end is not None and end != (to_url, url_node_id):
+                retarget[end].append(pk)
+        looping = [
+            sources[(language, from_url.rstrip("/"))][0]
+            for language, loop in cycles
+            for from_url in loop
+        ]
+
+        flattened = broken = 0
+        with transaction.atomic(using=self.db):
+            for (to_url, url_node_id), pks in retarget.items():
+                for batch in _batched(pks):
+                    flattened += self.filter(pk__in=batch).update(
+                        to_url=to_url, url_node_id=url_node_id
+                    )
+            if break_cycles:
+                for batch in _batched(looping):
+                    broken += self.filter(pk__in=batch).delete()[0]
+            if flattened or broken:
+                self._track_change()
+        return RedirectChainReport(flattened=flattened, cycles=cycles, broken=broken)
+
+    def prune(self, older_than: datetime) -> int:
+        """Delete redirects nobody hit since ``older_than``.
+
+        Redirects never hit at all are kept until they are that old.
+        Buffered hits of this process are flushed first.
+        """
+        from camomilla.routing import redirect_hits
+
+        redirect_hits.flush()
+        with transaction.atomic(using=self.db):
+            deleted = self.filter(
+                Q(last_hit_at__lt=older_than)
+                | Q(last_hit_at__isnull=True, date_created__lt=older_than)
+            ).delete()[0]
+            if deleted:
+                self._track_change()
+        return deleted
+
+    def _upsert(self, redirects: List, batch_size: int) -> int:
+        """Create ``redirects``, updating rows already at their ``(from_url, language_code)``.
+
+        Backends that support ``ON CONFLICT (...)`` upsert in bulk, except
+        for ``NULL`` language codes (monolingual sites), which never
+        conflict. Those, and every row on other backends (MySQL), are
+        looked up first and then updated or created in bulk.
+        """
+        if connections[self.db].features.supports_update_conflicts_with_target:
+            upserted = [r for r in redirects if r.language_code is not None]
+            redirects = [r for r in redirects if r.language_code is None]
+            self.bulk_create(
+                upserted,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["from_url", "language_code"],
+                update_fields=UPSERT_FIELDS,
+            )
+        else:
+            upserted = []
+        by_language = defaultdict(list)
+        for redirect in redirects:
+            by_language[redirect.language_code].append(redirect)
+        existing = {}
+        for language, group in by_language.items():
+            urls = sorted({redirect.from_url for redirect in group})
+            for batch in _batched(urls, batch_size):
+                rows = self.filter(
+                    (
+                        Q(language_code=language)
+                        if language is not None
+                        else Q(language_code__isnull=True)
+                    ),
+                    from_url__in=batch,
+                ).values_list("pk", "from_url")
+                for pk, from_url in rows.order_by("-pk"):
+                    existing[(language, from_url)] = pk
+        created, updated = [], []
+        now = timezone.now()
+        for redirect in redirects:
+            redirect.pk = existing.get((redirect.language_code, redirect.from_url))
+            if redirect.pk is None:
+                created.append(redirect)
+            else:
+                # ``bulk_update`` doesn't fill ``auto_now`` fields.
+                redirect.date_updated_at = now
+                updated.append(redirect)
+        self.bulk_create(created, batch_size=batch_size)
+        self.bulk_update(updated, UPSERT_FIELDS, batch_size=batch_size)
+        return len(upserted) + len(created) + len(updated)
+
+    def _track_change(self) -> None:
+        from camomilla.routing import redirect_index
+
+        redirect_index.track_change()
+
+
+def _resolve_chains(sources: dict) -> Tuple[dict, list]:
+    """Follow each chain in ``sources`` (``{(lang, from_url): row}``) once.
+
+    ``resolved[key]`` is the final ``(to_url, url_node_id)`` of the chain
+    starting at ``key``, or ``None`` when it ends in a loop.
+    """
+    resolved: Dict[tuple, Optional[tuple]] = {}
+    cycles = []
+    for start in sources:
+        path, on_path, key = [], set(), start
+        while key in sources and key not in resolved and key not in on_path:
+            path.append(key)
+            on_path.add(key)
+            key = (key[0], sources[key][1].rstrip("/"))
+        if key in on_path:
+            first = path.index(key)
+            cycles.append((key[0], [from_url for _, from_url in path[first:]]))
+            end = None
+        elif key in resolved:
+            end = resolved[key]
+        else:
+            _, to_url, url_node_id = sources[path[-1]]
+            end = (to_url, url_node_id)
+        for hop in path:
+            resolved[hop] = end
+    return resolved, cycles
+
+
+def _batched(items: List, size: int = 1000) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        end = start + size
+        yield items[start:end]
@@ -28,6 +28,9 @@ on :class:`AbstractPage` (``save_draft`` / ``publish`` / ``discard_draft`` /
 queryset surface; the model methods own the lifecycle semantics.
 """
 
+from functools import reduce
+from operator import or_
+
 from django.conf import settings as django_settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
@@ -49,6 +52,8 @@ class DraftQuerySet(models.QuerySet):
     narrows to "drafts I'd act on for this page+language",
     ``pending()`` / ``scheduled()`` split by whether ``scheduled_for`` is
     set, ``due_now()`` is the cron / lazy-materialisation worklist.
+    ``live()`` and ``retryable()`` keep drafts that can't be published
+    (their page is gone, their last publish failed) out of it.
     """
 
     def for_(self, page, language=None) -> "DraftQuerySet":
@@ -67,6 +72,49 @@ class DraftQuerySet(models.QuerySet):
     def due_now(self, now=None) -> "DraftQuerySet":
         return self.filter(scheduled_for__lte=now or timezone.now())
 
+    def live(self) -> "DraftQuerySet":
+        """Drafts whose page still exists (trashed pages included)."""
+        from camomilla.models.page import AbstractPage
+        from camomilla.preview import _all_subclasses
+
+        models_ = {
+            model._meta.concrete_model
+            for model in _all_subclasses(AbstractPage)
+            if not model._meta.abstract
+        }
+        if not models_:
+            return self.none()
+        content_types = ContentType.objects.get_for_models(*models_)
+        return self.filter(
+            reduce(
+                or_,
+                (
+                    models.Q(
+                        models.Exists(
+                            model._base_manager.filter(pk=models.OuterRef("object_id"))
+                        ),
+                        content_type=content_type,
+                    )
+                    for model, content_type in content_types.items()
+                ),
+            )
+        )
+
+    def retryable(self, retry_after=None, now=None) -> "DraftQuerySet":
+        """Drafts not marked failed, or (given a ``retry_after`` timedelta)
+        marked longer ago than that."""
+        condition = models.Q(failed_at__isnull=True)
+        if retry_after is not None:
+            condition |= models.Q(failed_at__lte=(now or timezone.now()) - retry_after)
+        return self.filter(condition)
+
+    def mark_failed(self, now=None) -> int:
+        """Stamp ``failed_at``: a scheduled publish of these drafts failed."""
+        from camomilla.due_drafts import due_drafts
+
+        due_drafts.track_change()
+        return self.update(failed_at=now or timezone.now())
+
 
 class Draft(models.Model):
     """One staged future state of a page in one language."""
@@ -86,6 +134,10 @@ class Draft(models.Model):
     serialized = models.JSONField(default=dict, blank=True)
 
     scheduled_for = models.DateTimeField(null=True, blank=True)
+    # Set when a scheduled publish of the draft failed: lazy publishes skip
+    # it and ``camomilla_publish_scheduled`` retries it after a back-off.
+    # Saving the draft again clears it.
+    failed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -117,6 +169,13 @@ class Draft(models.Model):
         ]
         ordering = ("-updated_at",)
 
+    def save(self, *args, **kwargs):
+        # An edited draft gets another chance.
+        self.failed_at = None
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "failed_at"}
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         lang = self.language or "—"
         when = self.scheduled_for.isoformat() if self.scheduled_for else "manual"
@@ -15,6 +15,7 @@ from django.utils.translation import gettext_lazy as _
 from PIL import Image
 
 from camomilla.fields import JSONField
+from camomilla.instrumentation import span
 from camomilla import settings as camomilla_settings
 from camomilla.settings import THUMBNAIL_FOLDER, THUMBNAIL_HEIGHT, THUMBNAIL_WIDTH
 from camomilla.storages.optimize import OptimizedStorage
@@ -135,10 +136,11 @@ class Media(models.Model):
         self._make_renditions()
         Media.objects.filter(pk=self.pk).update(renditions=self.renditions)
 
-    def get_foreign_fields(self):
+    @classmethod
+    def get_foreign_fields(cls):
         return [
             field.get_accessor_name()
-            for field in self._meta.get_fields()
+            for field in cls._meta.get_fields()
             if issubclass(type(field), ForeignObjectRel)
         ]
 
@@ -167,6 +169,7 @@ class Media(models.Model):
             logger.error("Error updating file info for %s: %s", self.file.name, ex)
             return False
 
+    @span("media")
     def _make_thumbnail(self, img_bytes=None):
         try:
             if not img_bytes:
@@ -200,6 +203,7 @@ class Media(models.Model):
         if self.thumbnail:
             self.thumbnail.storage.delete(self.thumbnail.name)
 
+    @span("media")
     def _make_renditions(self):
         if not self.is_image or not camomilla_settings.MEDIA_RENDITIONS_ENABLE:
             return False
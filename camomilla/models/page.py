@@ -1,12 +1,15 @@
 import logging
-from typing import Sequence, Tuple, Optional
+from collections import defaultdict
+from typing import Iterable, Sequence, Tuple, Optional
 from uuid import uuid4
 
 from django.contrib.contenttypes.fields import GenericRelation
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
 
 from django.db import models, transaction
+from django.db.models import DEFERRED, Value
+from django.db.models.functions import Concat, Substr
 from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.http import Http404, HttpRequest
@@ -17,18 +20,25 @@ from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import get_language
 
-from camomilla.managers.pages import PageQuerySet, UrlNodeManager
+from camomilla.managers.pages import (
+    PageQuerySet,
+    UrlNodeManager,
+    url_node_visibility_columns,
+)
+from camomilla.managers.redirects import UrlRedirectQuerySet
 from camomilla.models.mixins import MetaMixin, SeoMixin
 from camomilla.utils import (
     activate_languages,
     get_field_translations,
     get_nofallbacks,
     lang_fallback_query,
+    localized_fieldname,
     set_nofallbacks,
     url_lang_decompose,
 )
 from camomilla.utils.getters import pointed_getter
 from camomilla import settings
+from camomilla.instrumentation import span
 from camomilla.templates_context.rendering import ctx_registry
 from django.conf import settings as django_settings
 from modeltranslation.utils import build_localized_fieldname
@@ -48,6 +58,11 @@ class UrlRedirect(models.Model):
     permanent = models.BooleanField(default=True)
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated_at = models.DateTimeField(auto_now=True)
+    # Maintained in batches by ``camomilla.routing.redirect_hits``.
+    hits = models.PositiveIntegerField(default=0, editable=False)
+    last_hit_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = UrlRedirectQuerySet.as_manager()
 
     __q_string = ""
 
@@ -72,11 +87,14 @@ class UrlRedirect(models.Model):
             language_code or path_decomposition["language"] or get_language()
         )
         from_url = path_decomposition["permalink"]
-        return cls.objects.filter(
-            from_url=from_url.rstrip("/"), language_code=language_code or get_language()
-        ).first()
+        from camomilla.routing import find_redirect
+
+        return find_redirect(from_url.rstrip("/"), language_code or get_language())
 
     def redirect(self) -> str:
+        from camomilla.routing import redirect_hits
+
+        redirect_hits.record(self.pk)
         return redirect(self.redirect_to, permanent=self.permanent)
 
     @property
@@ -100,6 +118,65 @@ class UrlRedirect(models.Model):
         ]
 
 
+class UrlNodePageDescriptor:
+    """``UrlNode.page``: the concrete page behind a node.
+
+    Reads the reverse one-to-one named by ``related_name``, so a single
+    node costs one query. Collections should use
+    ``UrlNode.objects.with_pages()`` (or ``prefetch_pages(nodes)``): this
+    descriptor implements Django's prefetch protocol, so
+    ``prefetch_related("page")`` groups nodes by ``related_name`` and
+    loads each page model with one ``IN`` query.
+    """
+
+    cache_name = "page"
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        return getattr(instance, instance.related_name)
+
+    def __set__(self, instance, page) -> None:
+        instance._meta.get_field(instance.related_name).set_cached_value(
+            instance, page
+        )
+        if page is not None:
+            page._meta.get_field("url_node").set_cached_value(page, instance)
+
+    def is_cached(self, instance) -> bool:
+        return instance._meta.get_field(instance.related_name).is_cached(instance)
+
+    def get_prefetch_querysets(self, instances, querysets=None):
+        relations = {
+            rel["name"]: rel["model"]
+            for rel in UrlNode.objects.get_reverse_pages_relations()
+        }
+        labels = {name: model._meta.label for name, model in relations.items()}
+        custom = {queryset.model: queryset for queryset in querysets or []}
+        by_model = defaultdict(list)
+        for instance in instances:
+            if instance.related_name in relations:
+                by_model[relations[instance.related_name]].append(instance.pk)
+        pages = []
+        for model, pks in by_model.items():
+            queryset = custom.get(model, model._base_manager.all())
+            pages.extend(queryset.filter(url_node_id__in=pks))
+        return (
+            pages,
+            lambda page: (page._meta.label, page.url_node_id),
+            lambda node: (labels.get(node.related_name), node.pk),
+            True,
+            self.cache_name,
+            True,
+        )
+
+    def get_prefetch_queryset(self, instances, queryset=None):
+        # Django < 5.0 protocol.
+        return self.get_prefetch_querysets(
+            instances, [queryset] if queryset is not None else None
+        )
+
+
 class UrlNode(models.Model):
 
     LANG_PERMALINK_FIELDS = (
@@ -113,11 +190,38 @@ class UrlNode(models.Model):
 
     permalink = models.CharField(max_length=400, unique=True, null=True)
     related_name = models.CharField(max_length=200)
+    # Mirrored from the page by ``AbstractPage.save`` (see
+    # ``UrlNodeQuerySet.sync_visibility``), never edited directly.
+    published_at = models.DateTimeField(null=True, blank=True, editable=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    indexable = models.BooleanField(null=True, editable=False)
+    date_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Pks of the node's ancestors then its own (``/1/4/9/``), maintained by
+    # ``AbstractPage.save``: see :mod:`camomilla.tree`. Empty when unknown.
+    tree_path = models.CharField(max_length=255, default="", db_index=True, editable=False)
     objects = UrlNodeManager()
 
-    @property
-    def page(self) -> "AbstractPage":
-        return getattr(self, self.related_name)
+    class Meta:
+        # Explicitly named: translated columns don't exist yet when Django
+        # would derive the name.
+        indexes = (
+            [
+                models.Index(
+                    fields=[build_localized_fieldname("published_at", lang), "deleted_at"],
+                    name=f"camomilla_urlnode_pub_{lang}"[:30],
+                )
+                for lang in settings.LANGUAGE_CODES
+            ]
+            if settings.ENABLE_TRANSLATIONS
+            else [
+                models.Index(
+                    fields=["published_at", "deleted_at"],
+                    name="camomilla_urlnode_pub",
+                )
+            ]
+        )
+
+    page = UrlNodePageDescriptor()
 
     @staticmethod
     def reverse_url(permalink: str, request: Optional[HttpRequest] = None) -> str:
@@ -307,9 +411,85 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
     def __init__(self, *args, **kwargs):
         super(AbstractPage, self).__init__(*args, **kwargs)
 
+    # -- dirty tracking ----------------------------------------------------
+    # ``save`` only rebuilds the url node (permalinks, descendants, tree
+    # path) when a column it is computed from changed since the page was
+    # loaded. Pages built in memory have no snapshot: they always do.
+
+    _permalink_sources_snapshot: Optional[dict] = None
+
+    @classmethod
+    def permalink_source_fields(cls) -> Tuple[str, ...]:
+        """Attnames whose change invalidates the page's permalinks."""
+        if "_permalink_source_fields" in cls.__dict__:
+            return cls._permalink_source_fields
+        languages = settings.LANGUAGE_CODES if settings.ENABLE_TRANSLATIONS else [None]
+        fields = {
+            localized_fieldname(attr, lang, cls) if lang else attr
+            for attr in ("title", "autopermalink")
+            for lang in languages
+        }
+        parent_field = pointed_getter(cls, "_page_meta.parent_page_field")
+        try:
+            fields.add(cls._meta.get_field(parent_field).attname)
+        except FieldDoesNotExist:
+            pass
+        cls._permalink_source_fields = tuple(sorted(fields))
+        return cls._permalink_source_fields
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_permalink_sources()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, *args, **kwargs) -> None:
+        super().refresh_from_db(using, fields, *args, **kwargs)
+        self._snapshot_permalink_sources(fields)
+
+    def _snapshot_permalink_sources(
+        self, fields: Optional[Iterable[str]] = None
+    ) -> None:
+        # Deferred fields are recorded as missing: setting one counts as a change.
+        sources = self.permalink_source_fields()
+        if fields is not None:
+            # Partial reloads (deferred field access included) only
+            # re-snapshot what they loaded: unsaved edits to the other
+            # sources must still count as changes.
+            if self._permalink_sources_snapshot is None:
+                return
+            reloaded = set()
+            for name in fields:
+                try:
+                    reloaded.add(self._meta.get_field(name).attname)
+                except FieldDoesNotExist:
+                    reloaded.add(name)
+            sources = [attname for attname in sources if attname in reloaded]
+        else:
+            self._permalink_sources_snapshot = {}
+        self._permalink_sources_snapshot.update(
+            (attname, self.__dict__.get(attname, DEFERRED)) for attname in sources
+        )
+
+    def permalink_sources_changed(self) -> bool:
+        """Whether :meth:`save` has to rebuild the url node."""
+        snapshot = self._permalink_sources_snapshot
+        if snapshot is None or not self.url_node_id:
+            return True
+        for attname, value in snapshot.items():
+            if attname in self.__dict__ and self.__dict__[attname] != value:
+                return True
+        # Permalinks set by hand since the page was loaded.
+        return any(
+            f"__{field}" in self.__dict__
+            and self.__dict__[f"__{field}"] != getattr(self.url_node, field)
+            for field in UrlNode.LANG_PERMALINK_FIELDS
+        )
+
     def __str__(self) -> str:
         return "(%s) %s" % (self.__class__.__name__, self.title or self.permalink)
 
+    @span("context")
     def get_context(self, request: Optional[HttpRequest] = None):
         context = {
             "page": self,
@@ -351,15 +531,33 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
     def routerlink(self) -> str:
         return self.url_node and self.url_node.routerlink
 
-    @property
-    def breadcrumbs(self) -> Sequence[dict]:
-        breadcrumb = {
+    def _breadcrumb(self) -> dict:
+        return {
             "permalink": self.routerlink,
             "title": self.breadcrumbs_title or self.title or "",
         }
+
+    @property
+    def breadcrumbs(self) -> Sequence[dict]:
+        ancestors = self.get_ancestors()
+        if ancestors is not None:
+            return [page._breadcrumb() for page in ancestors] + [self._breadcrumb()]
         if self.parent:
-            return self.parent.breadcrumbs + [breadcrumb]
-        return [breadcrumb]
+            return self.parent.breadcrumbs + [self._breadcrumb()]
+        return [self._breadcrumb()]
+
+    def get_ancestors(self) -> Optional[list]:
+        """Ancestor pages, root first, read through the url node's ``tree_path``.
+
+        ``None`` when the path isn't known (see :func:`camomilla.tree.page_ancestors`).
+        Lists of pages load theirs at once, see :func:`camomilla.tree.prefetch_ancestors`.
+        """
+        ancestors = self.__dict__.get("_prefetched_ancestors")
+        if ancestors is not None:
+            return ancestors
+        from camomilla.tree import page_ancestors
+
+        return page_ancestors(self)
 
     # ------------------------------------------------------------------
     # Lifecycle status — visibility-only derivation
@@ -485,12 +683,15 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
     def discard_draft(self) -> None:
         self._drafts(language=self._draft_language()).delete()
 
-    def _apply_draft_via_serializer(self, draft_data: dict) -> None:
+    def _apply_draft_via_serializer(self, draft_data: dict, refetch: bool = True) -> None:
         """Apply ``draft_data`` through the model's edit serializer.
 
         Validates the payload as if it had arrived through the API's PATCH
         path. Keeps nested ``translations`` round-tripping correctly via the
         write-shaped base chain (``get_editable_bases``).
+
+        ``refetch=False`` applies it to this instance as loaded instead of a
+        fresh copy (bulk publishes load their pages right before).
         """
         if not draft_data:
             return
@@ -504,11 +705,12 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
             bases=get_editable_bases(self.__class__.get_serializer()),
             name_suffix="Draft",
         )
-        instance = self.__class__.objects.get(pk=self.pk)
+        instance = self.__class__.objects.get(pk=self.pk) if refetch else self
         serializer = serializer_cls(instance, data=draft_data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        self.refresh_from_db()
+        if refetch:
+            self.refresh_from_db()
 
     def publish(self, *, create_revision: bool = True, comment: str = "") -> None:
         """Apply the active-language draft (if any) and mark the row public.
@@ -545,6 +747,7 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
         else:
             self.save()
 
+    @span("publish")
     def publish_if_due(self) -> bool:
         """Lazy-publish the active language's due Draft, if there is one.
 
@@ -553,30 +756,30 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
         row has been consumed and returns ``False``.
 
         Expected runtime failures (validation, transient DB) are caught
-        and logged; the request proceeds with whatever lives in the DB
-        now. Programmer errors propagate.
+        and logged, and the draft is marked failed; the request proceeds
+        with whatever lives in the DB now. Programmer errors propagate.
+
+        No query runs until the earliest scheduled draft of the whole site
+        is due (see :mod:`camomilla.due_drafts`).
         """
         from django.db.utils import DatabaseError, NotSupportedError, OperationalError
         from rest_framework.exceptions import ValidationError
 
+        from camomilla.due_drafts import due_drafts
         from camomilla.models.draft import Draft
 
+        if not due_drafts.may_be_due():
+            return False
         lang = self._draft_language()
-        if not Draft.objects.for_(self, language=lang).due_now().exists():
+        due = Draft.objects.for_(self, language=lang).due_now().retryable()
+        if not due.exists():
             return False
         try:
             with transaction.atomic():
                 try:
-                    locked = (
-                        Draft.objects.select_for_update()
-                        .for_(self, language=lang)
-                        .due_now()
-                        .first()
-                    )
+                    locked = due.select_for_update().first()
                 except (NotSupportedError, OperationalError):
-                    locked = (
-                        Draft.objects.for_(self, language=lang).due_now().first()
-                    )
+                    locked = due.first()
                 if locked is None:
                     return False
                 # Re-fetch page under the lock to read fresh published_at.
@@ -604,6 +807,8 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
                 self.pk,
                 exc,
             )
+            # Left to ``camomilla_publish_scheduled``: reads stop retrying it.
+            due.mark_failed()
             self.refresh_from_db()
             return False
         self.refresh_from_db()
@@ -733,41 +938,102 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
             force = force or old_permalink != new_permalink
             set_nofallbacks(self.url_node, "permalink", new_permalink)
         if force:
-            self.url_node.save()
-            self.update_childs()
+            # Only permalinks: other columns are synced after the page saves.
+            self.url_node.save(
+                update_fields=["permalink", *UrlNode.LANG_PERMALINK_FIELDS]
+            )
+            self.rebuild_descendant_permalinks()
         return self.url_node
 
+    @staticmethod
+    def compose_permalink(title: Optional[str], parent_permalink: Optional[str] = None) -> str:
+        """Automatic permalink for ``title``, nested under ``parent_permalink``.
+
+        Pass ``""`` (not ``None``) for a parent that has no permalink.
+        """
+        permalink = f"/{slugify(title or '', allow_unicode=True)}"
+        if parent_permalink is not None:
+            permalink = f"/{parent_permalink.lstrip('/')}{permalink}"
+        return permalink
+
+    @staticmethod
+    def disambiguate_permalink(permalink: str) -> str:
+        """Swap the last segment of a taken ``permalink`` for a random one."""
+        return "/".join(
+            permalink.split("/")[:-1] + [slugify(uuid4(), allow_unicode=True)]
+        )
+
     def generate_permalink(self, safe: bool = True) -> str:
-        permalink = f"/{slugify(self.title or '', allow_unicode=True)}"
-        if self.parent:
-            parent_permalink = (self.parent.permalink or "").lstrip("/")
-            permalink = f"/{parent_permalink}{permalink}"
+        parent = self.parent
+        permalink = self.compose_permalink(
+            self.title, (parent.permalink or "") if parent else None
+        )
         set_nofallbacks(self, "permalink", permalink)
         qs = UrlNode.objects.exclude(pk=getattr(self.url_node or object, "pk", None))
         if safe and qs.filter(permalink=permalink).exists():
-            permalink = "/".join(
-                permalink.split("/")[:-1] + [slugify(uuid4(), allow_unicode=True)]
-            )
+            permalink = self.disambiguate_permalink(permalink)
         return permalink
 
+    def rebuild_descendant_permalinks(self) -> int:
+        """Recompute the permalinks below this page in bulk.
+
+        See :func:`camomilla.tree.rebuild_subtree_permalinks`.
+        """
+        from camomilla.tree import rebuild_subtree_permalinks
+
+        return rebuild_subtree_permalinks(self)
+
     def update_childs(self) -> None:
+        """Save every direct child, one by one.
+
+        Saves cascade down the tree. :meth:`save` no longer goes through
+        here; it rebuilds descendant permalinks in bulk instead.
+        """
         # without pk, no childs there
         if self.pk is not None:
             exclude_kwargs = {}
             if self.childs.model == self.__class__:
                 exclude_kwargs["pk"] = self.pk
             for child in self.childs.exclude(**exclude_kwargs):
+                child._permalink_sources_snapshot = None
                 child.save()
 
+    def _sync_url_node_visibility(self) -> None:
+        values = {
+            node_column: getattr(self, page_column)
+            for node_column, page_column in url_node_visibility_columns(type(self))
+        }
+        # Without the node in memory, writing beats reading it first.
+        node_cached = self._meta.get_field("url_node").is_cached(self)
+        if node_cached and all(
+            getattr(self.url_node, key) == value for key, value in values.items()
+        ):
+            return
+        UrlNode._base_manager.filter(pk=self.url_node_id).update(**values)
+        if node_cached:
+            for key, value in values.items():
+                setattr(self.url_node, key, value)
+
+    def _sync_url_node_tree_path(self) -> None:
+        from camomilla.tree import sync_tree_path
+
+        sync_tree_path(self)
+
     def save(self, *args, **kwargs) -> None:
+        url_node_changed = self.permalink_sources_changed()
         with transaction.atomic():
-            self._update_url_node()
+            if url_node_changed:
+                self._update_url_node()
             super().save(*args, **kwargs)
+            self._sync_url_node_visibility()
+            if url_node_changed:
+                self._sync_url_node_tree_path()
             self.__cached_db_instance = None
             for lang_p_field in UrlNode.LANG_PERMALINK_FIELDS:
                 hasattr(self, f"__{lang_p_field}") and delattr(
                     self, f"__{lang_p_field}"
                 )
+            self._snapshot_permalink_sources()
 
     @classmethod
     def get(cls, request: HttpRequest, *args, **kwargs) -> "AbstractPage":
@@ -781,9 +1047,9 @@ class AbstractPage(SeoMixin, MetaMixin, models.Model, metaclass=PageBase):
             path = request.path
             if getattr(django_settings, "APPEND_SLASH", True):
                 path = path.rstrip("/")
-            node = UrlNode.objects.filter(
-                permalink=url_lang_decompose(path)["permalink"]
-            ).first()
+            from camomilla.routing import resolve_url_node
+
+            node = resolve_url_node(url_lang_decompose(path)["permalink"])
             page = node and node.page
         type_error = not bypass_type_check and not isinstance(page, cls)
         public_error = not bypass_public_check and not getattr(
@@ -883,40 +1149,44 @@ def auto_delete_url_node(sender, instance, **kwargs):
         instance.url_node and instance.url_node.delete()
 
 
-__url_node_history__ = {}
+@receiver(post_delete)
+def auto_delete_drafts(sender, instance, **kwargs):
+    # Nothing cascades through the generic key of a draft.
+    if issubclass(sender, AbstractPage):
+        instance._drafts().delete()
+
+
+@receiver(post_delete, sender=UrlNode)
+def detach_url_node_subtree(sender, instance, **kwargs):
+    # Nodes below survive when their page's parent key is nullable: they
+    # become roots.
+    if instance.tree_path:
+        UrlNode._base_manager.filter(tree_path__startswith=instance.tree_path).update(
+            tree_path=Concat(
+                Value("/"),
+                Substr("tree_path", len(instance.tree_path) + 1),
+                output_field=models.CharField(),
+            )
+        )
 
 
 @receiver(pre_save, sender=UrlNode)
 def cache_url_node(sender, instance, **kwargs):
     if instance.pk:
-        __url_node_history__[instance.pk] = sender.objects.filter(
-            pk=instance.pk
-        ).first()
+        instance._previous_permalinks = (
+            sender._base_manager.filter(pk=instance.pk)
+            .values(*UrlNode.LANG_PERMALINK_FIELDS)
+            .first()
+        )
 
 
 @receiver(post_save, sender=UrlNode)
 def generate_redirects(sender, instance, **kwargs):
-    previous = __url_node_history__.pop(instance.pk, None)
-    if previous:
-        redirects = []
-        with transaction.atomic():
-            for lang in activate_languages():
-                new_permalink = get_nofallbacks(instance, "permalink")
-                old_permalink = get_nofallbacks(previous, "permalink")
-                UrlRedirect.objects.filter(
-                    from_url=new_permalink, language_code=lang
-                ).delete()
-                if old_permalink and old_permalink != new_permalink:
-                    redirects.append(
-                        UrlRedirect(
-                            from_url=old_permalink,
-                            to_url=new_permalink,
-                            url_node=instance,
-                            language_code=lang,
-                        )
-                    )
-                    UrlRedirect.objects.filter(
-                        to_url=old_permalink, language_code=lang
-                    ).update(to_url=new_permalink)
-            if len(redirects) > 0:
-                UrlRedirect.objects.bulk_create(redirects)
+    previous = instance.__dict__.pop("_previous_permalinks", None)
+    if not previous:
+        return
+    renamed = {}
+    for lang in settings.LANGUAGE_CODES:
+        field = localized_fieldname("permalink", lang, UrlNode)
+        renamed[lang] = (previous[field], getattr(instance, field))
+    UrlRedirect.objects.redirect_renames(instance, renamed)
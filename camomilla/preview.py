@@ -19,6 +19,10 @@ revision so editors can revert to any previous published state.
 
 from __future__ import annotations
 
+import time
+from datetime import timedelta
+from typing import Any, List, NamedTuple, Optional
+
 
 def reversion_available() -> bool:
     try:
@@ -80,27 +84,129 @@ def _all_subclasses(cls):
     return seen
 
 
+def _load_draft_pages(drafts):
+    """Yield ``(draft, page)`` pairs, loading pages in one query per model.
+
+    Orphaned drafts (page deleted out from under them) are skipped.
+    """
+    from django.contrib.contenttypes.models import ContentType
+
+    drafts = list(drafts)
+    ids_by_type = {}
+    for draft in drafts:
+        ids_by_type.setdefault(draft.content_type_id, set()).add(draft.object_id)
+    pages = {}
+    for content_type_id, ids in ids_by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        for pk, page in model._default_manager.in_bulk(ids).items():
+            pages[content_type_id, pk] = page
+    for draft in drafts:
+        page = pages.get((draft.content_type_id, draft.object_id))
+        if page is not None:
+            yield draft, page
+
+
+def _draft_publish_language(draft):
+    from camomilla.models.draft import NO_LANGUAGE
+
+    return (draft.language or None) if draft.language != NO_LANGUAGE else None
+
+
 def resolve_scheduled_pages():
     """Yield ``(page, language_code)`` pairs whose draft is due to publish.
 
-    The cron worklist is :meth:`Draft.objects.due_now`. Iterating Drafts
+    The cron worklist is :meth:`Draft.objects.due_now`, drafts whose page
+    is gone left out (failed ones are retried on every run). Iterating Drafts
     directly (instead of cycling pages × languages) is both faster and
     correct by construction — ``Draft.language`` carries the language code
-    explicitly, so there's no need to probe per-language columns.
+    explicitly, so there's no need to probe per-language columns. Pages are
+    loaded in one query per page model.
 
     The caller activates the yielded language before invoking
     ``page.publish()`` so the per-language ``published_at_<lang>`` stamp
     lands on the right column.
     """
-    from camomilla.models.draft import Draft, NO_LANGUAGE
+    from camomilla.models.draft import Draft
 
-    for draft in Draft.objects.due_now().select_related("content_type"):
-        page = draft.content_object
-        if page is None:
-            # Orphaned draft (page was deleted out from under it). Skip;
-            # cron will leave it for cleanup.
-            continue
-        yield page, (draft.language or None) if draft.language != NO_LANGUAGE else None
+    for draft, page in _load_draft_pages(Draft.objects.due_now().live()):
+        yield page, _draft_publish_language(draft)
+
+
+def mark_scheduled_publish_failed(page, language: Optional[str]) -> None:
+    """Flag the due draft of ``page`` in ``language`` as failed to publish.
+
+    Failed drafts no longer hold back the zero-query ``publish_if_due``
+    (see :mod:`camomilla.due_drafts`) nor the daemon's batches.
+    """
+    from camomilla.models.draft import NO_LANGUAGE, Draft
+
+    Draft.objects.for_(page, language=language or NO_LANGUAGE).due_now().mark_failed()
+
+
+class ScheduledPublish(NamedTuple):
+    """Outcome of one publish run by :func:`publish_due_drafts`."""
+
+    page: Any
+    language: Optional[str]
+    # Seconds between ``scheduled_for`` and the end of the publish.
+    lag: float
+    # Seconds spent publishing.
+    duration: float
+    error: Optional[Exception] = None
+
+
+def publish_due_drafts(
+    batch_size: int = 10, retry_after: float = 300
+) -> List[ScheduledPublish]:
+    """Claim up to ``batch_size`` due drafts and publish their pages.
+
+    The drafts are claimed with ``SELECT … FOR UPDATE SKIP LOCKED`` where
+    the backend supports it, so several workers (processes or nodes) can
+    drain the queue in parallel without publishing a draft twice. Claim
+    and publishes share one transaction: the locks are held until every
+    page of the batch is published. A failing publish is rolled back on
+    its own, reported with its ``error`` and its draft marked failed: it
+    isn't claimed again for ``retry_after`` seconds, so drafts that keep
+    failing can't fill every batch. Drafts whose page is gone are never
+    claimed.
+    """
+    from django.db import connection, transaction
+    from django.utils import timezone, translation
+
+    from camomilla.models.draft import Draft
+
+    results = []
+    with transaction.atomic():
+        drafts = (
+            Draft.objects.due_now()
+            .live()
+            .retryable(timedelta(seconds=retry_after))
+            .order_by("scheduled_for")
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            drafts = drafts.select_for_update(skip_locked=True)
+        for draft, page in _load_draft_pages(drafts[:batch_size]):
+            language = _draft_publish_language(draft)
+            started = time.monotonic()
+            error = None
+            try:
+                with transaction.atomic(), translation.override(language):
+                    page.publish(comment="Scheduled publish")
+            except Exception as exc:  # noqa: BLE001
+                error = exc
+                Draft.objects.filter(pk=draft.pk).mark_failed()
+            results.append(
+                ScheduledPublish(
+                    page=page,
+                    language=language,
+                    lag=(timezone.now() - draft.scheduled_for).total_seconds(),
+                    duration=time.monotonic() - started,
+                    error=error,
+                )
+            )
+    return results
 
 
 __all__ = [
@@ -108,4 +214,7 @@ __all__ = [
     "register_page_for_revisions",
     "auto_register_page_models",
     "resolve_scheduled_pages",
+    "mark_scheduled_publish_failed",
+    "ScheduledPublish",
+    "publish_due_drafts",
 ]
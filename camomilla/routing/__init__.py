@@ -0,0 +1,30 @@
+from .redirects import (
+    RedirectHitBuffer,
+    RedirectIndex,
+    find_redirect,
+    redirect_hits,
+    redirect_index,
+)
+from .table import (
+    RouteEntry,
+    RouteTable,
+    record_route_changes,
+    resolve_url_node,
+    route_table,
+    warm_route_table,
+)
+
+
+__all__ = [
+    "RedirectHitBuffer",
+    "RedirectIndex",
+    "RouteEntry",
+    "RouteTable",
+    "find_redirect",
+    "record_route_changes",
+    "redirect_hits",
+    "redirect_index",
+    "resolve_url_node",
+    "route_table",
+    "warm_route_table",
+]
@@ -0,0 +1,75 @@
+import threading
+from typing import Callable, Hashable
+
+from django.db import connection, transaction
+
+from camomilla import settings
+from camomilla.utils.cache import keeps_versions, shares_versions
+
+# ``RouteTable`` / ``RedirectIndex`` generation before the first build.
+NOT_BUILT = object()
+
+
+def indexes_enabled() -> bool:
+    """Whether lookups go through the in-memory routing indexes.
+
+    ``CAMOMILLA.ROUTER.ROUTE_TABLE.ENABLE`` left to ``None`` turns them on
+    only when the camomilla cache is shared by every process: with
+    ``LocMemCache`` a worker would never hear about changes made by the
+    others. ``True`` forces them on (fine for single-process servers),
+    except with ``DummyCache``, which can't keep the version counters
+    the indexes are refreshed by.
+    """
+    enabled = settings.ROUTE_TABLE_ENABLE
+    if enabled is None:
+        return shares_versions()
+    return bool(enabled) and keeps_versions()
+
+
+class TransactionAwareIndex:
+    """Bookkeeping shared by the in-memory routing indexes.
+
+    An index learns about changes from model signals, but other processes
+    must only hear about them once the transaction commits. In between,
+    the writing thread can't trust the index (it doesn't hold the
+    uncommitted rows yet), so it asks :meth:`in_uncommitted_change` and
+    goes to the database instead.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    @property
+    def _uncommitted(self) -> dict:
+        if not hasattr(self._local, "uncommitted"):
+            self._local.uncommitted = {}
+        return self._local.uncommitted
+
+    def _track_uncommitted(self, key: Hashable, committed: Callable[[], None]) -> None:
+        pending = self._uncommitted
+
+        def callback():
+            pending.pop(key, None)
+            committed()
+
+        pending[key] = callback
+        transaction.on_commit(callback)
+
+    def _waits_for_commit(self, key: Hashable) -> bool:
+        """Whether the callback tracked under ``key`` still waits for a commit."""
+        callback = self._uncommitted.get(key)
+        return callback is not None and any(
+            entry[1] is callback for entry in connection.run_on_commit
+        )
+
+    def in_uncommitted_change(self) -> bool:
+        pending = self._uncommitted
+        if pending:
+            # Callbacks of rolled back transactions (or savepoints) are
+            # dropped by Django: only keys whose callback still waits for
+            # a commit are pending.
+            waiting = {entry[1] for entry in connection.run_on_commit}
+            for key, callback in list(pending.items()):
+                if callback not in waiting:
+                    del pending[key]
+        return bool(pending)
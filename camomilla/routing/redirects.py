@@ -0,0 +1,193 @@
+"""Process-wide ``(language_code, from_url)`` → redirect index.
+
+Every public route resolution looks for a redirect first, and almost
+none of them match. :class:`RedirectIndex` keeps all redirects in a dict
+so both ``pages_router`` and ``fetch`` answer that question from memory;
+a hit is materialized into an ``UrlRedirect`` instance without a query.
+
+Redirects change rarely, so the index is simply rebuilt (one
+``values_list`` query) whenever the ``redirects`` counter in the shared
+cache moves. ``UrlRedirect`` save/delete signals bump it once the
+transaction commits, and so do ``generate_redirects`` and
+``UrlRedirect.objects.bulk_import``, which write in bulk. Other writes
+that bypass signals must call ``redirect_index.track_change()``.
+
+Served redirects are counted by :class:`RedirectHitBuffer`, which keeps
+the counters in memory and writes them in batches (every
+``CAMOMILLA.ROUTER.REDIRECTS.HITS_FLUSH_SIZE`` redirects or
+``HITS_FLUSH_INTERVAL`` seconds) instead of once per request. They feed
+``camomilla_redirects --prune``, which only needs them to be roughly
+right: hits still buffered when a process exits are lost.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Optional, Tuple
+
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from camomilla import settings
+from camomilla.models.page import UrlRedirect
+from camomilla.utils.cache import bump_version, get_version
+
+from .base import NOT_BUILT, TransactionAwareIndex, indexes_enabled
+
+
+logger = logging.getLogger(__name__)
+
+REDIRECTS_NAMESPACE = "redirects"
+REDIRECT_FIELDS = (
+    "id",
+    "language_code",
+    "from_url",
+    "to_url",
+    "url_node_id",
+    "permanent",
+)
+
+
+class RedirectIndex(TransactionAwareIndex):
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.RLock()
+        self._redirects: Dict[Tuple[Optional[str], str], tuple] = {}
+        self._generation = NOT_BUILT
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._redirects)
+
+    def find(
+        self, from_url: str, language_code: Optional[str], refresh: bool = True
+    ) -> Optional[UrlRedirect]:
+        """Redirect registered for the already normalized ``from_url``."""
+        if refresh:
+            self.refresh()
+        row = self._redirects.get((language_code, from_url))
+        if row is None:
+            return None
+        return UrlRedirect.from_db(UrlRedirect.objects.db, REDIRECT_FIELDS, row)
+
+    def track_change(self) -> None:
+        """Record that redirects changed in the running transaction."""
+        if not indexes_enabled():
+            return
+        self._track_uncommitted(
+            REDIRECTS_NAMESPACE, lambda: bump_version(REDIRECTS_NAMESPACE)
+        )
+
+    def invalidate(self) -> None:
+        """Forget the local generation: the next lookup rebuilds."""
+        with self._lock:
+            self._generation = NOT_BUILT
+
+    def refresh(self) -> bool:
+        """Rebuild when the shared generation moved.
+
+        Returns ``False`` when the generation can't be read: the index
+        can't be trusted and callers must query the database.
+        """
+        current = get_version(REDIRECTS_NAMESPACE)
+        if current is None:
+            return False
+        if current == self._generation:
+            return True
+        with self._lock:
+            if current != self._generation:
+                self.rebuild(generation=current)
+        return True
+
+    def rebuild(self, generation: Optional[int] = None) -> None:
+        if generation is None:
+            generation = get_version(REDIRECTS_NAMESPACE)
+        if generation is None:
+            generation = NOT_BUILT
+        redirects = {
+            (row[1], row[2]): row
+            for row in UrlRedirect._base_manager.values_list(*REDIRECT_FIELDS).iterator(
+                chunk_size=2000
+            )
+        }
+        with self._lock:
+            self._redirects = redirects
+            self._generation = generation
+
+
+class RedirectHitBuffer:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits: Counter = Counter()
+        self._last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def record(self, pk: Optional[int]) -> None:
+        if pk is None:
+            return
+        with self._lock:
+            self._hits[pk] += 1
+            due = (
+                len(self._hits) >= settings.REDIRECTS_HITS_FLUSH_SIZE
+                or time.monotonic() - self._last_flush
+                >= settings.REDIRECTS_HITS_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered hits, one ``UPDATE`` per distinct count."""
+        with self._lock:
+            hits, self._hits = self._hits, Counter()
+            self._last_flush = time.monotonic()
+        if not hits:
+            return 0
+        by_count = defaultdict(list)
+        for pk, count in hits.items():
+            by_count[count].append(pk)
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                for count, pks in by_count.items():
+                    UrlRedirect._base_manager.filter(pk__in=pks).update(
+                        hits=F("hits") + count, last_hit_at=now
+                    )
+        except DatabaseError:
+            # Counters are best effort: never fail the redirect over them.
+            logger.warning("Could not flush redirect hits", exc_info=True)
+            return 0
+        return sum(hits.values())
+
+
+redirect_index = RedirectIndex()
+redirect_hits = RedirectHitBuffer()
+
+
+def find_redirect(from_url: str, language_code: Optional[str]) -> Optional[UrlRedirect]:
+    """Redirect for ``from_url`` in ``language_code``, served from the index.
+
+    Falls back to a query when the routing indexes are disabled (see
+    :func:`~camomilla.routing.base.indexes_enabled`), the index can't
+    read its generation, or the running transaction changed redirects.
+    """
+    if (
+        indexes_enabled()
+        and not redirect_index.in_uncommitted_change()
+        and redirect_index.refresh()
+    ):
+        return redirect_index.find(from_url, language_code, refresh=False)
+    return UrlRedirect.objects.filter(
+        from_url=from_url, language_code=language_code
+    ).first()
+
+
+@receiver(post_save, sender=UrlRedirect)
+@receiver(post_delete, sender=UrlRedirect)
+def redirect_changed(sender, instance, **kwargs):
+    redirect_index.track_change()
@@ -0,0 +1,367 @@
+"""Process-wide permalink → page route table.
+
+Public route resolution (``pages_router`` and the HTML ``fetch`` view)
+used to pay for a ``UrlNode`` lookup through the annotated
+``UrlNodeManager`` queryset and then for ``node.page`` on every hit. The
+:class:`RouteTable` keeps, per language, every permalink mapped to a
+:class:`RouteEntry` carrying the node pk, the concrete page relation and
+pk, and the page's visibility columns. With the table warm a miss costs
+no query at all and a hit costs one (the page, with its ``url_node``
+joined in).
+
+Freshness is driven by the ``routes`` counter in the shared cache (see
+:mod:`camomilla.utils.cache`). ``UrlNode`` / ``AbstractPage`` save and
+delete signals bump it and record the touched node pk under the new
+generation, so readers reload only the rows that changed; when the
+changelog is incomplete (evicted keys, large batches) the table is
+rebuilt from scratch.
+
+The table is built lazily on first use. Pre-forking servers can build it
+once in the master process (``warm_route_table()`` from the WSGI module
+with gunicorn's ``--preload``) so every worker starts warm and shares the
+pages copy-on-write.
+
+Inside a transaction that touched a page or node, this thread resolves
+routes through the database until the transaction ends, so it always
+reads its own writes.
+
+Writes that bypass model signals (``QuerySet.update``, ``bulk_create``)
+don't reach the table: call ``route_table.invalidate()`` after them.
+
+The table is only used when the shared cache can tell processes apart
+from stale copies (see :func:`camomilla.routing.base.indexes_enabled`);
+otherwise, or whenever the counter can't be read, routes are resolved
+through the database.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from modeltranslation.utils import build_localized_fieldname
+from modeltranslation.utils import get_language as get_translation_language
+
+from camomilla import settings
+from camomilla.models.page import AbstractPage, UrlNode
+from camomilla.utils import localized_fieldname
+from camomilla.utils.cache import bump_version, get_cache, get_version
+
+from .base import NOT_BUILT, TransactionAwareIndex, indexes_enabled
+
+
+ROUTE_TABLE_NAMESPACE = "routes"
+ROUTE_CHANGES_KEY = "camomilla:routes:changes:%s"
+ROUTE_CHANGES_TIMEOUT = 60 * 60
+# Past this many pending generations a full rebuild is cheaper than
+# replaying the changelog node by node.
+MAX_INCREMENTAL_GENERATIONS = 200
+# Larger changesets aren't logged: readers rebuild the whole table.
+MAX_CHANGESET_SIZE = 1000
+
+
+class RouteEntry(NamedTuple):
+    url_node_id: int
+    related_name: str
+    page_id: int
+    published_at: Optional[datetime]
+    deleted_at: Optional[datetime]
+    indexable: Optional[bool]
+
+    @property
+    def is_public(self) -> bool:
+        return (
+            self.deleted_at is None
+            and self.published_at is not None
+            and self.published_at <= timezone.now()
+        )
+
+
+def _languages() -> List[Optional[str]]:
+    if settings.ENABLE_TRANSLATIONS:
+        return list(settings.LANGUAGE_CODES)
+    return [None]
+
+
+def _permalink_column(language: Optional[str]) -> str:
+    return build_localized_fieldname("permalink", language) if language else "permalink"
+
+
+def _page_column(attr: str, language: Optional[str], model) -> str:
+    return localized_fieldname(attr, language, model) if language else attr
+
+
+class RouteTable(TransactionAwareIndex):
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.RLock()
+        self._routes: Dict[Optional[str], Dict[str, RouteEntry]] = {}
+        self._nodes: Dict[int, Dict[Optional[str], str]] = {}
+        self._generation = NOT_BUILT
+        self._relations = None
+
+    # -- lookup ----------------------------------------------------------
+
+    @property
+    def relations(self) -> dict:
+        if self._relations is None:
+            self._relations = {
+                rel["name"]: rel
+                for rel in UrlNode.objects.get_reverse_pages_relations()
+            }
+        return self._relations
+
+    def lookup(
+        self, permalink: str, language: Optional[str] = None, refresh: bool = True
+    ) -> Optional[RouteEntry]:
+        """Entry routed at ``permalink`` in ``language`` (default: active)."""
+        if refresh:
+            self.refresh()
+        if not settings.ENABLE_TRANSLATIONS:
+            language = None
+        elif language is None:
+            language = get_translation_language()
+        return self._routes.get(language, {}).get(permalink)
+
+    def load_page(self, entry: RouteEntry) -> Optional[AbstractPage]:
+        """Fetch the page behind ``entry`` with its ``url_node`` joined in.
+
+        Returns ``None`` (and marks the table stale) when the row moved
+        or vanished without this process hearing about it.
+        """
+        relation = self.relations.get(entry.related_name)
+        if relation is None:
+            return None
+        page = (
+            relation["model"]
+            .objects.select_related("url_node")
+            .filter(pk=entry.page_id, url_node_id=entry.url_node_id)
+            .first()
+        )
+        if page is None:
+            self.invalidate()
+            return None
+        # Let ``node.page`` answer from memory.
+        relation["field"].set_cached_value(page.url_node, page)
+        return page
+
+    # -- freshness -------------------------------------------------------
+
+    def track_change(self, node_id: Optional[int]) -> None:
+        """Record that ``node_id`` changed in the running transaction.
+
+        Other processes hear about it once the transaction commits. Until
+        then this thread routes through the database (see
+        :meth:`in_uncommitted_change`) so it reads its own writes.
+        """
+        if node_id is None or not indexes_enabled():
+            return
+        self._track_uncommitted(node_id, lambda: record_route_changes(node_id))
+
+    def track_changes(self, node_ids: Iterable[int]) -> None:
+        """Bulk :meth:`track_change`, for writes that don't send signals."""
+        node_ids = tuple(sorted({pk for pk in node_ids if pk is not None}))
+        if not node_ids or not indexes_enabled():
+            return
+        logged = node_ids if len(node_ids) <= MAX_CHANGESET_SIZE else ()
+        self._track_uncommitted(node_ids, lambda: record_route_changes(*logged))
+
+    def invalidate(self) -> None:
+        """Forget the local generation: the next lookup rebuilds."""
+        with self._lock:
+            self._generation = NOT_BUILT
+
+    def refresh(self) -> bool:
+        """Catch up with the shared generation.
+
+        Returns ``False`` when the generation can't be read (the cache
+        keeps no counter): the table can't be trusted and callers must
+        query the database.
+        """
+        current = get_version(ROUTE_TABLE_NAMESPACE)
+        if current is None:
+            return False
+        if current == self._generation:
+            return True
+        with self._lock:
+            if current == self._generation:
+                return True
+            changed = self._pending_changes(self._generation, current)
+            if changed is None:
+                self.rebuild(generation=current)
+            else:
+                self._reload_nodes(changed)
+                self._generation = current
+        return True
+
+    def rebuild(self, generation: Optional[int] = None) -> None:
+        if generation is None:
+            generation = get_version(ROUTE_TABLE_NAMESPACE)
+        if generation is None:
+            generation = NOT_BUILT
+        routes = {language: {} for language in _languages()}
+        nodes = {}
+        self._store(routes, nodes, self._fetch())
+        with self._lock:
+            self._routes, self._nodes = routes, nodes
+            self._generation = generation
+
+    def _pending_changes(self, since, until) -> Optional[set]:
+        if (
+            since is NOT_BUILT
+            or until < since
+            or until - since > MAX_INCREMENTAL_GENERATIONS
+        ):
+            return None
+        keys = [ROUTE_CHANGES_KEY % gen for gen in range(since + 1, until + 1)]
+        found = get_cache().get_many(keys)
+        if len(found) != len(keys):
+            return None
+        return {pk for pks in found.values() for pk in pks}
+
+    def _reload_nodes(self, node_ids: Iterable[int]) -> None:
+        node_ids = set(node_ids)
+        for node_id in node_ids:
+            for language, permalink in self._nodes.pop(node_id, {}).items():
+                routes = self._routes.get(language, {})
+                if (
+                    routes.get(permalink, None)
+                    and routes[permalink].url_node_id == node_id
+                ):
+                    del routes[permalink]
+        if node_ids:
+            self._store(self._routes, self._nodes, self._fetch(node_ids))
+
+    # -- loading ---------------------------------------------------------
+
+    def _fetch(self, node_ids: Optional[set] = None):
+        """Yield ``(node_id, {language: (permalink, entry)})`` rows.
+
+        One query for the nodes plus one per concrete page model. Orphan
+        nodes (no page behind them) are skipped: they can't be served.
+        """
+        languages = _languages()
+        nodes_qs = UrlNode._base_manager.all()
+        if node_ids is not None:
+            nodes_qs = nodes_qs.filter(pk__in=node_ids)
+        nodes = {}
+        by_relation = defaultdict(list)
+        for pk, related_name, *permalinks in nodes_qs.values_list(
+            "pk", "related_name", *[_permalink_column(lang) for lang in languages]
+        ).iterator(chunk_size=2000):
+            nodes[pk] = (related_name, permalinks)
+            by_relation[related_name].append(pk)
+
+        for related_name, pks in by_relation.items():
+            relation = self.relations.get(related_name)
+            if relation is None:
+                continue
+            model = relation["model"]
+            published = [
+                _page_column("published_at", lang, model) for lang in languages
+            ]
+            indexable = [_page_column("indexable", lang, model) for lang in languages]
+            pages_qs = model._base_manager.all()
+            if node_ids is None:
+                pages_qs = pages_qs.filter(url_node__isnull=False)
+            else:
+                pages_qs = pages_qs.filter(url_node_id__in=pks)
+            rows = pages_qs.values_list(
+                "url_node_id", "pk", "deleted_at", *published, *indexable
+            ).iterator(chunk_size=2000)
+            for node_id, page_id, deleted_at, *visibility in rows:
+                if node_id not in nodes:
+                    continue
+                _, permalinks = nodes[node_id]
+                routed = {}
+                for index, language in enumerate(languages):
+                    if not permalinks[index]:
+                        continue
+                    routed[language] = (
+                        permalinks[index],
+                        RouteEntry(
+                            url_node_id=node_id,
+                            related_name=related_name,
+                            page_id=page_id,
+                            published_at=visibility[index],
+                            deleted_at=deleted_at,
+                            indexable=visibility[len(languages) + index],
+                        ),
+                    )
+                yield node_id, routed
+
+    @staticmethod
+    def _store(routes: dict, nodes: dict, rows) -> None:
+        for node_id, routed in rows:
+            nodes[node_id] = {}
+            for language, (permalink, entry) in routed.items():
+                routes.setdefault(language, {})[permalink] = entry
+                nodes[node_id][language] = permalink
+
+
+route_table = RouteTable()
+
+
+def record_route_changes(*node_ids: int) -> None:
+    """Bump the route generation, logging ``node_ids`` as its changeset.
+
+    Without ``node_ids`` no changeset is logged and readers rebuild.
+    """
+    generation = bump_version(ROUTE_TABLE_NAMESPACE)[ROUTE_TABLE_NAMESPACE]
+    if not node_ids:
+        return
+    get_cache().set(
+        ROUTE_CHANGES_KEY % generation, list(node_ids), ROUTE_CHANGES_TIMEOUT
+    )
+
+
+def resolve_url_node(permalink: str) -> Optional[UrlNode]:
+    """``UrlNode`` routed at ``permalink`` in the active language.
+
+    Served from the route table when it is enabled (see
+    :func:`~camomilla.routing.base.indexes_enabled`), the returned node
+    already carrying its page. Falls back to a plain query when the
+    table is disabled, can't read its generation, is found out to be
+    stale, or when the running transaction changed routes it can't see
+    yet.
+    """
+    if (
+        indexes_enabled()
+        and not route_table.in_uncommitted_change()
+        and route_table.refresh()
+    ):
+        entry = route_table.lookup(permalink, refresh=False)
+        if entry is None:
+            return None
+        page = route_table.load_page(entry)
+        if page is not None:
+            return page.url_node
+    return UrlNode.objects.filter(permalink=permalink).first()
+
+
+def warm_route_table(close_connections: bool = True) -> None:
+    """Build the table eagerly, e.g. in a pre-fork master process.
+
+    Database connections are closed afterwards by default so forked
+    workers don't inherit (and share) the master's socket.
+    """
+    route_table.rebuild()
+    if close_connections:
+        connections.close_all()
+
+
+@receiver(post_save, sender=UrlNode)
+@receiver(post_delete, sender=UrlNode)
+def url_node_route_changed(sender, instance, **kwargs):
+    route_table.track_change(instance.pk)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def page_route_changed(sender, instance, **kwargs):
+    if issubclass(sender, AbstractPage):
+        route_table.track_change(instance.url_node_id)
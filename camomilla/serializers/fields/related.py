@@ -1,6 +1,71 @@
 from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional, Set, Tuple
+
 from rest_framework import serializers, relations
 
+from camomilla import settings
+
+NESTING_STATE = "__camomilla_nesting"
+
+
+class LazySerializer:
+    """
+    A nested serializer class built on first use.
+    Lets ``NestMixin`` declare nested relations without building the serializers of every level upfront.
+    """
+
+    def __init__(self, factory: Callable[[], type], model):
+        self.factory = factory
+        self.model = model
+
+    def resolve(self) -> type:
+        return self.factory()
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class NestingState:
+    """
+    Nested rendering bookkeeping shared by every serializer of a serialization (same ``context``):
+    the rows being rendered on the current branch, to break cycles, and the number of rows
+    rendered through nested serializers, capped by ``CAMOMILLA.API.NESTING_BUDGET``.
+    """
+
+    def __init__(self, budget: Optional[int]):
+        self.budget = budget
+        self.rendered = 0
+        self.branch: Set[Tuple[type, object]] = set()
+
+    @staticmethod
+    def key(instance) -> Tuple[type, object]:
+        return instance._meta.concrete_model, instance.pk
+
+    def can_nest(self, instance) -> bool:
+        if self.budget and self.rendered >= self.budget:
+            return False
+        return self.key(instance) not in self.branch
+
+    @contextmanager
+    def rendering(self, instance):
+        key = self.key(instance)
+        if key in self.branch or instance.pk is None:
+            yield
+            return
+        self.branch.add(key)
+        try:
+            yield
+        finally:
+            self.branch.discard(key)
+
+
+def nesting_state(context: dict) -> NestingState:
+    state = context.get(NESTING_STATE)
+    if state is None:
+        state = context[NESTING_STATE] = NestingState(settings.API_NESTING_BUDGET)
+    return state
+
 
 class RelatedField(serializers.PrimaryKeyRelatedField):
     """
@@ -15,34 +80,46 @@ class RelatedField(serializers.PrimaryKeyRelatedField):
     {"related_field": {"id": 1, "field": "value"}}
     ```
 
+    Related rows already being rendered higher up the same branch (cycles like
+    page → parent_page → …) and rows past the nesting budget are rendered as primary keys.
     """
 
     def __init__(self, **kwargs):
         self.inherited_fields_filter = kwargs.pop("inherited_fields_filter", [])
-        self.serializer = kwargs.pop("serializer", None)
+        self._serializer = kwargs.pop("serializer", None)
         self.lookup = kwargs.pop("lookup", "id")
-        if self.serializer is not None:
-            assert issubclass(
-                self.serializer, serializers.Serializer
-            ), '"serializer" is not a valid serializer class'
-            assert hasattr(
-                self.serializer.Meta, "model"
-            ), 'Class {serializer_class} missing "Meta.model" attribute'.format(
-                serializer_class=self.serializer.__class__.__name__
-            )
-            if not kwargs.get("read_only", False):
-                kwargs["queryset"] = kwargs.get(
-                    "queryset", self.serializer.Meta.model.objects.all()
+        if self._serializer is not None:
+            if isinstance(self._serializer, LazySerializer):
+                model = self._serializer.model
+            else:
+                assert issubclass(
+                    self._serializer, serializers.Serializer
+                ), '"serializer" is not a valid serializer class'
+                assert hasattr(
+                    self._serializer.Meta, "model"
+                ), 'Class {serializer_class} missing "Meta.model" attribute'.format(
+                    serializer_class=self._serializer.__class__.__name__
                 )
+                model = self._serializer.Meta.model
+            if not kwargs.get("read_only", False):
+                kwargs["queryset"] = kwargs.get("queryset", model.objects.all())
             self.allow_insert = kwargs.pop("allow_insert", False)
             # kwargs["allow_null"] = kwargs.get("allow_null", self.serializer.Meta.model._meta.get_field(self.source).null)
         super().__init__(**kwargs)
 
+    @property
+    def serializer(self):
+        if isinstance(self._serializer, LazySerializer):
+            self._serializer = self._serializer.resolve()
+        return self._serializer
+
     def use_pk_only_optimization(self):
-        return False if self.serializer else True
+        return False if self._serializer is not None else True
 
     def to_representation(self, instance):
-        if self.serializer:
+        state = nesting_state(self.context)
+        if self._serializer is not None and state.can_nest(instance):
+            state.rendered += 1
             kwargs = {"context": self.context}
             if self.inherited_fields_filter:
                 kwargs["inherited_fields_filter"] = self.inherited_fields_filter
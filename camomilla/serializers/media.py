@@ -70,6 +70,11 @@ class MediaSerializer(BaseModelSerializer):
         model = Media
         fields = "__all__"
 
+    @property
+    def eager_relations(self):
+        # Read by ``links``, see ``extract_serializer_optimizations``.
+        return self.Meta.model.get_foreign_fields()
+
     def get_linked_instances(self, obj):
         result = []
         links = obj.get_foreign_fields()
@@ -1,4 +1,4 @@
-from .fields import FieldsOverrideMixin
+from .fields import BuildFieldCacheMixin, FieldsOverrideMixin
 from .filter_fields import FilterFieldsMixin
 from .json import JSONFieldPatchMixin
 from .language import LangInfoMixin
@@ -10,6 +10,7 @@ from .translation import TranslationsMixin, RemoveTranslationsMixin
 
 
 __all__ = [
+    "BuildFieldCacheMixin",
     "FieldsOverrideMixin",
     "FilterFieldsMixin",
     "JSONFieldPatchMixin",
@@ -18,3 +18,26 @@ class FieldsOverrideMixin:
         ModelStructuredJSONField: StructuredJSONField,
     }
     serializer_related_field = RelatedField
+
+
+class BuildFieldCacheMixin(serializers.ModelSerializer):
+    """
+    This mixin caches the ``(field_class, field_kwargs)`` pairs ``build_field`` resolves from the model,
+    per serializer class, field and nesting depth. Only meant for the classes generated by
+    ``build_standard_model_serializer``, whose field building doesn't depend on the request.
+    Kwargs carrying a ``default`` (e.g. the ordering default, bound to the serializer instance) are never cached.
+    """
+
+    def build_field(self, field_name, info, model_class, nested_depth):
+        from camomilla.serializers.utils import _built_fields
+
+        key = (type(self), field_name, nested_depth, getattr(self, "_depth", None))
+        cached = _built_fields.get(key)
+        if cached is None:
+            cached = super().build_field(field_name, info, model_class, nested_depth)
+            if "default" in cached[1]:
+                return cached
+            _built_fields[key] = cached
+        field_class, field_kwargs = cached
+        # ``get_fields`` pops extra kwargs from the dict: hand out a copy.
+        return field_class, dict(field_kwargs)
@@ -1,4 +1,6 @@
-from camomilla.serializers.fields.related import RelatedField
+from functools import partial
+
+from camomilla.serializers.fields.related import LazySerializer, RelatedField, nesting_state
 from camomilla.serializers.utils import build_standard_model_serializer
 from camomilla import settings
 
@@ -10,6 +12,12 @@ class NestMixin:
     If the depth is not set, the serializer will use the value coming from the settings.
 
     CAMOMILLA = { "API": {"NESTING_DEPTH": 10} }
+
+    Nested serializers are built lazily, the first time a related row is rendered.
+    Rows already rendered higher up the branch are rendered as primary keys (cycle detection),
+    and so are the rows past "NESTING_BUDGET" nested rows rendered by a single serialization.
+
+    CAMOMILLA = { "API": {"NESTING_BUDGET": 1000} }
     """
 
     def __init__(self, *args, **kwargs):
@@ -29,7 +37,14 @@ class NestMixin:
         if (
             field_class is RelatedField and nested_depth > 1
         ):  # stop recursion one step before the jump :P
-            field_kwargs["serializer"] = build_standard_model_serializer(
-                relation_info[1], nested_depth - 1
+            field_kwargs["serializer"] = LazySerializer(
+                partial(
+                    build_standard_model_serializer, relation_info[1], nested_depth - 1
+                ),
+                relation_info[1],
             )
         return field_class, field_kwargs
+
+    def to_representation(self, instance):
+        with nesting_state(self.context).rendering(instance):
+            return super().to_representation(instance)
@@ -1,5 +1,16 @@
+from collections import deque
+
+from django.contrib.contenttypes.fields import GenericRelation
+from django.core.exceptions import FieldDoesNotExist
+from django.core.signals import request_started
 from rest_framework.utils import model_meta
 
+# Plans memoized by ``optimization_plan``.
+MAX_OPTIMIZATION_PLANS = 1024
+# Relations planned by ``extract_serializer_optimizations``.
+MAX_PLAN_LOOKUPS = 200
+WARM_DISPATCH_UID = "camomilla_warm_optimization_plans"
+
 
 class Optimizations:
     only = set()
@@ -11,6 +22,21 @@ class Optimizations:
         self.select_related = set()
         self.prefetch_related = set()
 
+    def add_relation(self, lookup, prefetch=False):
+        if prefetch:
+            self.prefetch_related.add(lookup)
+        else:
+            self.select_related.add(lookup)
+
+    @property
+    def size(self):
+        return len(self.select_related) + len(self.prefetch_related)
+
+    @property
+    def lookups(self):
+        """Every relation of the plan, as ``prefetch_related_objects`` lookups."""
+        return sorted(self.select_related) + sorted(self.prefetch_related)
+
     def __str__(self):
         return f"Optimizations(only={self.only}, select_related={self.select_related}, prefetch_related={self.prefetch_related})"
 
@@ -55,6 +81,65 @@ def recursive_extract_optimizations(fields, info, max_depth=100) -> Optimization
     return optimizations
 
 
+def extract_serializer_optimizations(serializer) -> Optimizations:
+    """
+    Walk the fields ``serializer`` actually renders, nested serializers included,
+    and plan the relations they read: forward to-one chains are joined with
+    select_related, everything reached through a to-many relation (m2m, reverse
+    relations, generic relations) is prefetched.
+    Relations back to a model already on the branch (page → parent_page → …) are prefetched too:
+    each level costs a query only when some row has it, instead of a join per level.
+    The plan is capped at ``MAX_PLAN_LOOKUPS``, shallow relations first.
+    Relations a serializer reads outside of its fields are listed in its ``eager_relations``.
+    """
+    optimizations = Optimizations()
+    model = serializer.Meta.model
+    queue = deque([(serializer, "", False, (model,))])
+    while queue:
+        serializer, prefix, prefetching, branch = queue.popleft()
+        model = serializer.Meta.model
+        info = model_meta.get_field_info(model)
+        for source in getattr(serializer, "eager_relations", ()):
+            optimizations.add_relation(
+                prefix + source, prefetching or info.relations[source].to_many
+            )
+        for field in serializer.fields.values():
+            source = getattr(field, "source", None) or ""
+            if field.write_only or source == "*" or "." in source:
+                continue
+            if optimizations.size >= MAX_PLAN_LOOKUPS:
+                return optimizations
+            relation = info.relations.get(source)
+            if relation is None:
+                if _is_generic_relation(model, source):
+                    optimizations.add_relation(prefix + source, True)
+                continue
+            to_many = (
+                prefetching
+                or relation.to_many
+                or relation.related_model in branch
+            )
+            optimizations.add_relation(prefix + source, to_many)
+            nested = getattr(getattr(field, "child_relation", field), "serializer", None)
+            if isinstance(nested, type) and hasattr(nested, "Meta"):
+                queue.append(
+                    (
+                        nested(context=serializer.context),
+                        f"{prefix}{source}__",
+                        to_many,
+                        branch + (relation.related_model,),
+                    )
+                )
+    return optimizations
+
+
+def _is_generic_relation(model, name) -> bool:
+    try:
+        return isinstance(model._meta.get_field(name), GenericRelation)
+    except FieldDoesNotExist:
+        return False
+
+
 class SetupEagerLoadingMixin:
     """
     This mixin allows to use the setup_eager_loading method to optimize the queries.
@@ -68,19 +153,14 @@ class SetupEagerLoadingMixin:
 
     @classmethod
     def auto_optimize_queryset(cls, queryset, context=None):
+        context = context or {}
         request = context.get("request", None)
         if request and request.method == "GET":
-            serializer_fields = cls(context=context).fields.keys()
-            filtered_fields = set()
-            for field in request.query_params.get("fields", "").split(","):
-                filtered_fields.add(field)
-            if len(filtered_fields) == 0:
-                filtered_fields = serializer_fields
-            model = getattr(cls.Meta, "model", None)
-            if not model:
-                return queryset
-            optimizations = recursive_extract_optimizations(
-                filtered_fields, model_meta.get_field_info(model)
+            optimizations = optimization_plan(
+                cls,
+                request.query_params.get("fields", ""),
+                request.query_params.get("included_translations", ""),
+                context.get("action"),
             )
             if len(optimizations.only) > 0:
                 queryset = queryset.only(*optimizations.only)
@@ -89,3 +169,73 @@ class SetupEagerLoadingMixin:
             if len(optimizations.prefetch_related) > 0:
                 queryset = queryset.prefetch_related(*optimizations.prefetch_related)
         return queryset
+
+
+def optimization_plan(
+    serializer_class,
+    fields: str = "",
+    included_translations: str = "",
+    action: str = None,
+) -> Optimizations:
+    """Optimizations for ``serializer_class`` given the raw ``fields`` and
+    ``included_translations`` query params.
+
+    Without ``fields`` the plan covers the whole nested output of the
+    serializer (see :func:`extract_serializer_optimizations`), planned for
+    the viewset ``action`` since some serializers render differently on lists.
+
+    Plans are memoized (up to ``MAX_OPTIMIZATION_PLANS``, the params come
+    from the client) and cleared with the serializer registry, see
+    :func:`camomilla.serializers.utils.clear_serializer_registry`. Treat the
+    returned object as read-only.
+    """
+    from camomilla.serializers.utils import _optimization_plans
+
+    key = (serializer_class, fields, included_translations, action)
+    optimizations = _optimization_plans.get(key)
+    if optimizations is None:
+        model = getattr(getattr(serializer_class, "Meta", None), "model", None)
+        if model is None:
+            optimizations = Optimizations()
+        elif not fields:
+            optimizations = extract_serializer_optimizations(
+                serializer_class(context={"action": action})
+            )
+        else:
+            optimizations = recursive_extract_optimizations(
+                set(fields.split(",")), model_meta.get_field_info(model)
+            )
+        if len(_optimization_plans) < MAX_OPTIMIZATION_PLANS:
+            _optimization_plans[key] = optimizations
+    return optimizations
+
+
+def warm_optimization_plans(serializer_classes=None) -> None:
+    """Plan the default optimizations of ``serializer_classes`` list endpoints upfront.
+
+    Defaults to the serializers of the core API viewsets.
+    """
+    if serializer_classes is None:
+        from camomilla import views
+
+        serializer_classes = {
+            getattr(view, "serializer_class", None) for view in vars(views).values()
+        }
+    for serializer_class in serializer_classes:
+        if isinstance(serializer_class, type) and issubclass(
+            serializer_class, SetupEagerLoadingMixin
+        ):
+            optimization_plan(serializer_class, action="list")
+
+
+def warm_optimization_plans_on_first_request() -> None:
+    """Run :func:`warm_optimization_plans` once, when the first request starts.
+
+    Planning builds the serializer fields, which needs every app ready.
+    """
+
+    def warm(sender, **kwargs):
+        request_started.disconnect(dispatch_uid=WARM_DISPATCH_UID)
+        warm_optimization_plans()
+
+    request_started.connect(warm, weak=False, dispatch_uid=WARM_DISPATCH_UID)
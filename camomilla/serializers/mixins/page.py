@@ -1,3 +1,4 @@
+from django.db import models
 from rest_framework import serializers
 from camomilla.models import UrlNode
 from camomilla.serializers.validators import UniquePermalinkValidator
@@ -8,6 +9,25 @@ from structured.contrib.restframework import StructuredModelSerializer
 if TYPE_CHECKING:
     from camomilla.models.page import AbstractPage
 
+# Popped from the child's kwargs by ``many_init`` (DRF < 3.14 only knew
+# ``allow_empty``).
+LIST_SERIALIZER_KWARGS_REMOVE = getattr(
+    serializers, "LIST_SERIALIZER_KWARGS_REMOVE", ("allow_empty",)
+)
+
+
+class PageListSerializer(serializers.ListSerializer):
+    """
+    Lists of pages load the ancestors (breadcrumbs) of every page at once.
+    """
+
+    def to_representation(self, data):
+        from camomilla.tree import prefetch_ancestors
+
+        pages = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        prefetch_ancestors(pages)
+        return super().to_representation(pages)
+
 
 class AbstractPageMixin(StructuredModelSerializer, serializers.ModelSerializer):
     """
@@ -43,6 +63,33 @@ class AbstractPageMixin(StructuredModelSerializer, serializers.ModelSerializer):
     # them off the default serializer prevents the public ``pages-router``
     # from revealing whether a page has pending edits.
 
+    # Read by ``routerlink`` / ``permalink`` and planned with the nested
+    # relations, see ``extract_serializer_optimizations``.
+    eager_relations = ("url_node",)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        # ``BaseSerializer.many_init``, with ``PageListSerializer`` as the
+        # default list class instead of ``ListSerializer``.
+        list_kwargs = {}
+        for key in LIST_SERIALIZER_KWARGS_REMOVE:
+            value = kwargs.pop(key, None)
+            if value is not None:
+                list_kwargs[key] = value
+        list_kwargs["child"] = cls(*args, **kwargs)
+        list_kwargs.update(
+            {
+                key: value
+                for key, value in kwargs.items()
+                if key in serializers.LIST_SERIALIZER_KWARGS
+            }
+        )
+        meta = getattr(cls, "Meta", None)
+        list_serializer_class = getattr(
+            meta, "list_serializer_class", PageListSerializer
+        )
+        return list_serializer_class(*args, **list_kwargs)
+
     def get_template_file(self, instance: "AbstractPage"):
         return instance.get_template_path()
 
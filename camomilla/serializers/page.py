@@ -1,3 +1,4 @@
+from camomilla.instrumentation import span
 from camomilla.models.page import UrlNode
 from camomilla.serializers.mixins import AbstractPageMixin
 from camomilla.models import Content, Page
@@ -5,7 +6,9 @@ from camomilla.serializers.base import BaseModelSerializer
 from rest_framework import serializers
 from django.utils.translation import get_language
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import prefetch_related_objects
 
+from camomilla.serializers.mixins.optimize import optimization_plan
 from camomilla.serializers.utils import (
     build_standard_model_serializer,
     get_standard_bases,
@@ -64,6 +67,7 @@ class RouteSerializer(UrlNodeSerializer):
             return {}
         return {c.identifier: {"id": c.id, "content": c.content} for c in related.all()}
 
+    @span("serialize")
     def to_representation(self, instance: UrlNode):
         standard_serializer = instance.page.get_serializer()
         model_serializer = build_standard_model_serializer(
@@ -71,6 +75,13 @@ class RouteSerializer(UrlNodeSerializer):
             depth=10,
             bases=(standard_serializer,) + get_standard_bases(),
         )
+        # Load the whole nested output of the page (and its ``contents``) in
+        # a fixed number of queries instead of one per related row.
+        prefetch_related_objects(
+            [instance.page],
+            "contents",
+            *optimization_plan(model_serializer, action="retrieve").lookups,
+        )
         return {
             **super().to_representation(instance),
             **model_serializer(instance.page, context=self.context).data,
@@ -78,4 +89,5 @@ class RouteSerializer(UrlNodeSerializer):
 
     class Meta:
         model = UrlNode
-        fields = "__all__"
+        # ``tree_path`` is bookkeeping, rewritten in bulk when pages move.
+        exclude = ("tree_path",)
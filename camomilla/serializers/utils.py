@@ -1,4 +1,17 @@
-from typing import Optional, Tuple, Type
+from typing import Dict, Optional, Tuple, Type
+
+from django.core.signals import setting_changed
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
+
+# Serializer classes generated by ``build_standard_model_serializer``,
+# keyed by ``(model, depth, bases, name_suffix)``.
+_serializer_classes: Dict[tuple, type] = {}
+# ``build_field`` results of those classes (see ``BuildFieldCacheMixin``).
+_built_fields: Dict[tuple, tuple] = {}
+# Queryset optimizations per serializer class and query params (see
+# ``camomilla.serializers.mixins.optimize.optimization_plan``).
+_optimization_plans: Dict[tuple, object] = {}
 
 
 def get_standard_bases() -> tuple:
@@ -13,6 +26,7 @@ def get_standard_bases() -> tuple:
     """
     from rest_framework.serializers import ModelSerializer
     from camomilla.serializers.mixins import (
+        BuildFieldCacheMixin,
         JSONFieldPatchMixin,
         NestMixin,
         OrderingMixin,
@@ -30,6 +44,7 @@ def get_standard_bases() -> tuple:
         JSONFieldPatchMixin,
         OrderingMixin,
         RemoveTranslationsMixin,
+        BuildFieldCacheMixin,
         ModelSerializer,
     )
 
@@ -47,12 +62,12 @@ def get_editable_bases(page_mixin: Optional[Type] = None) -> tuple:
     falls back to ``AbstractPageMixin``.
     """
     from camomilla.serializers.base import BaseModelSerializer
-    from camomilla.serializers.mixins import AbstractPageMixin
+    from camomilla.serializers.mixins import AbstractPageMixin, BuildFieldCacheMixin
 
     base = page_mixin or AbstractPageMixin
     if not isinstance(base, type) or not issubclass(base, AbstractPageMixin):
         base = AbstractPageMixin
-    return (base, BaseModelSerializer)
+    return (base, BaseModelSerializer, BuildFieldCacheMixin)
 
 
 def build_standard_model_serializer(
@@ -78,14 +93,39 @@ def build_standard_model_serializer(
         Suffix used to compose the dynamically-generated class name.
         ``"Standard"`` for read serializers, ``"Draft"`` (or similar)
         for write ones — appears in tracebacks and debugger output.
+
+    Classes are memoized per ``(model, depth, bases, name_suffix)``: hot
+    paths (``RouteSerializer``, nested relations, draft application) get
+    the same class back, and with it the fields cached by
+    :class:`~camomilla.serializers.mixins.BuildFieldCacheMixin`.
     """
     if bases is None:
         bases = get_standard_bases()
-    meta_attrs = {"model": model, "fields": "__all__"}
-    if depth is not None:
-        meta_attrs["depth"] = depth
-    return type(
-        f"{model.__name__}{name_suffix}Serializer",
-        bases,
-        {"Meta": type("Meta", (object,), meta_attrs)},
-    )
+    key = (model, depth, tuple(bases), name_suffix)
+    serializer = _serializer_classes.get(key)
+    if serializer is None:
+        meta_attrs = {"model": model, "fields": "__all__"}
+        if depth is not None:
+            meta_attrs["depth"] = depth
+        serializer = type(
+            f"{model.__name__}{name_suffix}Serializer",
+            tuple(bases),
+            {"Meta": type("Meta", (object,), meta_attrs)},
+        )
+        serializer = _serializer_classes.setdefault(key, serializer)
+    return serializer
+
+
+def clear_serializer_registry() -> None:
+    """Forget the memoized serializer classes, their cached fields and the
+    queryset optimization plans."""
+    _serializer_classes.clear()
+    _built_fields.clear()
+    _optimization_plans.clear()
+
+
+@receiver(setting_changed)
+@receiver(class_prepared)
+def _reset_serializer_registry(**kwargs):
+    # New settings or models may change what the serializers would build.
+    clear_serializer_registry()
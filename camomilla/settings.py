@@ -120,6 +120,9 @@ MEDIA_RENDITIONS_PREVENT_INFLATE = pointed_getter(
 )
 
 API_NESTING_DEPTH = pointed_getter(django_settings, "CAMOMILLA.API.NESTING_DEPTH", 10)
+API_NESTING_BUDGET = pointed_getter(
+    django_settings, "CAMOMILLA.API.NESTING_BUDGET", 1000
+)
 
 AUTO_CREATE_HOMEPAGE = pointed_getter(
     django_settings, "CAMOMILLA.RENDER.AUTO_CREATE_HOMEPAGE", True
@@ -149,13 +152,59 @@ PAGE_ROUTER_CACHE = pointed_getter(
     django_settings, "CAMOMILLA.API.PAGES.ROUTER_CACHE", 60 * 15
 )
 
+MENU_ROUTER_CACHE = pointed_getter(
+    django_settings, "CAMOMILLA.API.MENUS.ROUTER_CACHE", 60 * 15
+)
+
+HTML_CACHE_ENABLE = pointed_getter(
+    django_settings, "CAMOMILLA.RENDER.HTML_CACHE.ENABLE", False
+)
+
+HTML_CACHE_TIMEOUT = pointed_getter(
+    django_settings, "CAMOMILLA.RENDER.HTML_CACHE.TIMEOUT", 60 * 15
+)
+
+PAGE_TREE_DEPTH = pointed_getter(django_settings, "CAMOMILLA.API.PAGES.TREE_DEPTH", 3)
+
+ROUTE_TABLE_ENABLE = pointed_getter(
+    django_settings, "CAMOMILLA.ROUTER.ROUTE_TABLE.ENABLE", None
+)
+
+REDIRECTS_HITS_FLUSH_INTERVAL = pointed_getter(
+    django_settings, "CAMOMILLA.ROUTER.REDIRECTS.HITS_FLUSH_INTERVAL", 60
+)
+
+REDIRECTS_HITS_FLUSH_SIZE = pointed_getter(
+    django_settings, "CAMOMILLA.ROUTER.REDIRECTS.HITS_FLUSH_SIZE", 500
+)
+
+REDIRECTS_RETENTION_DAYS = pointed_getter(
+    django_settings, "CAMOMILLA.ROUTER.REDIRECTS.RETENTION_DAYS", 365
+)
+
+SITEMAP_SHARD_SIZE = pointed_getter(
+    django_settings, "CAMOMILLA.SITEMAP.SHARD_SIZE", 50000
+)
+
+CACHE_ALIAS = pointed_getter(django_settings, "CAMOMILLA.CACHE.ALIAS", "default")
+
+INSTRUMENTATION_SLOW_QUERY_MS = pointed_getter(
+    django_settings, "CAMOMILLA.INSTRUMENTATION.SLOW_QUERY_MS", 100
+)
+
+INSTRUMENTATION_SERVER_TIMING = pointed_getter(
+    django_settings, "CAMOMILLA.INSTRUMENTATION.SERVER_TIMING", True
+)
+
 DEBUG = pointed_getter(django_settings, "CAMOMILLA.DEBUG", django_settings.DEBUG)
 
 # camomilla settings example
 # CAMOMILLA = {
 #     "PROJECT_TITLE": "",
 #     "ROUTER": {
-#         "BASE_URL": ""
+#         "BASE_URL": "",
+#         "ROUTE_TABLE": {"ENABLE": None},
+#         "REDIRECTS": {"HITS_FLUSH_INTERVAL": 60, "HITS_FLUSH_SIZE": 500, "RETENTION_DAYS": 365}
 #     },
 #     "MEDIA": {
 #         "OPTIMIZE": {"MAX_WIDTH": 1980, "MAX_HEIGHT": 1400, "DPI": 30, "JPEG_QUALITY": 85, "ENABLE": True},
@@ -185,7 +234,8 @@ DEBUG = pointed_getter(django_settings, "CAMOMILLA.DEBUG", django_settings.DEBUG
 #         "AUTO_CREATE_HOMEPAGE": True,
 #         "ARTICLE": {"DEFAULT_TEMPLATE": "", "INJECT_CONTEXT": None },
 #         "PAGE": {"DEFAULT_TEMPLATE": "", "INJECT_CONTEXT": None }
-#         "REGISTERED_TEMPLATE_APPS": []
+#         "REGISTERED_TEMPLATE_APPS": [],
+#         "HTML_CACHE": {"ENABLE": False, "TIMEOUT": 60 * 15}
 #     },
 #     "STRUCTURED_FIELD": {
 #         "CACHE_ENABLED": True
@@ -198,11 +248,26 @@ DEBUG = pointed_getter(django_settings, "CAMOMILLA.DEBUG", django_settings.DEBUG
 #     }
 #     "API": {
 #         "NESTING_DEPTH": 10,
+#         "NESTING_BUDGET": 1000,
 #         "TRANSLATION_ACCESSOR": "translations",
 #         "PAGES": {
-#             "DEFAULT_SERIALIZER": "camomilla.serializers.page.RouteSerializer"
+#             "DEFAULT_SERIALIZER": "camomilla.serializers.page.RouteSerializer",
+#             "TREE_DEPTH": 3,
+#             "ROUTER_CACHE": 60 * 15
 #         },
-#         "ROUTER_CACHE": 60 * 15
+#         "MENUS": {
+#             "ROUTER_CACHE": 60 * 15
+#         }
+#     },
+#     "SITEMAP": {
+#         "SHARD_SIZE": 50000
+#     },
+#     "CACHE": {
+#         "ALIAS": "default"
+#     },
+#     "INSTRUMENTATION": {
+#         "SLOW_QUERY_MS": 100,
+#         "SERVER_TIMING": True
 #     },
 #     "DEBUG": False
 # }
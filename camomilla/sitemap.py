@@ -1,5 +1,67 @@
+"""Sitemaps for camomilla pages.
+
+:class:`PagesSitemapGenerator` streams ``<url>`` entries straight from
+the ``UrlNode`` table: public, indexable nodes are read in keyset-paginated
+chunks, and each node yields one entry per language it is public in,
+with ``xhtml:link`` alternates built from the same row (the node carries
+every language's permalink and visibility columns, so no page is loaded
+unless its model defines ``changefreq``, ``priority`` or ``lastmod``).
+
+Past ``CAMOMILLA.SITEMAP.SHARD_SIZE`` urls (50k, the protocol limit) the
+:func:`sitemap` view answers with a sitemap index pointing to numbered
+shards::
+
+    # <project_name>/urls.py
+    from camomilla.sitemap import sitemap
+
+    urlpatterns += [
+        path("sitemap.xml", sitemap, name="camomilla-sitemap"),
+        path("sitemap-<int:shard>.xml", sitemap, name="camomilla-sitemap-shard"),
+    ]
+
+Shard boundaries are found by walking the node pks in keyset order, one
+query per shard, and stored in the camomilla cache: the index and the
+shard requests that follow it share them. The stored boundaries are
+dropped when a url node is saved or deleted, and after
+``BOUNDS_TIMEOUT`` at most (visibility columns written in bulk don't
+send signals); stale ones still cover every node, shards only drift
+from their nominal size until then.
+
+``camomilla_sitemap`` pre-generates the same files, gzipped, on disk.
+:class:`CamomillaPagesSitemap` remains for projects that build their
+sitemap with ``django.contrib.sitemaps``.
+"""
+
+import hashlib
+from datetime import datetime
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape
+
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from camomilla import settings
 from camomilla.models import UrlNode
+from camomilla.utils import localized_fieldname
+from camomilla.utils.cache import bump_version_on_commit, get_cache, get_version
+
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+XHTML_NS = "http://www.w3.org/1999/xhtml"
+SITEMAP_SHARD_URL_NAME = "camomilla-sitemap-shard"
+CHUNK_SIZE = 2000
+PAGE_HOOKS = ("changefreq", "priority", "lastmod")
+ATTRIBUTE_ENTITIES = {'"': "&quot;"}
+SITEMAP_NAMESPACE = "sitemap"
+BOUNDS_KEY = "camomilla:sitemap:bounds:%s:%s:%s"
+BOUNDS_TIMEOUT = 60 * 60
 
 
 class CamomillaPagesSitemap(Sitemap):
@@ -13,11 +75,11 @@ class CamomillaPagesSitemap(Sitemap):
 
     def priority(self, obj):
         if hasattr(obj.page.__class__, "priority"):
-            return obj.priority
+            return obj.page.priority
         return self.priority_default
 
     def items(self):
-        return UrlNode.objects.filter(is_public=True)
+        return UrlNode.objects.public().with_pages().order_by("pk")
 
     def lastmod(self, obj):
         if hasattr(obj.page.__class__, "lastmod"):
@@ -28,3 +90,351 @@ class CamomillaPagesSitemap(Sitemap):
 camomilla_sitemaps = {
     "pages": CamomillaPagesSitemap,
 }
+
+
+class SitemapEntry(NamedTuple):
+    loc: str
+    lastmod: Optional[datetime]
+    changefreq: Optional[str]
+    priority: Optional[float]
+    alternates: Tuple[Tuple[str, str], ...] = ()
+
+
+class NodeRow(NamedTuple):
+    pk: int
+    related_name: str
+    date_updated_at: Optional[datetime]
+    # Per language, in ``generator.languages`` order.
+    permalinks: Tuple[Optional[str], ...]
+    public: Tuple[bool, ...]
+
+
+class ShardInfo(NamedTuple):
+    number: int
+    after: int
+    until: int
+    count: int
+    lastmod: Optional[datetime]
+    digest: str
+
+
+class PagesSitemapGenerator:
+    changefreq_default = "daily"
+    priority_default = 0.5
+
+    def __init__(
+        self,
+        base_url: str = "",
+        shard_size: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.shard_size = shard_size or settings.SITEMAP_SHARD_SIZE
+        self.now = now or timezone.now()
+        self.languages: List[Optional[str]] = (
+            list(settings.LANGUAGE_CODES) if settings.ENABLE_TRANSLATIONS else [None]
+        )
+        self._models = None
+
+    # -- selection -------------------------------------------------------
+
+    @property
+    def nodes_per_shard(self) -> int:
+        """Nodes per shard: each node yields up to one url per language."""
+        return max(1, self.shard_size // len(self.languages))
+
+    def _column(self, attr: str, language: Optional[str]) -> str:
+        return localized_fieldname(attr, language, UrlNode) if language else attr
+
+    def queryset(self):
+        """Nodes public and indexable in at least one language."""
+        visible = [
+            Q(**{f"{self._column('published_at', lang)}__lte": self.now})
+            & ~Q(**{self._column("indexable", lang): False})
+            for lang in self.languages
+        ]
+        return UrlNode._base_manager.filter(
+            reduce(or_, visible), deleted_at__isnull=True
+        ).order_by("pk")
+
+    def count(self) -> int:
+        return self.queryset().count()
+
+    def shard_count(self) -> int:
+        return len(self.bounds())
+
+    def bounds(self) -> List[int]:
+        """The ``after`` pk of every shard, the first one's being ``0``.
+
+        Walks the pks in keyset order: each query reads the pk closing a
+        shard (and the next one, to know whether another shard follows)
+        from where the previous shard ended. Stored in the camomilla cache
+        (see the module docstring).
+        """
+        key = BOUNDS_KEY % (
+            get_version(SITEMAP_NAMESPACE),
+            self.nodes_per_shard,
+            ",".join(map(str, self.languages)),
+        )
+        cache = get_cache()
+        bounds = cache.get(key)
+        if bounds is None:
+            pks = self.queryset().values_list("pk", flat=True)
+            bounds = [0]
+            # The pk closing the shard and the first one of the next.
+            first, stop = self.nodes_per_shard - 1, self.nodes_per_shard + 1
+            while True:
+                edge = list(pks.filter(pk__gt=bounds[-1])[first:stop])
+                if len(edge) < 2:
+                    break
+                bounds.append(edge[0])
+            cache.set(key, bounds, BOUNDS_TIMEOUT)
+        return bounds
+
+    def shard_bounds(self, number: int) -> Tuple[int, Optional[int]]:
+        """``(after, until)`` node pks delimiting shard ``number`` (1-based).
+
+        The last shard is open-ended (``until`` is ``None``).
+        """
+        bounds = self.bounds()
+        if not 1 <= number <= len(bounds):
+            raise Http404(f"Sitemap shard {number} does not exist.")
+        until = bounds[number] if number < len(bounds) else None
+        return bounds[number - 1], until
+
+    def rows(self, after: int = 0, until: Optional[int] = None) -> Iterator[NodeRow]:
+        """Keyset-paginated node rows with ``after < pk <= until``."""
+        permalinks = [self._column("permalink", lang) for lang in self.languages]
+        published = [self._column("published_at", lang) for lang in self.languages]
+        indexable = [self._column("indexable", lang) for lang in self.languages]
+        qs = self.queryset()
+        if until is not None:
+            qs = qs.filter(pk__lte=until)
+        qs = qs.values_list(
+            "pk", "related_name", "date_updated_at", *permalinks, *published, *indexable
+        )
+        size = len(self.languages)
+        while True:
+            chunk = list(qs.filter(pk__gt=after)[:CHUNK_SIZE])
+            for pk, related_name, updated, *columns in chunk:
+                permalink = tuple(columns[:size])
+                visibility = zip(permalink, columns[size:], columns[size * 2:])
+                yield NodeRow(
+                    pk,
+                    related_name,
+                    updated,
+                    permalink,
+                    tuple(
+                        bool(link)
+                        and published_at is not None
+                        and published_at <= self.now
+                        and is_indexable is not False
+                        for link, published_at, is_indexable in visibility
+                    ),
+                )
+            if len(chunk) < CHUNK_SIZE:
+                return
+            after = chunk[-1][0]
+
+    def shards(self) -> Iterator[ShardInfo]:
+        """Walk every node once and describe each shard.
+
+        ``digest`` changes whenever a node enters or leaves the shard, is
+        updated, is renamed, changes visibility in any language or its page
+        returns another ``changefreq``, ``priority`` or ``lastmod``.
+        """
+        number, after, until, count, lastmod = 1, 0, 0, 0, None
+        digest = hashlib.sha1()
+        for row, hooks in self._rows_with_hooks():
+            count, until = count + 1, row.pk
+            digest.update(repr((row, sorted(hooks.items()))).encode())
+            if row.date_updated_at and (lastmod is None or row.date_updated_at > lastmod):
+                lastmod = row.date_updated_at
+            if count == self.nodes_per_shard:
+                yield ShardInfo(number, after, until, count, lastmod, digest.hexdigest())
+                number, after, count, lastmod = number + 1, until, 0, None
+                digest = hashlib.sha1()
+        if count or number == 1:
+            yield ShardInfo(number, after, until, count, lastmod, digest.hexdigest())
+
+    def _rows_with_hooks(self) -> Iterator[Tuple[NodeRow, dict]]:
+        """Every node row, with the values of its page's hooks (if any)."""
+        chunk = []
+        for row in self.rows():
+            chunk.append(row)
+            if len(chunk) == CHUNK_SIZE:
+                hooks = self._page_hooks(chunk)
+                yield from ((row, hooks.get(row.pk, {})) for row in chunk)
+                chunk = []
+        hooks = self._page_hooks(chunk)
+        yield from ((row, hooks.get(row.pk, {})) for row in chunk)
+
+    # -- entries ---------------------------------------------------------
+
+    @property
+    def models(self) -> Dict[str, type]:
+        if self._models is None:
+            self._models = {
+                rel["name"]: rel["model"]
+                for rel in UrlNode.objects.get_reverse_pages_relations()
+            }
+        return self._models
+
+    def location(self, permalink: str, language: Optional[str]) -> str:
+        """Absolute url of ``permalink``; call with ``language`` active."""
+        return self.base_url + (UrlNode.reverse_url(permalink) or permalink)
+
+    def entries(self, rows: Iterable[NodeRow]) -> Iterator[SitemapEntry]:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == CHUNK_SIZE:
+                yield from self._chunk_entries(chunk)
+                chunk = []
+        if chunk:
+            yield from self._chunk_entries(chunk)
+
+    def _chunk_entries(self, rows: List[NodeRow]) -> Iterator[SitemapEntry]:
+        locations = {}
+        for index, language in enumerate(self.languages):
+            with translation.override(language):
+                for row in rows:
+                    if row.public[index]:
+                        locations[row.pk, language] = self.location(
+                            row.permalinks[index], language
+                        )
+        hooks = self._page_hooks(rows)
+        for row in rows:
+            overrides = hooks.get(row.pk, {})
+            alternates = self._alternates(row, locations)
+            for language in self.languages:
+                loc = locations.get((row.pk, language))
+                if loc is None:
+                    continue
+                yield SitemapEntry(
+                    loc=loc,
+                    lastmod=overrides.get("lastmod", row.date_updated_at),
+                    changefreq=overrides.get("changefreq", self.changefreq_default),
+                    priority=overrides.get("priority", self.priority_default),
+                    alternates=alternates,
+                )
+
+    def _alternates(self, row: NodeRow, locations: dict) -> Tuple[Tuple[str, str], ...]:
+        if len(self.languages) < 2:
+            return ()
+        alternates = [
+            (language, locations[row.pk, language])
+            for language in self.languages
+            if (row.pk, language) in locations
+        ]
+        default = locations.get((row.pk, settings.DEFAULT_LANGUAGE))
+        if default and len(alternates) > 1:
+            alternates.append(("x-default", default))
+        return tuple(alternates) if len(alternates) > 1 else ()
+
+    def _page_hooks(self, rows: List[NodeRow]) -> Dict[int, dict]:
+        """Values of page-defined ``changefreq``/``priority``/``lastmod``.
+
+        Only models defining at least one of them are queried, once per
+        model for the whole chunk.
+        """
+        by_model = {}
+        for row in rows:
+            model = self.models.get(row.related_name)
+            if model is not None and any(hasattr(model, hook) for hook in PAGE_HOOKS):
+                by_model.setdefault(model, []).append(row.pk)
+        hooks = {}
+        for model, pks in by_model.items():
+            defined = [hook for hook in PAGE_HOOKS if hasattr(model, hook)]
+            for page in model._base_manager.filter(url_node_id__in=pks):
+                hooks[page.url_node_id] = {
+                    hook: getattr(page, hook) for hook in defined
+                }
+        return hooks
+
+    # -- rendering -------------------------------------------------------
+
+    def render_shard(self, after: int = 0, until: Optional[int] = None) -> Iterator[str]:
+        return render_urlset(self.entries(self.rows(after, until)))
+
+
+@receiver(post_save, sender=UrlNode)
+@receiver(post_delete, sender=UrlNode)
+def sitemap_nodes_changed(sender, instance, **kwargs):
+    bump_version_on_commit(SITEMAP_NAMESPACE)
+
+
+def _w3c(value) -> str:
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0).isoformat()
+    return value.isoformat()
+
+
+def _render_url(entry: SitemapEntry) -> str:
+    parts = [f"<url><loc>{escape(entry.loc)}</loc>"]
+    if entry.lastmod:
+        parts.append(f"<lastmod>{_w3c(entry.lastmod)}</lastmod>")
+    if entry.changefreq:
+        parts.append(f"<changefreq>{escape(str(entry.changefreq))}</changefreq>")
+    if entry.priority is not None:
+        parts.append(f"<priority>{entry.priority}</priority>")
+    for language, href in entry.alternates:
+        parts.append(
+            f'<xhtml:link rel="alternate" hreflang="{language}" '
+            f'href="{escape(href, ATTRIBUTE_ENTITIES)}"/>'
+        )
+    parts.append("</url>\n")
+    return "".join(parts)
+
+
+def render_urlset(entries: Iterable[SitemapEntry], buffer: int = 500) -> Iterator[str]:
+    """Stream a ``<urlset>`` document, ``buffer`` entries per chunk."""
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<urlset xmlns="{SITEMAP_NS}" xmlns:xhtml="{XHTML_NS}">\n'
+    )
+    chunk = []
+    for entry in entries:
+        chunk.append(_render_url(entry))
+        if len(chunk) == buffer:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk) + "</urlset>\n"
+
+
+def render_index(shards: Iterable[Tuple[str, Optional[datetime]]]) -> Iterator[str]:
+    """Stream a ``<sitemapindex>`` of ``(location, lastmod)`` pairs."""
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    )
+    for loc, lastmod in shards:
+        lastmod = f"<lastmod>{_w3c(lastmod)}</lastmod>" if lastmod else ""
+        yield f"<sitemap><loc>{escape(loc)}</loc>{lastmod}</sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def sitemap(
+    request,
+    shard: Optional[int] = None,
+    generator_class=PagesSitemapGenerator,
+    shard_url_name: str = SITEMAP_SHARD_URL_NAME,
+):
+    """Serve the pages sitemap, or shard ``shard`` of it.
+
+    Without ``shard`` the response is the full ``<urlset>`` while it fits
+    in one file, a ``<sitemapindex>`` of ``shard_url_name`` urls past it.
+    """
+    generator = generator_class(base_url=f"{request.scheme}://{request.get_host()}")
+    if shard is not None:
+        content = generator.render_shard(*generator.shard_bounds(shard))
+    else:
+        count = generator.shard_count()
+        if count == 1:
+            content = generator.render_shard()
+        else:
+            content = render_index(
+                (request.build_absolute_uri(reverse(shard_url_name, args=(number,))), None)
+                for number in range(1, count + 1)
+            )
+    return StreamingHttpResponse(content, content_type="application/xml")
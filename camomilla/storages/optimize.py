@@ -5,6 +5,7 @@ from django.core.files.base import ContentFile
 from PIL import Image
 
 from camomilla import settings
+from camomilla.instrumentation import span
 from camomilla.storages.default import get_default_storage_class
 import logging
 
@@ -31,6 +32,7 @@ class OptimizedStorage(get_default_storage_class()):
             content, _ = self._optimize(name, content)
         return super(OptimizedStorage, self)._save(name, content)
 
+    @span("media")
     def _optimize(self, name: str, content: ContentFile):
         try:
             image = Image.open(content)
@@ -0,0 +1,256 @@
+"""Response cache entries tagged by the rows they were built from.
+
+A ``pages_router`` payload is serialized ten levels deep: besides the page
+and its url node it pulls in related pages, media, content blocks and
+whatever else the page links to. Instead of expiring such entries after
+a fixed time, :class:`TaggedCache` records every model instance loaded
+while the entry is computed (through ``post_init``) and stores the entry
+together with the current version of each instance's tag.
+
+A tag is ``"<app_label>.<model_name>:<pk>"`` and its version is a
+shared-cache counter (see :mod:`camomilla.utils.cache`). Saving or
+deleting a row bumps the tags of the row itself and of every row it
+points to through a foreign key or a generic relation, so reverse
+relations (a page's new content block, a new child page) invalidate their
+owner too; m2m changes bump both sides. A read compares the stored
+versions with the current ones in one cache round-trip.
+
+Only the models payloads are built from are tracked: every page model,
+url nodes, contents, menus, media, tags and drafts
+(:func:`track_camomilla_models`). Other models rendered by your pages can
+be added with :func:`track_model`. The tags changed by a transaction are
+bumped together once it commits, and tag versions expire after
+:func:`tag_version_timeout` (twice the longest payload timeout): an
+expired version is seeded again from the clock, which only turns the
+entries built from it into misses.
+
+Writes that bypass model signals (``QuerySet.update``, ``bulk_update``)
+must call :meth:`TaggedCache.track_tags` themselves.
+"""
+
+import hashlib
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+from django.apps import apps
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+
+from camomilla import settings
+from camomilla.routing.base import TransactionAwareIndex
+from camomilla.utils.cache import bump_versions, get_cache, get_versions
+
+TAG_NAMESPACE = "tag:%s"
+# Used when every payload cache is disabled.
+DEFAULT_TAG_VERSION_TIMEOUT = 60 * 30
+
+_recording: ContextVar[Optional[Set[str]]] = ContextVar(
+    "camomilla_tagged_cache_recording", default=None
+)
+
+
+def tag_version_timeout() -> int:
+    """Lifetime of tag versions, longer than any entry built from them."""
+    timeouts = (
+        settings.PAGE_ROUTER_CACHE,
+        settings.MENU_ROUTER_CACHE,
+        settings.HTML_CACHE_TIMEOUT,
+    )
+    longest = max((timeout for timeout in timeouts if timeout), default=None)
+    return 2 * longest if longest else DEFAULT_TAG_VERSION_TIMEOUT
+
+
+def model_tags(model, pk: Any) -> Set[str]:
+    """Tags of row ``pk`` of ``model``: multi-table parents share the row."""
+    if pk is None:
+        return set()
+    models = [model._meta.concrete_model, *model._meta.get_parent_list()]
+    return {f"{m._meta.label_lower}:{pk}" for m in models}
+
+
+def instance_tags(instance) -> Set[str]:
+    return model_tags(type(instance), instance.pk)
+
+
+def changed_tags(instance) -> Set[str]:
+    """Tags invalidated when ``instance`` is saved or deleted.
+
+    The instance's own, plus those of the rows it points to: they may list
+    it through a reverse relation. Reads attnames only, never queries.
+    """
+    tags = instance_tags(instance)
+    for field in instance._meta.get_fields():
+        if field.many_to_one and field.concrete and field.related_model:
+            tags |= model_tags(field.related_model, getattr(instance, field.attname))
+        elif isinstance(field, GenericForeignKey):
+            content_type_id = getattr(instance, f"{field.ct_field}_id", None)
+            object_id = getattr(instance, field.fk_field, None)
+            if content_type_id and object_id is not None:
+                model = ContentType.objects.get_for_id(content_type_id).model_class()
+                if model is not None:
+                    tags |= model_tags(model, object_id)
+    return tags
+
+
+class TaggedEntry(NamedTuple):
+    value: Any
+    # Strong validator: a digest of the key and of every tag version.
+    etag: str
+    # When the entry was built (epoch seconds).
+    last_modified: float
+
+
+# Key of the pending batch of tags in :attr:`TaggedCache._uncommitted`.
+BATCH_KEY = "batch"
+
+
+class TaggedCache(TransactionAwareIndex):
+    """Shared-cache entries validated against the versions of their tags.
+
+    Like the routing indexes, the thread that changed tagged rows reads
+    around the cache until its transaction ends.
+    """
+
+    key_prefix = "camomilla:tagged:"
+
+    @contextmanager
+    def collect(self):
+        """Yield the set of tags of every instance loaded inside the block."""
+        tags = set()
+        token = _recording.set(tags)
+        try:
+            yield tags
+        finally:
+            _recording.reset(token)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry.value if entry else None
+
+    def get_entry(self, key: str) -> Optional[TaggedEntry]:
+        if self.in_uncommitted_change():
+            return None
+        entry = get_cache().get(self.key_prefix + key)
+        if entry is None:
+            return None
+        value, versions, etag, last_modified = entry
+        current = self.versions(versions)
+        if any(current[tag] != version for tag, version in versions.items()):
+            return None
+        return TaggedEntry(value, etag, last_modified)
+
+    def versions(self, tags: Iterable[str]) -> Dict[str, Optional[int]]:
+        """Current version of each tag, sorted by tag."""
+        tags = sorted(set(tags))
+        found = get_versions(
+            (TAG_NAMESPACE % tag for tag in tags), timeout=tag_version_timeout()
+        )
+        return {tag: found[TAG_NAMESPACE % tag] for tag in tags}
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str],
+        timeout: int,
+        validators: Optional[Tuple[str, float]] = None,
+    ) -> TaggedEntry:
+        """Store ``value`` under the current versions of ``tags``.
+
+        The entry's validators are ``validators`` (``(etag, last_modified)``)
+        when given, else a digest of the tag versions and the current time.
+        Returns the entry even when the running transaction keeps it from
+        being stored.
+        """
+        versions = self.versions(tags)
+        if validators is None:
+            etag = hashlib.sha1(f"{key}:{versions}".encode("utf-8")).hexdigest()
+            validators = (etag, time.time())
+        entry = TaggedEntry(value, *validators)
+        if not self.in_uncommitted_change():
+            get_cache().set(
+                self.key_prefix + key,
+                (value, versions, entry.etag, entry.last_modified),
+                timeout,
+            )
+        return entry
+
+    def track_tags(self, tags: Iterable[str]) -> None:
+        """Bump ``tags`` once the running transaction commits.
+
+        Every tag tracked by a transaction joins the same batch, bumped in
+        one go by a single ``on_commit`` callback.
+        """
+        tags = set(tags)
+        if not tags:
+            return
+        if self._waits_for_commit(BATCH_KEY):
+            self._local.batch |= tags
+            return
+        # First tags of this transaction (or the previous batch was rolled
+        # back with its savepoint): start a new batch.
+        batch = self._local.batch = tags
+        self._track_uncommitted(BATCH_KEY, lambda: self._bump(batch))
+
+    @staticmethod
+    def _bump(tags: Set[str]) -> None:
+        bump_versions(
+            (TAG_NAMESPACE % tag for tag in tags), timeout=tag_version_timeout()
+        )
+
+    def track_rows(self, model, pks: Iterable[Any]) -> None:
+        """:meth:`track_tags` for rows written without model signals."""
+        self.track_tags(tag for pk in pks for tag in model_tags(model, pk))
+
+
+tagged_cache = TaggedCache()
+
+
+def record_loaded_instance(sender, instance, **kwargs):
+    recording = _recording.get()
+    if recording is not None and instance.pk is not None:
+        recording |= instance_tags(instance)
+
+
+def tagged_instance_changed(sender, instance, **kwargs):
+    tagged_cache.track_tags(changed_tags(instance))
+
+
+def tagged_relation_changed(sender, instance, action, model, pk_set, **kwargs):
+    if action.startswith("post_"):
+        tagged_cache.track_tags(
+            instance_tags(instance)
+            | {tag for pk in pk_set or () for tag in model_tags(model, pk)}
+        )
+
+
+def track_model(model) -> None:
+    """Tag the rows of ``model`` and of its many-to-many relations.
+
+    Its instances are recorded by the entries that load them and their
+    changes bump their tags. Idempotent.
+    """
+    uid = f"camomilla_tagged_cache:{model._meta.label_lower}"
+    post_init.connect(record_loaded_instance, sender=model, dispatch_uid=uid)
+    post_save.connect(tagged_instance_changed, sender=model, dispatch_uid=uid)
+    post_delete.connect(tagged_instance_changed, sender=model, dispatch_uid=uid)
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        m2m_changed.connect(
+            tagged_relation_changed,
+            sender=through,
+            dispatch_uid=f"camomilla_tagged_cache:{through._meta.label_lower}",
+        )
+
+
+def track_camomilla_models() -> None:
+    """Track every model camomilla payloads are built from."""
+    from camomilla.models import Content, Draft, Media, Menu, Tag, UrlNode
+    from camomilla.models.page import AbstractPage
+
+    pages = [model for model in apps.get_models() if issubclass(model, AbstractPage)]
+    for model in (*pages, UrlNode, Content, Menu, Media, Tag, Draft):
+        track_model(model)
@@ -0,0 +1,136 @@
+"""Query-count and latency budgets for test suites.
+
+A budget seeds a growing number of rows and checks that an endpoint runs
+the same number of queries whatever their number, so a serializer field
+or a template tag adding a query per row fails the build::
+
+    from camomilla.testing import assert_constant_queries
+
+    def test_products_list(client, django_capture_on_commit_callbacks):
+        def seed(count):
+            with django_capture_on_commit_callbacks(execute=True):
+                for _ in range(count):
+                    Product.objects.create(title_en="product")
+
+        assert_constant_queries(
+            lambda: client.get("/api/products/"), seed, name="products list"
+        )
+
+Caches are cleared before every measured request, so cached responses
+don't hide the cost of building them. With ``CAMOMILLA_BUDGET_REPORT``
+set in the environment the wall-time percentiles of every budget are
+appended to that file, one JSON object per line, for trend tracking.
+"""
+
+import json
+import os
+from time import perf_counter
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.core.cache import caches
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+REPORT_ENV = "CAMOMILLA_BUDGET_REPORT"
+
+
+class Measurement(NamedTuple):
+    size: int
+    queries: int
+    # Wall times of the runs, in seconds.
+    timings: Tuple[float, ...]
+
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile of the timings, in milliseconds."""
+        timings = sorted(self.timings)
+        rank = max(int(round(percent / 100 * len(timings) + 0.5)) - 1, 0)
+        return timings[min(rank, len(timings) - 1)] * 1000
+
+    def as_dict(self) -> dict:
+        return {
+            "size": self.size,
+            "queries": self.queries,
+            "p50": round(self.percentile(50), 3),
+            "p90": round(self.percentile(90), 3),
+            "max": round(self.percentile(100), 3),
+        }
+
+
+def reset_caches() -> None:
+    """Forget every cached payload, page and route."""
+    from camomilla.routing import route_table
+
+    for cache in caches.all():
+        cache.clear()
+    route_table.invalidate()
+
+
+def _count_queries(request: Callable) -> Tuple[int, float]:
+    with CaptureQueriesContext(connections["default"]) as queries:
+        started = perf_counter()
+        response = request()
+        elapsed = perf_counter() - started
+    status_code = getattr(response, "status_code", 200)
+    assert status_code < 400, f"The request answered {status_code}"
+    return len(queries), elapsed
+
+
+def measure(
+    request: Callable, size: int = 0, runs: int = 5, reset: Callable = reset_caches
+) -> Measurement:
+    """Time ``runs`` cold calls of ``request`` and count their queries (the most any run made).
+
+    A first, unmeasured call fills the per-process caches (content types,
+    serializer classes, templates) the way a running server has them.
+    """
+    reset()
+    request()
+    counts, timings = [], []
+    for _ in range(runs):
+        reset()
+        count, elapsed = _count_queries(request)
+        counts.append(count)
+        timings.append(elapsed)
+    return Measurement(size, max(counts), tuple(timings))
+
+
+def record(name: str, measurements: Iterable[Measurement]) -> None:
+    """Append ``measurements`` to the ``CAMOMILLA_BUDGET_REPORT`` file, if set."""
+    path = os.environ.get(REPORT_ENV)
+    if not path:
+        return
+    with open(path, "a") as report:
+        for measurement in measurements:
+            report.write(json.dumps({"name": name, **measurement.as_dict()}) + "\n")
+
+
+def assert_constant_queries(
+    request: Callable,
+    seed: Callable[[int], None],
+    sizes: Tuple[int, ...] = (2, 10),
+    max_queries: Optional[int] = None,
+    runs: int = 5,
+    name: str = "",
+    reset: Callable = reset_caches,
+) -> List[Measurement]:
+    """Check ``request`` runs as many queries with each of ``sizes`` rows seeded.
+
+    ``seed(count)`` adds ``count`` more rows: the sizes are cumulative.
+    ``max_queries`` also caps the count. Returns the measurements.
+    """
+    measurements = []
+    seeded = 0
+    for size in sizes:
+        seed(size - seeded)
+        seeded = size
+        measurements.append(measure(request, size, runs, reset))
+    record(name, measurements)
+    counts = {measurement.size: measurement.queries for measurement in measurements}
+    assert (
+        len(set(counts.values())) == 1
+    ), f"{name or request}: the queries grow with the rows ({counts})"
+    if max_queries is not None:
+        assert (
+            measurements[0].queries <= max_queries
+        ), f"{name or request}: {measurements[0].queries} queries, over the budget of {max_queries}"
+    return measurements
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib import admin, messages
+from django.contrib.contenttypes.models import ContentType
 from django.db import models as django_models
+from django.db.models import Exists, OuterRef
 from django.http import HttpResponseRedirect
 from django.urls import path, reverse
 from django.utils.html import format_html
@@ -193,9 +195,20 @@ class AbstractPageAdmin(_RevisionsAdminBase):
             label,
         )
 
+    def get_queryset(self, request):
+        # The draft column reads one ``EXISTS`` per row from the list query.
+        drafts = Draft.objects.filter(
+            content_type=ContentType.objects.get_for_model(self.model),
+            object_id=OuterRef("pk"),
+            language=self.model._draft_language(),
+        )
+        return super().get_queryset(request).annotate(_has_draft=Exists(drafts))
+
     @admin.display(description=_("Draft"), boolean=True)
     def has_draft_indicator(self, obj):
         """True when a Draft row exists in the active language."""
+        if hasattr(obj, "_has_draft"):
+            return obj._has_draft
         return Draft.objects.for_(obj, language=obj._draft_language()).exists()
 
     # ------------------------------------------------------------------
@@ -329,10 +342,7 @@ class AbstractPageAdmin(_RevisionsAdminBase):
 
     @admin.action(description=_("Publish selected pages now"))
     def admin_publish_now(self, request, queryset):
-        count = 0
-        for page in queryset:
-            page.publish(comment="Bulk publish from admin")
-            count += 1
+        count = queryset.bulk_publish(comment="Bulk publish from admin")
         messages.success(request, _("Published %(n)d page(s).") % {"n": count})
 
     @admin.action(description=_("Move selected pages to trash"))
@@ -54,7 +54,7 @@ class PageTranslationOptions(AbstractPageTranslationOptions):
 
 @register(UrlNode)
 class UrlNodeTranslationOptions(TranslationOptions):
-    fields = ("permalink",)
+    fields = ("permalink", "published_at", "indexable")
 
 
 @register(Menu)
@@ -0,0 +1,761 @@
+"""Page hierarchy helpers.
+
+Pages nest through the foreign key named by ``PageMeta.parent_page_field``
+(``parent_page`` unless a model says otherwise), and a page of one model
+may have children of another. :func:`page_tree_relations` lists those
+keys for every concrete page model.
+
+Renaming or moving a page changes the automatic permalink of everything
+below it. :func:`rebuild_subtree_permalinks` recomputes them in Python
+from one fetch per tree level, resolves collisions with a single query
+and writes the ``UrlNode`` rows and their redirects in bulk: the cost no
+longer grows with one save (and its handful of queries) per descendant.
+"""
+
+from collections import defaultdict
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import CharField, F, IntegerField, Q, Subquery, Value
+from django.db.models.functions import Concat, Length, Substr
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone, translation
+
+from camomilla import settings
+from camomilla.managers.pages import tree_path_ids
+from camomilla.models.page import (
+    PAGE_STATUS_DRAFT,
+    PAGE_STATUS_PUBLISHED,
+    PAGE_STATUS_SCHEDULED,
+    PAGE_STATUS_TRASHED,
+    AbstractPage,
+    UrlNode,
+    UrlRedirect,
+)
+from camomilla.routing.base import TransactionAwareIndex, indexes_enabled
+from camomilla.utils import localized_fieldname
+from camomilla.utils.cache import bump_version, get_cache, get_version
+
+BATCH_SIZE = 500
+
+
+class TreeRelation(NamedTuple):
+    model: type
+    # Name and attname of the foreign key to the parent page.
+    field_name: str
+    attname: str
+    parent_model: type
+
+
+class _Descendant(NamedTuple):
+    page: AbstractPage
+    parent_node_id: int
+
+
+@lru_cache(maxsize=None)
+def page_tree_relations() -> Tuple[TreeRelation, ...]:
+    """Parent foreign key of every concrete page model."""
+    relations = []
+    for model in apps.get_models():
+        if not issubclass(model, AbstractPage):
+            continue
+        field_name = getattr(model._page_meta, "parent_page_field", None)
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            continue
+        # Multi-table children share the key (and the rows) of their parent.
+        if field.model is not model or not field.many_to_one:
+            continue
+        relations.append(
+            TreeRelation(model, field.name, field.attname, field.related_model)
+        )
+    return tuple(relations)
+
+
+def _languages() -> List[Optional[str]]:
+    if settings.ENABLE_TRANSLATIONS:
+        return list(settings.LANGUAGE_CODES)
+    return [None]
+
+
+def _permalink_columns() -> Dict[Optional[str], str]:
+    return {
+        lang: localized_fieldname("permalink", lang, UrlNode) if lang else "permalink"
+        for lang in _languages()
+    }
+
+
+def _batched(items: list, size: int = BATCH_SIZE):
+    for start in range(0, len(items), size):
+        end = start + size
+        yield items[start:end]
+
+
+def _page_keys(page: AbstractPage) -> List[Tuple[type, int]]:
+    """``(model, pk)`` under which ``page`` can be another page's parent."""
+    return [(model, page.pk) for model in [type(page), *page._meta.get_parent_list()]]
+
+
+def _permalink_sources(model) -> set:
+    """Columns automatic permalinks are computed from."""
+    return {
+        localized_fieldname(attr, lang, model) if lang else attr
+        for attr in ("title", "autopermalink")
+        for lang in _languages()
+    }
+
+
+def subtree_pages(root: AbstractPage) -> List[_Descendant]:
+    """Every page below ``root``, parents before their children.
+
+    Loads only what permalinks are computed from: one query for the url
+    nodes under the root's ``tree_path`` and one per page model, or one
+    per page model and tree level while the path is unknown.
+    """
+    tree_path = (
+        UrlNode._base_manager.filter(pk=root.url_node_id)
+        .values_list("tree_path", flat=True)
+        .first()
+    )
+    if tree_path:
+        return _subtree_by_path(root, tree_path)
+    return _subtree_by_level(root)
+
+
+def _subtree_by_path(root: AbstractPage, tree_path: str) -> List[_Descendant]:
+    nodes = (
+        UrlNode._base_manager.filter(tree_path__startswith=tree_path)
+        .exclude(pk=root.url_node_id)
+        .values_list("pk", "related_name", "tree_path")
+    )
+    parents, depths, by_relation = {}, {}, defaultdict(list)
+    for pk, related_name, node_path in nodes:
+        ids = tree_path_ids(node_path)
+        parents[pk], depths[pk] = ids[-2], len(ids)
+        by_relation[related_name].append(pk)
+    models = {
+        relation["name"]: relation["model"]
+        for relation in UrlNode.objects.get_reverse_pages_relations()
+    }
+    pages = []
+    for related_name, pks in by_relation.items():
+        model = models.get(related_name)
+        if model is None:
+            continue
+        for batch in _batched(pks):
+            pages.extend(
+                model._base_manager.filter(url_node_id__in=batch).only(
+                    "url_node", *_permalink_sources(model)
+                )
+            )
+    pages.sort(key=lambda page: depths[page.url_node_id])
+    return [_Descendant(page, parents[page.url_node_id]) for page in pages]
+
+
+def _subtree_by_level(root: AbstractPage) -> List[_Descendant]:
+    node_of = {key: root.url_node_id for key in _page_keys(root)}
+    seen = {root.url_node_id}
+    descendants = []
+    level = {type(root): [root.pk]}
+    while level:
+        next_level = defaultdict(list)
+        for relation in page_tree_relations():
+            parent_pks = [
+                pk
+                for parent_model, pks in level.items()
+                if issubclass(parent_model, relation.parent_model)
+                for pk in pks
+            ]
+            if not parent_pks:
+                continue
+            columns = _permalink_sources(relation.model)
+            for batch in _batched(parent_pks):
+                pages = relation.model._base_manager.filter(
+                    **{f"{relation.attname}__in": batch}
+                ).only("url_node", relation.field_name, *columns)
+                for page in pages:
+                    if page.url_node_id is None or page.url_node_id in seen:
+                        continue
+                    seen.add(page.url_node_id)
+                    parent_key = (relation.parent_model, getattr(page, relation.attname))
+                    descendants.append(_Descendant(page, node_of[parent_key]))
+                    for key in _page_keys(page):
+                        node_of[key] = page.url_node_id
+                    next_level[type(page)].append(page.pk)
+        level = next_level
+    return descendants
+
+
+def _compute(descendants, permalinks, taken=None) -> Dict[Optional[str], Dict[int, str]]:
+    """New ``{lang: {node_id: permalink}}`` for ``descendants``.
+
+    ``permalinks`` holds the current values (and the root's new ones).
+    With ``taken`` (``{lang: {permalink: node_id}}``), colliding
+    permalinks are disambiguated like :meth:`AbstractPage.generate_permalink`
+    does.
+    """
+    computed = {}
+    for lang in _languages():
+        current = permalinks[lang]
+        values = computed[lang] = {}
+        with translation.override(lang) if lang else nullcontext():
+            _compute_language(
+                descendants, current, values, None if taken is None else taken[lang]
+            )
+    return computed
+
+
+def _compute_language(descendants, current, values, taken) -> None:
+    for page, parent_node_id in descendants:
+        node_id = page.url_node_id
+        value = current.get(node_id)
+        if page.autopermalink:
+            parent = values.get(parent_node_id, current.get(parent_node_id))
+            value = AbstractPage.compose_permalink(page.title, parent or "")
+            kept = current.get(node_id)
+            if taken is not None and value != kept:
+                owner = taken.get(value)
+                if owner is not None and owner != node_id:
+                    # Already disambiguated under the same parent: keep it.
+                    same_parent = kept and kept.rsplit("/", 1)[0] == value.rsplit("/", 1)[0]
+                    if same_parent and taken.get(kept, node_id) == node_id:
+                        value = kept
+                    else:
+                        value = AbstractPage.disambiguate_permalink(value)
+                taken[value] = node_id
+        values[node_id] = value
+
+
+def _taken_permalinks(candidates, subtree_ids, columns) -> Dict[Optional[str], Dict[str, int]]:
+    """Candidates already used by nodes outside the subtree, in one query."""
+    taken = {lang: {} for lang in columns}
+    conditions = [
+        Q(**{f"{columns[lang]}__in": sorted(values)})
+        for lang, values in candidates.items()
+        if values
+    ]
+    if not conditions:
+        return taken
+    condition = conditions.pop()
+    for other in conditions:
+        condition |= other
+    rows = UrlNode._base_manager.filter(condition).values_list("pk", *columns.values())
+    for pk, *values in rows:
+        if pk in subtree_ids:
+            continue
+        for lang, value in zip(columns, values):
+            if value in candidates[lang]:
+                taken[lang][value] = pk
+    return taken
+
+
+def _final_permalinks(descendants, permalinks, columns) -> Dict[Optional[str], Dict[int, str]]:
+    """Compute, find collisions with one query, then compute again."""
+    candidates = _compute(descendants, permalinks)
+    changed = {
+        lang: {value for pk, value in values.items() if value != permalinks[lang][pk]}
+        for lang, values in candidates.items()
+    }
+    subtree_ids = set(next(iter(permalinks.values())))
+    taken = _taken_permalinks(changed, subtree_ids, columns)
+    for lang, values in permalinks.items():
+        # Unchanged nodes of the subtree keep their permalink.
+        for pk, value in values.items():
+            if value and candidates[lang].get(pk, value) == value:
+                taken[lang].setdefault(value, pk)
+    return _compute(descendants, permalinks, taken)
+
+
+def _renames(nodes, columns, permalinks, computed) -> Dict[UrlNode, dict]:
+    """Apply ``computed`` to ``nodes``: ``{node: {lang: (old, new)}}``."""
+    renames = {}
+    for pk, node in nodes.items():
+        renamed = {}
+        for lang, column in columns.items():
+            old, new = permalinks[lang][pk], computed[lang][pk]
+            if old != new:
+                # Monolingual nodes redirect in every language, as signals do.
+                for code in [lang] if lang else settings.LANGUAGE_CODES:
+                    renamed[code] = (old, new)
+                setattr(node, column, new)
+        if renamed:
+            renames[node] = renamed
+    return renames
+
+
+def rebuild_subtree_permalinks(root: AbstractPage) -> int:
+    """Rewrite the automatic permalinks below ``root``.
+
+    ``root.url_node`` must already hold the root's new permalinks (this
+    runs from :meth:`AbstractPage.save`). Returns the number of url nodes
+    updated.
+    """
+    if root.pk is None or root.url_node_id is None:
+        return 0
+    descendants = subtree_pages(root)
+    if not descendants:
+        return 0
+    columns = _permalink_columns()
+    nodes = {}
+    node_ids = [page.url_node_id for page, _ in descendants]
+    for batch in _batched(node_ids):
+        nodes.update(UrlNode._base_manager.in_bulk(batch))
+    permalinks = {
+        lang: {
+            **{pk: getattr(node, column) for pk, node in nodes.items()},
+            root.url_node_id: getattr(root.url_node, column),
+        }
+        for lang, column in columns.items()
+    }
+    computed = _final_permalinks(descendants, permalinks, columns)
+    renames = _renames(nodes, columns, permalinks, computed)
+    if not renames:
+        return 0
+
+    from camomilla.routing import route_table
+    from camomilla.tagged_cache import tagged_cache
+
+    with transaction.atomic():
+        UrlNode._base_manager.bulk_update(
+            list(renames), list(columns.values()), batch_size=BATCH_SIZE
+        )
+        UrlRedirect.objects.redirect_renames_many(renames)
+        route_table.track_changes(node.pk for node in renames)
+        tagged_cache.track_rows(UrlNode, (node.pk for node in renames))
+    return len(renames)
+
+
+def move_subtree(page: AbstractPage, new_parent: Optional[AbstractPage]) -> AbstractPage:
+    """Move ``page`` (and everything below it) under ``new_parent``.
+
+    ``None`` moves it to the top level. Automatic permalinks of the whole
+    subtree follow, with redirects from the old ones.
+    """
+    field_name = page._page_meta.parent_page_field
+    if new_parent is not None:
+        if new_parent.url_node_id == page.url_node_id or any(
+            descendant.page.url_node_id == new_parent.url_node_id
+            for descendant in subtree_pages(page)
+        ):
+            raise ValueError("A page can't be moved under itself or its descendants.")
+    with transaction.atomic():
+        setattr(page, field_name, new_parent)
+        page.save()
+    return page
+
+
+# -- tree paths ----------------------------------------------------------
+
+
+def _relation_for(model) -> Optional[TreeRelation]:
+    for relation in page_tree_relations():
+        if issubclass(model, relation.model):
+            return relation
+    return None
+
+
+def _tree_path_max_length(url_node_model=UrlNode) -> int:
+    return url_node_model._meta.get_field("tree_path").max_length
+
+
+def _join_path(
+    parent_path: Optional[str], node_id: int, max_length: Optional[int] = None
+) -> str:
+    """``tree_path`` of ``node_id`` under ``parent_path`` (``None``: a root).
+
+    ``""`` (unknown) when the parent's path is unknown, already contains
+    the node (a loop) or the result wouldn't fit the column: pages that
+    deep fall back to walking their parent keys.
+    """
+    if parent_path is None:
+        return f"/{node_id}/"
+    if not parent_path or f"/{node_id}/" in parent_path:
+        return ""
+    tree_path = f"{parent_path}{node_id}/"
+    if len(tree_path) > (max_length or _tree_path_max_length()):
+        return ""
+    return tree_path
+
+
+def sync_tree_path(page: AbstractPage) -> None:
+    """Point ``page.url_node.tree_path`` under its parent's.
+
+    Runs from :meth:`AbstractPage.save`: one query to read the current
+    and the parent's paths, and when the page moved one ``UPDATE``
+    rewriting the prefix of its whole subtree.
+    """
+    node = page.url_node
+    relation = _relation_for(type(page))
+    parent_id = getattr(page, relation.attname) if relation else None
+    nodes = UrlNode._base_manager.filter(pk=node.pk)
+    if parent_id is None:
+        current, parent_path = nodes.values_list("tree_path", flat=True).first(), None
+    else:
+        parents = relation.parent_model._base_manager.filter(pk=parent_id)
+        current, parent_path = nodes.annotate(
+            parent_path=Subquery(parents.values("url_node__tree_path")[:1])
+        ).values_list("tree_path", "parent_path").first()
+        parent_path = parent_path or ""
+    tree_path = _join_path(parent_path, node.pk)
+    if tree_path != current:
+        if current:
+            # The whole subtree moves with the node. Descendants whose new
+            # path would overflow the column lose it, like in ``_join_path``.
+            subtree = UrlNode._base_manager.filter(tree_path__startswith=current)
+            growth = len(tree_path) - len(current)
+            if tree_path and growth > 0:
+                too_deep = subtree.annotate(path_length=Length("tree_path")).filter(
+                    path_length__gt=_tree_path_max_length() - growth
+                )
+                too_deep.update(tree_path=Value(""))
+            subtree.update(
+                tree_path=Concat(
+                    Value(tree_path),
+                    Substr("tree_path", len(current) + 1),
+                    output_field=CharField(),
+                )
+                if tree_path
+                else Value("")
+            )
+        else:
+            nodes.update(tree_path=tree_path)
+    node.tree_path = tree_path
+
+
+def _ancestor_nodes(page: AbstractPage) -> Optional[List[Tuple[type, int]]]:
+    """Model and url node id of every ancestor of ``page``, root first.
+
+    ``None`` when the url node's ``tree_path`` is unknown or doesn't match
+    the parent key anymore.
+    """
+    tree_path = page.url_node.tree_path if page.url_node_id else ""
+    ids = tree_path_ids(tree_path)
+    if not ids or ids[-1] != page.url_node_id:
+        return None
+    ids = ids[:-1]
+    relation = _relation_for(type(page))
+    parent_id = getattr(page, relation.attname) if relation else None
+    if bool(ids) != (parent_id is not None):
+        return None
+    nodes = []
+    model = type(page)
+    for node_id in reversed(ids):
+        relation = _relation_for(model)
+        if relation is None:
+            return None
+        model = relation.parent_model
+        nodes.append((model, node_id))
+    return nodes[::-1]
+
+
+def _load_ancestors(pages: List[AbstractPage]) -> List[Optional[List[AbstractPage]]]:
+    """Ancestors of each of ``pages`` (see :func:`page_ancestors`), loaded at once."""
+    paths = [_ancestor_nodes(page) for page in pages]
+    by_model = defaultdict(set)
+    for path in paths:
+        for model, node_id in path or ():
+            by_model[model].add(node_id)
+    found = {}
+    for model, node_ids in by_model.items():
+        for ancestor in model._base_manager.filter(
+            url_node_id__in=node_ids
+        ).select_related("url_node"):
+            found[ancestor.url_node_id] = ancestor
+    result = []
+    for page, path in zip(pages, paths):
+        if path is None or any(node_id not in found for _, node_id in path):
+            result.append(None)
+            continue
+        ancestors = [found[node_id] for _, node_id in path]
+        if ancestors and ancestors[-1].pk != getattr(
+            page, _relation_for(type(page)).attname
+        ):
+            result.append(None)
+            continue
+        result.append(ancestors)
+    return result
+
+
+def page_ancestors(page: AbstractPage) -> Optional[List[AbstractPage]]:
+    """Ancestors of ``page``, root first, with their ``url_node`` joined in.
+
+    One query per page model met going up (usually one). ``None`` when
+    the url node's ``tree_path`` is unknown or doesn't match the parent
+    key anymore: callers then walk the parents one by one.
+    """
+    return _load_ancestors([page])[0]
+
+
+def prefetch_ancestors(pages: List[AbstractPage]) -> None:
+    """Load the ancestors of all ``pages`` for :meth:`AbstractPage.get_ancestors`.
+
+    One query per page model met going up, for the whole list instead of
+    one per page. The ancestors, and the parents already loaded on the
+    pages (``parent_page`` rendered nested), get theirs too.
+    """
+    for page, ancestors in zip(pages, _load_ancestors(pages)):
+        if ancestors is None:
+            continue
+        page._prefetched_ancestors = ancestors
+        for level, ancestor in enumerate(ancestors):
+            ancestor._prefetched_ancestors = ancestors[:level]
+        child, level = page, len(ancestors)
+        while level:
+            field = child._meta.get_field(_relation_for(type(child)).field_name)
+            if not field.is_cached(child):
+                break
+            child, level = field.get_cached_value(child), level - 1
+            if child is None or child.pk != ancestors[level].pk:
+                break
+            child._prefetched_ancestors = ancestors[:level]
+
+
+def expected_tree_paths(url_node_model=UrlNode, relations=None) -> Dict[int, str]:
+    """``tree_path`` every url node should have, from the parent keys.
+
+    One query per page model plus one for the nodes. ``url_node_model``
+    and ``relations`` default to the live models and their
+    :func:`page_tree_relations`; upgrade migrations pass historical ones.
+    """
+    max_length = _tree_path_max_length(url_node_model)
+    parents = {}
+    for relation in page_tree_relations() if relations is None else relations:
+        rows = relation.model._base_manager.filter(url_node__isnull=False).values_list(
+            "url_node_id", f"{relation.field_name}__url_node_id"
+        )
+        for node_id, parent_node_id in rows.iterator(chunk_size=2000):
+            parents[node_id] = parent_node_id
+    paths = {}
+
+    def resolve(node_id, visiting=()):
+        if node_id not in paths:
+            parent_id = parents.get(node_id)
+            if parent_id is None:
+                paths[node_id] = _join_path(None, node_id)
+            elif parent_id in visiting:
+                paths[node_id] = ""
+            else:
+                paths[node_id] = _join_path(
+                    resolve(parent_id, (*visiting, node_id)), node_id, max_length
+                )
+        return paths[node_id]
+
+    for node_id in url_node_model._base_manager.values_list(
+        "pk", flat=True
+    ).iterator(chunk_size=2000):
+        resolve(node_id)
+    return paths
+
+
+def stale_tree_paths() -> List[int]:
+    """Pks of the url nodes whose ``tree_path`` is wrong."""
+    expected = expected_tree_paths()
+    return sorted(
+        pk
+        for pk, tree_path in UrlNode._base_manager.values_list("pk", "tree_path").iterator(
+            chunk_size=2000
+        )
+        if expected.get(pk, tree_path) != tree_path
+    )
+
+
+def rebuild_tree_paths(url_node_model=UrlNode, relations=None) -> int:
+    """Recompute every ``tree_path``; returns the number of nodes fixed.
+
+    Arguments as in :func:`expected_tree_paths`.
+    """
+    expected = expected_tree_paths(url_node_model, relations)
+    stale = []
+    for pk, tree_path in url_node_model._base_manager.values_list(
+        "pk", "tree_path"
+    ).iterator(chunk_size=2000):
+        if expected.get(pk, tree_path) != tree_path:
+            stale.append(url_node_model(pk=pk, tree_path=expected[pk]))
+    with transaction.atomic():
+        url_node_model._base_manager.bulk_update(
+            stale, ["tree_path"], batch_size=BATCH_SIZE
+        )
+    return len(stale)
+
+
+# -- site tree -----------------------------------------------------------
+
+PAGE_TREE_NAMESPACE = "pages-tree"
+PAGE_TREE_KEY = "camomilla:pages-tree:%s:%s"
+
+
+class TreeEntry(NamedTuple):
+    id: int
+    model: str
+    url_node: int
+    parent: Optional[int]
+    ordering: int
+    title: str
+    permalink: Optional[str]
+    published_at: Optional[object]
+    deleted_at: Optional[object]
+
+    @property
+    def status(self) -> str:
+        if self.deleted_at is not None:
+            return PAGE_STATUS_TRASHED
+        if self.published_at is None:
+            return PAGE_STATUS_DRAFT
+        if self.published_at <= timezone.now():
+            return PAGE_STATUS_PUBLISHED
+        return PAGE_STATUS_SCHEDULED
+
+
+def _page_column(attr: str, language: Optional[str], model) -> str:
+    return localized_fieldname(attr, language, model) if language else attr
+
+
+def _first_filled(values: Dict[Optional[str], object], language: Optional[str]):
+    if values.get(language):
+        return values[language]
+    return next((value for value in values.values() if value), None)
+
+
+def build_page_tree(language: Optional[str]) -> Dict[Optional[int], List[TreeEntry]]:
+    """Children of every url node (``None``: the roots), sorted, in ``language``.
+
+    One query per page model, its url node joined in. Titles fall back
+    to the other languages when missing in ``language``.
+    """
+    languages = _languages()
+    language = language if language in languages else languages[0]
+    children = defaultdict(list)
+    for relation in UrlNode.objects.get_reverse_pages_relations():
+        model = relation["model"]
+        tree_relation = _relation_for(model)
+        rows = (
+            model._base_manager.filter(url_node__related_name=relation["name"])
+            .annotate(
+                parent_node=(
+                    F(f"{tree_relation.field_name}__url_node_id")
+                    if tree_relation
+                    else Value(None, output_field=IntegerField())
+                )
+            )
+            .values_list(
+                "pk",
+                "url_node_id",
+                "ordering",
+                f"url_node__{_permalink_columns()[language]}",
+                f"url_node__{_page_column('published_at', language, UrlNode)}",
+                "url_node__deleted_at",
+                *[_page_column("title", lang, model) for lang in languages],
+                "parent_node",
+            )
+            .iterator(chunk_size=2000)
+        )
+        for pk, node_id, ordering, permalink, published_at, deleted_at, *rest in rows:
+            *titles, parent_id = rest
+            entry = TreeEntry(
+                id=pk,
+                model=model._meta.label_lower,
+                url_node=node_id,
+                parent=parent_id,
+                ordering=ordering,
+                title=_first_filled(dict(zip(languages, titles)), language) or "",
+                permalink=permalink,
+                published_at=published_at,
+                deleted_at=deleted_at,
+            )
+            children[entry.parent].append(entry)
+    for entries in children.values():
+        entries.sort(key=lambda entry: (entry.ordering, entry.url_node))
+    return dict(children)
+
+
+class PageTreeCache(TransactionAwareIndex):
+    """Per-language :func:`build_page_tree` results in the shared cache.
+
+    Keys embed the ``pages-tree`` counter, bumped once the transaction
+    saving a page or url node commits. Until then the writing thread
+    builds the tree from the database, so it reads its own writes.
+
+    Like the routing indexes, the cache is only used when every process
+    sees the counter (:func:`camomilla.routing.base.indexes_enabled`):
+    otherwise each request builds the tree.
+    """
+
+    timeout = 60 * 60 * 24
+
+    def get(self, language: Optional[str]) -> Dict[Optional[int], List[TreeEntry]]:
+        languages = _languages()
+        language = language if language in languages else languages[0]
+        if not indexes_enabled() or self.in_uncommitted_change():
+            return build_page_tree(language)
+        key = PAGE_TREE_KEY % (get_version(PAGE_TREE_NAMESPACE), language)
+        cache = get_cache()
+        tree = cache.get(key)
+        if tree is None:
+            tree = build_page_tree(language)
+            cache.set(key, tree, self.timeout)
+        return tree
+
+    def track_change(self) -> None:
+        """Record that the hierarchy changed in the running transaction."""
+        self._track_uncommitted(
+            PAGE_TREE_NAMESPACE, lambda: bump_version(PAGE_TREE_NAMESPACE)
+        )
+
+
+page_tree = PageTreeCache()
+
+
+def render_page_tree(
+    tree: Dict[Optional[int], List[TreeEntry]],
+    root: Optional[int] = None,
+    depth: Optional[int] = None,
+) -> List[dict]:
+    """Nested payload of the pages below url node ``root`` (default: the roots).
+
+    Branches deeper than ``depth`` levels are cut: their ``children`` is
+    ``None`` and ``children_count`` tells the client whether to expand
+    them with another request rooted there.
+    """
+    # Depth first with an explicit stack: ``depth=None`` has no bound, so a
+    # deep hierarchy must not cost a Python frame per level.
+    seen = {root}
+    result: List[dict] = []
+    stack = [(iter(tree.get(root, ())), result, 1)]
+    while stack:
+        entries, nodes, level = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+        if entry.url_node in seen:
+            continue
+        seen.add(entry.url_node)
+        expand = depth is None or level < depth
+        node = {
+            "id": entry.id,
+            "model": entry.model,
+            "url_node": entry.url_node,
+            "title": entry.title,
+            "permalink": entry.permalink,
+            "status": entry.status,
+            "children_count": len(tree.get(entry.url_node, ())),
+            "children": [] if expand else None,
+        }
+        nodes.append(node)
+        if expand:
+            children = iter(tree.get(entry.url_node, ()))
+            stack.append((children, node["children"], level + 1))
+    return result
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def page_tree_changed(sender, instance, **kwargs):
+    if sender is UrlNode or issubclass(sender, AbstractPage):
+        page_tree.track_change()
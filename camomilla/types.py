@@ -13,10 +13,12 @@ from enum import Enum
 from typing import Optional
 
 from django.contrib.contenttypes.models import ContentType
-from pydantic import ConfigDict, computed_field, model_validator
+from pydantic import ConfigDict, ValidationInfo, computed_field, model_validator
 from rest_framework import serializers
+from structured.cache.cache import CACHE_CONTEXT_KEY
 from structured.pydantic.conditionals import When, conditional_schema
 from structured.pydantic.fields.serializer import FieldSerializer
+from structured.settings import settings as structured_settings
 from structured.pydantic.models import BaseModel
 from typing_extensions import Annotated
 
@@ -27,9 +29,24 @@ from typing_extensions import Annotated
 # menu module). Importing eagerly here keeps the pydantic schema simple
 # — no forward refs to rebuild — and makes the dependency direction
 # explicit: types builds on models, never the reverse.
+from camomilla.managers.pages import prefetch_pages
 from camomilla.models.page import AbstractPage, UrlNode
 
 
+def _structured_batch(info: ValidationInfo, url_node: UrlNode) -> list:
+    """``url_node`` plus the nodes structured fetched alongside it that
+    don't have their page yet."""
+    cache = (info.context or {}).get(CACHE_CONTEXT_KEY) if info else None
+    batch = [url_node]
+    if cache and not structured_settings.STRUCTURED_FIELD_SHARED_CACHE:
+        batch += [
+            node
+            for node in cache.get(UrlNode, {}).values()
+            if node is not url_node and not UrlNode.page.is_cached(node)
+        ]
+    return batch
+
+
 class _AbstractPageMinimalSerializer(serializers.Serializer):
     """Compact representation for the ``page`` derived field on a
     :class:`Permalink` — just enough for an editor or a frontend to
@@ -138,16 +155,29 @@ class Permalink(BaseModel):
     )
 
     @model_validator(mode="after")
-    def _derive_page_and_content_type(self):
+    def _derive_page_and_content_type(self, info: ValidationInfo):
         """Populate the derived ``page`` / ``content_type`` from
         ``url_node`` after validation. Editors only set ``url_node``;
         the rest follows from it.
         """
         if self.link_type == LinkTypes.relational and self.url_node:
-            # Re-resolve via DB so an in-memory ``UrlNode(pk=...)`` placeholder
-            # (e.g. from a JSON payload) gets a fully-hydrated row.
-            url_node_id = getattr(self.url_node, "pk", self.url_node)
-            url_node = UrlNode.objects.filter(pk=url_node_id).first()
+            url_node = self.url_node
+            if (
+                not isinstance(url_node, UrlNode)
+                or url_node._state.adding
+                or structured_settings.STRUCTURED_FIELD_SHARED_CACHE
+            ):
+                # Re-resolve via DB so an in-memory ``UrlNode(pk=...)``
+                # placeholder (e.g. from a JSON payload) gets a
+                # fully-hydrated row. Nodes from structured's process-wide
+                # cache are re-read too: their page would go stale.
+                url_node_id = getattr(url_node, "pk", url_node)
+                url_node = UrlNode.objects.filter(pk=url_node_id).first()
+            if url_node and not UrlNode.page.is_cached(url_node):
+                # Links are validated one by one, but structured loaded
+                # every node of the field at once: hydrate all their pages
+                # now so sibling links find theirs in memory.
+                prefetch_pages(_structured_batch(info, url_node))
             if url_node and url_node.page:
                 self.page = url_node.page
                 self.content_type = ContentType.objects.get_for_model(
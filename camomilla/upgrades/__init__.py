@@ -40,7 +40,10 @@ from camomilla.upgrades.injection import (
     register_injector,
 )
 from camomilla.upgrades.migrations import (
+    BackfillUrlNodeTreePaths,
+    BackfillUrlNodeVisibility,
     MigrateStatusToLifecycle,
+    backfill_url_node_visibility,
     migrate_model_status_to_lifecycle,
     published_at_from_status,
 )
@@ -52,4 +55,7 @@ __all__ = [
     "MigrateStatusToLifecycle",
     "migrate_model_status_to_lifecycle",
     "published_at_from_status",
+    "BackfillUrlNodeVisibility",
+    "backfill_url_node_visibility",
+    "BackfillUrlNodeTreePaths",
 ]
@@ -14,6 +14,10 @@ Available migrations:
 
 * :class:`MigrateStatusToLifecycle` (``status_to_lifecycle``) — camomilla ≤ 6.4
   ``status`` / ``publication_date`` → ``published_at`` / ``deleted_at``.
+* :class:`BackfillUrlNodeVisibility` (``url_node_visibility``) — fills the
+  page visibility columns copied onto ``UrlNode``.
+* :class:`BackfillUrlNodeTreePaths` (``url_node_tree_path``) — computes
+  ``UrlNode.tree_path`` from the page parent keys.
 """
 
 from camomilla.upgrades.migrations.status_to_lifecycle import (
@@ -21,9 +25,21 @@ from camomilla.upgrades.migrations.status_to_lifecycle import (
     migrate_model_status_to_lifecycle,
     published_at_from_status,
 )
+from camomilla.upgrades.migrations.url_node_tree_path import (
+    BackfillUrlNodeTreePaths,
+    historical_tree_relations,
+)
+from camomilla.upgrades.migrations.url_node_visibility import (
+    BackfillUrlNodeVisibility,
+    backfill_url_node_visibility,
+)
 
 __all__ = [
     "MigrateStatusToLifecycle",
     "migrate_model_status_to_lifecycle",
     "published_at_from_status",
+    "BackfillUrlNodeVisibility",
+    "backfill_url_node_visibility",
+    "BackfillUrlNodeTreePaths",
+    "historical_tree_relations",
 ]
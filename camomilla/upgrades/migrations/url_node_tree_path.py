@@ -0,0 +1,102 @@
+"""Upgrade: backfill the materialized page hierarchy, ``UrlNode.tree_path``.
+
+Applies to projects created before ``UrlNode`` carried ``tree_path``.
+
+New ``UrlNode`` column::
+
+    tree_path   CharField   pks of the node's ancestors then its own (``/1/4/9/``)
+
+``AbstractPage.save`` keeps it current from then on, but the rows that
+already exist start out ``""`` (unknown). Nothing breaks — unknown paths fall
+back to walking the parent keys — but breadcrumbs, subtree rebuilds and the
+page tree stay on the slow path until they are backfilled.
+
+The backfill reads the parent key of every page model (one query each), the
+node pks (one query) and writes the paths with ``bulk_update``: the same
+:func:`camomilla.tree.rebuild_tree_paths` that ``camomilla_rebuild_tree``
+runs, pointed at the historical models.
+"""
+
+from django.db.migrations.operations import AddField
+
+from camomilla.upgrades.base import DataMigrationOperation
+from camomilla.upgrades.injection import register_injector
+
+
+def historical_tree_relations(apps):
+    """:func:`camomilla.tree.page_tree_relations` mapped onto the historical
+    models of ``apps``, skipping models or parent keys that don't exist yet.
+    """
+    from camomilla.tree import TreeRelation, page_tree_relations
+
+    relations = []
+    for relation in page_tree_relations():
+        try:
+            model = apps.get_model(relation.model._meta.label)
+            parent_model = apps.get_model(relation.parent_model._meta.label)
+        except LookupError:
+            continue
+        names = {f.name for f in model._meta.get_fields()}
+        if relation.field_name not in names or "url_node" not in names:
+            continue
+        relations.append(
+            TreeRelation(model, relation.field_name, relation.attname, parent_model)
+        )
+    return relations
+
+
+class BackfillUrlNodeTreePaths(DataMigrationOperation):
+    """Custom migration operation that computes every ``UrlNode.tree_path``
+    of the migration's own app from the page parent keys.
+
+    ``camomilla_makemigrations`` inserts it automatically; by hand, place it
+    **after** the ``AddField`` of ``urlnode.tree_path``::
+
+        from camomilla.upgrades.migrations import BackfillUrlNodeTreePaths
+
+        operations = [
+            migrations.AddField("urlnode", "tree_path", ...),
+            BackfillUrlNodeTreePaths(),
+        ]
+    """
+
+    def run(self, apps, schema_editor, app_label):
+        from camomilla.tree import rebuild_tree_paths
+
+        url_node_model = apps.get_model(app_label, "UrlNode")
+        rebuild_tree_paths(url_node_model, historical_tree_relations(apps))
+
+    def describe(self):
+        return "Backfill urlnode tree_path from the page parent keys"
+
+    @property
+    def migration_name_fragment(self):
+        return "backfill_urlnode_tree_path"
+
+
+# -- makemigrations auto-injection -----------------------------------------
+
+
+def _is_tree_path_add(op):
+    return (
+        isinstance(op, AddField)
+        and op.model_name == "urlnode"
+        and op.name == "tree_path"
+    )
+
+
+@register_injector
+def inject_url_node_tree_path(migration):
+    """Append a :class:`BackfillUrlNodeTreePaths` to a migration that adds
+    ``urlnode.tree_path``, so existing nodes don't stay unknown.
+
+    The op goes at the end, after every ``AddField``. Idempotent: a migration
+    that already carries one is left alone.
+    """
+    ops = migration.operations
+    if not any(_is_tree_path_add(o) for o in ops):
+        return []
+    if any(isinstance(o, BackfillUrlNodeTreePaths) for o in ops):
+        return []
+    migration.operations = ops + [BackfillUrlNodeTreePaths()]
+    return ["BackfillUrlNodeTreePaths"]
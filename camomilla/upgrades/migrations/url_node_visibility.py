@@ -0,0 +1,135 @@
+"""Upgrade: backfill the page visibility columns denormalized onto ``UrlNode``.
+
+Applies to projects created before ``UrlNode`` carried a copy of its page's
+visibility.
+
+New ``UrlNode`` columns::
+
+    published_at      DateTimeField  (translatable) — copied from the page
+    indexable         BooleanField   (translatable) — copied from the page
+    deleted_at        DateTimeField  (global)       — copied from the page
+    date_updated_at   DateTimeField  (global)       — copied from the page
+
+``AbstractPage.save`` keeps them current from then on, but the rows that
+already exist start out ``NULL``: until they are backfilled every existing
+page looks unpublished to ``UrlNode.objects.public()`` (the sitemap) and to
+the ``is_public`` / ``status`` annotations.
+
+The backfill is one ``UPDATE`` per page model, each node column set from the
+same column of the page pointing at it (a correlated subquery). Nodes without
+a page are left alone.
+"""
+
+from django.db.migrations.operations import AddField
+from django.db.models import OuterRef, Subquery
+
+from camomilla.upgrades.base import (
+    DataMigrationOperation,
+    iter_models_with_fields,
+    model_lang_codes,
+)
+from camomilla.upgrades.injection import register_injector
+
+
+URL_NODE_VISIBILITY_FIELDS = (
+    "published_at",
+    "indexable",
+    "deleted_at",
+    "date_updated_at",
+)
+
+
+def _visibility_columns(url_node_model, page_model):
+    """Column names present on both models, translated variants included."""
+    node_names = {f.name for f in url_node_model._meta.get_fields()}
+    page_names = {f.name for f in page_model._meta.get_fields()}
+    columns = []
+    for base in URL_NODE_VISIBILITY_FIELDS:
+        names = [base] + [
+            f"{base}_{lang}" for lang in model_lang_codes(url_node_model, base)
+        ]
+        columns.extend(n for n in names if n in node_names and n in page_names)
+    return columns
+
+
+def backfill_url_node_visibility(url_node_model, page_models):
+    """Copy the visibility columns of every page in ``page_models`` onto its
+    url node. Works on historical models; returns the number of updated nodes.
+    """
+    updated = 0
+    for page_model in page_models:
+        url_node = page_model._meta.get_field("url_node")
+        if url_node.related_model._meta.label_lower != url_node_model._meta.label_lower:
+            continue
+        columns = _visibility_columns(url_node_model, page_model)
+        if not columns:
+            continue
+        pages = page_model._base_manager.filter(url_node_id=OuterRef("pk"))
+        updated += url_node_model._base_manager.filter(
+            pk__in=page_model._base_manager.filter(url_node__isnull=False).values(
+                "url_node_id"
+            )
+        ).update(**{column: Subquery(pages.values(column)[:1]) for column in columns})
+    return updated
+
+
+class BackfillUrlNodeVisibility(DataMigrationOperation):
+    """Custom migration operation that copies every page's visibility columns
+    onto its ``UrlNode`` — the one in the migration's own app.
+
+    ``camomilla_makemigrations`` inserts it automatically; by hand, place it
+    **after** the ``AddField`` ops of the new ``urlnode`` columns::
+
+        from camomilla.upgrades.migrations import BackfillUrlNodeVisibility
+
+        operations = [
+            migrations.AddField("urlnode", "published_at", ...),  # + per-language, indexable, deleted_at, date_updated_at
+            BackfillUrlNodeVisibility(),
+        ]
+
+    Page models of every app are covered, so it must run once their
+    visibility columns exist — which they already do on any install that
+    predates the ``UrlNode`` copy.
+    """
+
+    def run(self, apps, schema_editor, app_label):
+        url_node_model = apps.get_model(app_label, "UrlNode")
+        page_models = iter_models_with_fields(
+            apps, "url_node", "published_at", "deleted_at"
+        )
+        backfill_url_node_visibility(url_node_model, page_models)
+
+    def describe(self):
+        return "Backfill urlnode published_at/indexable/deleted_at/date_updated_at from the pages"
+
+    @property
+    def migration_name_fragment(self):
+        return "backfill_urlnode_visibility"
+
+
+# -- makemigrations auto-injection -----------------------------------------
+
+
+def _is_visibility_add(op):
+    return (
+        isinstance(op, AddField)
+        and op.model_name == "urlnode"
+        and op.name.startswith(URL_NODE_VISIBILITY_FIELDS)
+    )
+
+
+@register_injector
+def inject_url_node_visibility(migration):
+    """Append a :class:`BackfillUrlNodeVisibility` to a migration that adds
+    the ``urlnode`` visibility columns, so they don't start out empty.
+
+    The op goes at the end, after every ``AddField``. Idempotent: a migration
+    that already carries one is left alone.
+    """
+    ops = migration.operations
+    if not any(_is_visibility_add(o) for o in ops):
+        return []
+    if any(isinstance(o, BackfillUrlNodeVisibility) for o in ops):
+        return []
+    migration.operations = ops + [BackfillUrlNodeVisibility()]
+    return ["BackfillUrlNodeVisibility"]
@@ -0,0 +1,129 @@
+"""Shared-cache version counters.
+
+Several camomilla subsystems keep derived state in memory (the route
+table, for instance) and need a cheap way to learn that the rows they
+were built from changed in *another* process. Each subsystem owns a
+namespace; writers :func:`bump_version` it, readers compare
+:func:`get_version` with the value they built from.
+
+Counters live in the Django cache selected by ``CAMOMILLA.CACHE.ALIAS``
+(``"default"`` unless configured). Use a shared backend (redis,
+memcached, database) in multi-process deployments: with ``LocMemCache``
+every worker only sees its own bumps, and ``DummyCache`` keeps no
+counter at all (:func:`get_version` answers ``None``).
+"""
+
+import time
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from camomilla import settings
+
+VERSION_KEY_PREFIX = "camomilla:version:"
+
+
+def get_cache():
+    return caches[settings.CACHE_ALIAS]
+
+
+def keeps_versions() -> bool:
+    """Whether the camomilla cache can hold version counters at all."""
+    return not isinstance(get_cache(), DummyCache)
+
+
+def shares_versions() -> bool:
+    """Whether every process sees the counters of the camomilla cache."""
+    return not isinstance(get_cache(), (DummyCache, LocMemCache))
+
+
+def version_key(namespace: str) -> str:
+    return f"{VERSION_KEY_PREFIX}{namespace}"
+
+
+def _seed() -> int:
+    # Counters are seeded from the clock instead of ``0`` so that a cache
+    # flush can't bring a namespace back to a value some reader already
+    # built from (the classic ABA problem).
+    return time.time_ns() // 1000
+
+
+def get_version(namespace: str, timeout: Optional[int] = None) -> Optional[int]:
+    """Current counter for ``namespace``, seeding it when missing.
+
+    A seeded counter expires after ``timeout`` seconds (never by default).
+    ``None`` when the cache can't keep it (``DummyCache``, backend down).
+    """
+    cache = get_cache()
+    key = version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed(), timeout=timeout)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(
+    namespaces: Iterable[str], timeout: Optional[int] = None
+) -> Dict[str, int]:
+    """Bulk variant of :func:`get_version` (one cache round-trip on hit)."""
+    namespaces = list(namespaces)
+    cache = get_cache()
+    found = cache.get_many([version_key(ns) for ns in namespaces])
+    return {
+        ns: found.get(version_key(ns)) or get_version(ns, timeout) for ns in namespaces
+    }
+
+
+def bump_version(*namespaces: str) -> Dict[str, int]:
+    """Increment every namespace counter and return the new values."""
+    cache = get_cache()
+    bumped = {}
+    for namespace in namespaces:
+        key = version_key(namespace)
+        try:
+            bumped[namespace] = cache.incr(key)
+        except ValueError:
+            # Missing key: seed it. ``add`` loses against a concurrent
+            # seeder, in which case we still need our own increment.
+            if not cache.add(key, _seed(), timeout=None):
+                bumped[namespace] = cache.incr(key)
+            else:
+                bumped[namespace] = cache.get(key)
+    return bumped
+
+
+def bump_versions(
+    namespaces: Iterable[str], timeout: Optional[int] = None
+) -> Dict[str, int]:
+    """Move every namespace counter forward in two cache round-trips.
+
+    Meant for many short-lived counters at once (see
+    :mod:`camomilla.tagged_cache`): instead of one ``incr`` each, the new
+    values are read with ``get_many`` and written with ``set_many``, which
+    also (re)sets their ``timeout``. A counter moves to the clock or one
+    past its current value, whichever is higher, so concurrent bumps
+    can't bring it back to a value a reader already built from.
+    """
+    keys = {ns: version_key(ns) for ns in namespaces}
+    if not keys:
+        return {}
+    cache = get_cache()
+    found = cache.get_many(list(keys.values()))
+    seed = _seed()
+    bumped = {ns: max(found.get(key, 0) + 1, seed) for ns, key in keys.items()}
+    cache.set_many({keys[ns]: version for ns, version in bumped.items()}, timeout)
+    return bumped
+
+
+def bump_version_on_commit(*namespaces: str) -> None:
+    """Bump ``namespaces`` once the current transaction commits.
+
+    Readers in other processes rebuild as soon as they see the new
+    counter; bumping before commit would let them rebuild from the old
+    rows and then never look again.
+    """
+    transaction.on_commit(lambda: bump_version(*namespaces))
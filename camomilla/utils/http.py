@@ -0,0 +1,40 @@
+"""Conditional GET helpers for the public routers."""
+
+from typing import Optional
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+
+def conditional_response(
+    request, response, etag: str, last_modified: Optional[float] = None
+):
+    """Stamp ``response`` with a strong ``ETag`` and ``Last-Modified``
+    (left out when ``last_modified`` is ``None``).
+
+    Returns a ``304 Not Modified`` carrying the same validators instead
+    when the request's ``If-None-Match`` / ``If-Modified-Since`` match, so
+    callers can hand back a cached payload without rendering it.
+    """
+    response["ETag"] = quote_etag(etag)
+    if last_modified is not None:
+        last_modified = int(last_modified)
+        response["Last-Modified"] = http_date(last_modified)
+    return get_conditional_response(
+        request,
+        etag=response["ETag"],
+        last_modified=last_modified,
+        response=response,
+    )
+
+
+def not_modified(request, etag: str, last_modified: Optional[float] = None):
+    """The ``304`` answering ``request`` when the client already holds a
+    response with these validators, ``None`` otherwise.
+
+    Lets callers skip building a response whose validators are known
+    beforehand.
+    """
+    response = conditional_response(request, HttpResponse(), etag, last_modified)
+    return response if response.status_code == 304 else None
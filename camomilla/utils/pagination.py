@@ -0,0 +1,226 @@
+"""Keyset (cursor) pagination.
+
+:class:`django.core.paginator.Paginator` counts the rows and then skips
+``OFFSET`` of them: both grow with the table and with the page number.
+:class:`KeysetPaginator` instead remembers the ordering values of the
+last row it returned and asks for the rows after them, which an index
+on the ordering columns answers in the same time on any page. There is
+no count, no page number and no jumping to an arbitrary page: clients
+follow the opaque ``next`` / ``previous`` cursors of each page.
+
+The ordering is the queryset's (``order_by`` and ``reverse()`` included),
+cut at the primary key, which is appended when missing so every row has
+a distinct position. ``NULL`` sorts after every value, in both
+directions. Orderings on expressions other than plain fields (or
+``"?"``) can't be paginated this way: :meth:`KeysetPaginator.supports`
+tells them apart.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Sequence
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q, QuerySet
+from django.db.models.expressions import OrderBy
+
+KEY_PREFIX = "_keyset_"
+
+# ``(field lookup, descending)`` of each ordering column.
+Key = Tuple[str, bool]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _ordering(queryset: QuerySet) -> Optional[List[Key]]:
+    """Effective ordering of ``queryset``, ``None`` when not keyset-able."""
+    query = queryset.query
+    ordering = (
+        query.order_by
+        or (query.default_ordering and queryset.model._meta.ordering)
+        or ()
+    )
+    pk_names = {"pk", queryset.model._meta.pk.name, queryset.model._meta.pk.attname}
+    keys = []
+    for item in ordering:
+        if isinstance(item, str):
+            if item == "?" or "." in item:
+                return None
+            name, descending = item.lstrip("-"), item.startswith("-")
+        elif isinstance(item, OrderBy) and isinstance(item.expression, F):
+            name, descending = item.expression.name, item.descending
+        else:
+            return None
+        if not query.standard_ordering:
+            descending = not descending
+        keys.append((name, descending))
+        if name in pk_names:
+            return keys
+    return keys + [("pk", not query.standard_ordering)]
+
+
+def _flipped(keys: List[Key]) -> List[Key]:
+    return [(name, not descending) for name, descending in keys]
+
+
+def _after(keys: List[Key], values: list) -> Q:
+    """Rows after ``values`` in the ``keys`` order, ``NULL`` being the greatest."""
+    condition = Q(pk__in=[])
+    equal = Q()
+    for (name, descending), value in zip(keys, values):
+        if value is None:
+            if descending:
+                condition |= equal & Q(**{f"{name}__isnull": False})
+            equal &= Q(**{f"{name}__isnull": True})
+        else:
+            if descending:
+                condition |= equal & Q(**{f"{name}__lt": value})
+            else:
+                condition |= equal & (
+                    Q(**{f"{name}__gt": value}) | Q(**{f"{name}__isnull": True})
+                )
+            equal &= Q(**{name: value})
+    return condition
+
+
+def _encode_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime, date, time)):
+        # Full precision: rows are compared for equality on it.
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPage(Sequence):
+    """A page of a :class:`KeysetPaginator`, used like ``Paginator.page()``'s."""
+
+    def __init__(
+        self,
+        object_list: list,
+        paginator: "KeysetPaginator",
+        next_cursor=None,
+        previous_cursor=None,
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    def __init__(self, object_list: QuerySet, per_page: int):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.keys = _ordering(object_list)
+        if self.keys is None:
+            raise ValueError("The queryset ordering can't be paginated by keyset.")
+
+    @staticmethod
+    def supports(queryset: QuerySet) -> bool:
+        return _ordering(queryset) is not None
+
+    @property
+    def signature(self) -> List[str]:
+        return [f"-{name}" if descending else name for name, descending in self.keys]
+
+    def encode_cursor(self, row, backwards: bool = False) -> str:
+        values = [
+            getattr(row, f"{KEY_PREFIX}{index}") for index in range(len(self.keys))
+        ]
+        payload = {"o": self.signature, "v": [_encode_value(value) for value in values]}
+        if backwards:
+            payload["b"] = 1
+        return (
+            urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode())
+            .decode()
+            .rstrip("=")
+        )
+
+    def decode_cursor(self, cursor: str) -> Tuple[list, bool]:
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            values, backwards = payload["v"], bool(payload.get("b"))
+        except (ValueError, TypeError, KeyError):
+            raise InvalidCursor(cursor)
+        if (
+            payload.get("o") != self.signature
+            or not isinstance(values, list)
+            or len(values) != len(self.keys)
+        ):
+            raise InvalidCursor(cursor)
+        return values, backwards
+
+    def _queryset(self, keys: List[Key]) -> QuerySet:
+        queryset = self.object_list
+        if not queryset.query.standard_ordering:
+            queryset = queryset.reverse()
+        return queryset.annotate(
+            **{f"{KEY_PREFIX}{index}": F(name) for index, (name, _) in enumerate(keys)}
+        ).order_by(
+            *[
+                (
+                    F(name).desc(nulls_first=True)
+                    if descending
+                    else F(name).asc(nulls_last=True)
+                )
+                for name, descending in keys
+            ]
+        )
+
+    def _rows(self, keys: List[Key], values: Optional[list]) -> list:
+        queryset = self._queryset(keys)
+        if values is not None:
+            queryset = queryset.filter(_after(keys, values))
+        return list(queryset[: self.per_page + 1])
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """The page after (or, for a ``previous`` cursor, before) ``cursor``.
+
+        Invalid cursors give the first page, like out of range page
+        numbers do with ``Paginator``.
+        """
+        values, backwards = None, False
+        if cursor:
+            try:
+                values, backwards = self.decode_cursor(cursor)
+                rows = self._rows(
+                    _flipped(self.keys) if backwards else self.keys, values
+                )
+            except (InvalidCursor, ValidationError, ValueError, TypeError):
+                values, backwards = None, False
+        if values is None:
+            rows = self._rows(self.keys, None)
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, more
+        else:
+            has_next, has_previous = more, values is not None
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0], backwards=True)
+                if rows and has_previous
+                else None
+            ),
+        )
@@ -1,6 +1,15 @@
 import functools
-from django.utils.translation import activate
+import hashlib
+from typing import Any, Callable, Optional
+
+from django.utils.translation import activate, get_language
 from django.views.decorators.cache import cache_page
+from rest_framework.response import Response
+
+from camomilla.conditional import Validators
+from camomilla.html_cache import lifecycle_generation, lifecycle_timeout
+from camomilla.tagged_cache import tagged_cache
+from camomilla.utils.http import conditional_response, not_modified
 from camomilla.settings import LANGUAGE_CODES, DEFAULT_LANGUAGE
 
 
@@ -44,3 +53,63 @@ def staff_excluded_cache(timing=None):
         return wrapped_func
 
     return decorator
+
+
+def public_cache_key(request, name: str, timeout: Optional[int]) -> Optional[str]:
+    """Tagged-cache key of a public router payload, ``None`` to bypass the cache.
+
+    Staff users always bypass it. The key embeds the lifecycle generation
+    (see :func:`camomilla.html_cache.lifecycle_generation`), the active
+    language and the full path.
+    """
+    user = getattr(request, "user", None)
+    if not timeout or (user and user.is_authenticated and user.is_staff):
+        return None
+    lifecycle, _ = lifecycle_generation()
+    path = hashlib.sha1(request.get_full_path().encode("utf-8")).hexdigest()
+    return f"{name}:{lifecycle}:{get_language()}:{path}"
+
+
+def tagged_response(
+    request,
+    key: Optional[str],
+    build: Callable[[], Any],
+    timeout: int,
+    validators: Optional[Callable[[], Optional[Validators]]] = None,
+) -> Response:
+    """Serve the payload returned by ``build`` through the tagged cache.
+
+    Cached payloads carry an ``ETag`` / ``Last-Modified`` pair and
+    conditional requests that match get a ``304`` without ``build``
+    running. ``key=None`` builds and returns the payload uncached.
+
+    ``validators`` computes the payload's validators without building it
+    (see :func:`camomilla.conditional.page_validators`): when it returns
+    some, a matching request gets its ``304`` before ``build`` runs, cache
+    or no cache, and the payload is sent and cached with them.
+    """
+    if key is not None:
+        entry = tagged_cache.get_entry(key)
+        if entry is not None:
+            return conditional_response(
+                request, Response(entry.value), entry.etag, entry.last_modified
+            )
+    # The rows read by ``validators`` are dependencies of the payload too.
+    with tagged_cache.collect() as tags:
+        stamped = validators() if validators else None
+        unchanged = stamped and not_modified(request, *stamped)
+        if unchanged:
+            return unchanged
+        data = build()
+    if key is None:
+        response = Response(data)
+        if stamped is None:
+            return response
+        return conditional_response(request, response, *stamped)
+    _, moment = lifecycle_generation()
+    entry = tagged_cache.set(
+        key, data, tags, lifecycle_timeout(timeout, moment), validators=stamped
+    )
+    return conditional_response(
+        request, Response(entry.value), entry.etag, entry.last_modified
+    )
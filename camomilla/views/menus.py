@@ -11,7 +11,8 @@ from camomilla.models.page import UrlNode
 from camomilla.serializers import ContentTypeSerializer, MenuSerializer
 from camomilla.serializers.page import UrlNodeSerializer
 from camomilla.views.base import BaseModelViewset
-from camomilla.views.decorators import active_lang
+from camomilla.settings import MENU_ROUTER_CACHE
+from camomilla.views.decorators import active_lang, public_cache_key, tagged_response
 from camomilla.views.mixins import GetUserLanguageMixin
 
 
@@ -82,7 +83,11 @@ class MenuViewSet(GetUserLanguageMixin, BaseModelViewset):
     @action(detail=False, methods=["get"], url_path="search_urlnode")
     def search_urlnode(self, request, *args, **kwargs):
         url_node = request.GET.get("q", "")
-        qs = UrlNode.objects.filter(permalink__icontains=url_node).order_by("permalink")
+        qs = (
+            UrlNode.objects.filter(permalink__icontains=url_node)
+            .with_pages()
+            .order_by("permalink")
+        )
         return Response(UrlNodeSerializer(qs, many=True).data)
 
 
@@ -99,9 +104,22 @@ def menus_router(request, key=""):
     Language-aware via ``?language=<code>`` (or ``?lang=``), falling back to
     the default language. Returns the full ``MenuSerializer`` payload; the
     ``action`` context is forced off ``"list"`` so ``nodes`` are included.
+
+    Cached like ``pages_router``, for ``CAMOMILLA.API.MENUS.ROUTER_CACHE``
+    seconds, and answers conditional requests with ``304 Not Modified``.
     """
-    # ponytail: resolves by key only, disabled menus included. Add
-    # ``enabled=True`` to the lookup if disabled menus must 404 publicly.
-    menu = get_object_or_404(Menu, key=key)
-    data = MenuSerializer(menu, context={"request": request, "action": "retrieve"}).data
-    return Response(data)
+
+    def build():
+        # ponytail: resolves by key only, disabled menus included. Add
+        # ``enabled=True`` to the lookup if disabled menus must 404 publicly.
+        menu = get_object_or_404(Menu, key=key)
+        return MenuSerializer(
+            menu, context={"request": request, "action": "retrieve"}
+        ).data
+
+    return tagged_response(
+        request,
+        public_cache_key(request, "menus-router", MENU_ROUTER_CACHE),
+        build,
+        MENU_ROUTER_CACHE,
+    )
@@ -2,10 +2,14 @@ from rest_framework.response import Response
 from django.db.models import Q
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.contrib.postgres.search import SearchVector, SearchQuery, TrigramSimilarity
+from camomilla.utils.pagination import KeysetPage, KeysetPaginator
 from camomilla.utils.query_parser import ConditionParser
 from django.db import connection
 from django.utils.module_loading import import_string
 
+PAGINATION_PAGE = "page"
+PAGINATION_CURSOR = "cursor"
+
 
 class TrigramSearchMixin:
     def handle_search(self, list_handler=None, search_fields=None):
@@ -29,6 +33,18 @@ class TrigramSearchMixin:
 
 
 class PaginateStackMixin:
+    # ``"cursor"`` switches the lists to keyset pagination, see
+    # :mod:`camomilla.utils.pagination`. ``?pagination=`` overrides it.
+    pagination_mode = PAGINATION_PAGE
+
+    def get_pagination_mode(self):
+        mode = self.request.GET.get("pagination")
+        if mode in (PAGINATION_PAGE, PAGINATION_CURSOR):
+            return mode
+        if self.request.GET.get("cursor"):
+            return PAGINATION_CURSOR
+        return self.pagination_mode
+
     def get_model(self, list_handler=None):
         list_handler = list_handler if list_handler is not None else self.get_queryset()
         return getattr(
@@ -42,6 +58,10 @@ class PaginateStackMixin:
             or self.request.GET.get("items")
             or getattr(self, "items_per_page", 30)
         )
+        if self.get_pagination_mode() == PAGINATION_CURSOR and KeysetPaginator.supports(
+            list_handler
+        ):
+            return self.handle_cursor_pagination(list_handler, items_per_page)
         paginator = Paginator(
             list_handler,
             items_per_page if items_per_page != -1 else list_handler.count(),
@@ -59,6 +79,15 @@ class PaginateStackMixin:
 
         return paginator, elements
 
+    def handle_cursor_pagination(self, list_handler, items_per_page):
+        """Keyset pagination: no ``COUNT(*)``, no ``OFFSET``, ``?cursor=`` instead of ``?page=``."""
+        if items_per_page == -1:
+            elements = list(list_handler)
+            paginator = KeysetPaginator(list_handler, len(elements))
+            return paginator, KeysetPage(elements, paginator)
+        paginator = KeysetPaginator(list_handler, items_per_page)
+        return paginator, paginator.page(self.request.GET.get("cursor"))
+
     def handle_ordering(self, list_handler=None):
         list_handler = list_handler if list_handler is not None else self.get_queryset()
         sort = [p for p in self.request.GET.get("sort", "").split(",") if p]
@@ -113,10 +142,22 @@ class PaginateStackMixin:
             SerializerClass = import_string(SerializerClass)
         else:
             SerializerClass = SerializerClass or self.get_serializer_class()
+        items = SerializerClass(
+            elements, many=True, context=self.get_serializer_context()
+        ).data
+        if isinstance(elements, KeysetPage):
+            return {
+                "items": items,
+                "paginator": {
+                    "next": elements.next_cursor,
+                    "previous": elements.previous_cursor,
+                    "has_next": elements.has_next(),
+                    "has_previous": elements.has_previous(),
+                    "page_size": paginator.per_page,
+                },
+            }
         return {
-            "items": SerializerClass(
-                elements, many=True, context=self.get_serializer_context()
-            ).data,
+            "items": items,
             "paginator": {
                 "count": paginator.count,
                 "page": elements.number,
@@ -128,8 +169,11 @@ class PaginateStackMixin:
         }
 
     def list(self, *args, **kwargs):
-        active = getattr(self, "force_active", False) or (
-            self.request.GET.get("items", -1) != -1
+        active = (
+            getattr(self, "force_active", False)
+            or self.request.GET.get("items", -1) != -1
+            or "cursor" in self.request.GET
+            or self.request.GET.get("pagination") == PAGINATION_CURSOR
         )
         if active:
             return Response(
@@ -1,24 +1,36 @@
 from datetime import datetime
+from functools import lru_cache, partial
 
 from django.http import Http404
-from django.shortcuts import get_object_or_404, render
+from django.shortcuts import render
 from django.utils.dateparse import parse_datetime
 from django.utils.translation.trans_real import activate as activate_language
 from rest_framework import permissions, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 
+from camomilla.conditional import page_validators
+from camomilla.instrumentation import span
 from camomilla.models import Page
 from camomilla.models.page import UrlNode, UrlRedirect
 from camomilla.preview import reversion_available
+from camomilla.routing import resolve_url_node
 from camomilla.serializers import PageSerializer
 from camomilla.serializers.page import RouteSerializer
-from camomilla.settings import API_TRANSLATION_ACCESSOR, PAGE_ROUTER_CACHE
+from camomilla.settings import (
+    API_TRANSLATION_ACCESSOR,
+    LANGUAGE_CODES,
+    PAGE_ROUTER_CACHE,
+    PAGE_TREE_DEPTH,
+)
+from camomilla.tree import page_tree, render_page_tree
 from camomilla.utils.translation import url_lang_decompose
 from camomilla.views.base import BaseModelViewset
-from camomilla.views.decorators import staff_excluded_cache
+from camomilla.views.decorators import public_cache_key, tagged_response
 from camomilla.views.mixins import BulkDeleteMixin, GetUserLanguageMixin
 
+BULK_LIFECYCLE_ACTIONS = ("publish", "schedule", "discard_draft")
+
 
 def _draft_overlay(page, serialized: dict) -> dict:
     """Merge the active-language Draft on top of ``serialized``.
@@ -55,6 +67,29 @@ class PageViewSet(GetUserLanguageMixin, BulkDeleteMixin, BaseModelViewset):
     serializer_class = PageSerializer
     model = Page
 
+    @action(detail=False, methods=["get"], url_path="tree")
+    def tree(self, request):
+        """Page hierarchy across every page model, in the active language.
+
+        ``?root=<url_node>`` returns the pages below that url node and
+        ``?depth=<n>`` (default ``CAMOMILLA.API.PAGES.TREE_DEPTH``, ``0``
+        for no limit) cuts deeper branches: their ``children`` is ``null``
+        and ``children_count`` tells whether rooting a new request there
+        is worth it. Served from a cached index (see
+        :class:`camomilla.tree.PageTreeCache`).
+        """
+        params = request.query_params
+        try:
+            root = int(params["root"]) if params.get("root") else None
+            depth = int(params.get("depth", PAGE_TREE_DEPTH))
+        except ValueError:
+            return Response(
+                {"detail": "root and depth must be integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        tree = page_tree.get(self.active_language)
+        return Response(render_page_tree(tree, root=root, depth=depth or None))
+
     @action(detail=True, methods=["patch", "put"], url_path="draft")
     def draft(self, request, pk=None):
         """Save the request body as the active language's pending Draft.
@@ -116,6 +151,72 @@ class PageViewSet(GetUserLanguageMixin, BulkDeleteMixin, BaseModelViewset):
         page.schedule(dt)
         return Response(self.get_serializer(page).data)
 
+    @action(detail=False, methods=["post"], url_path="bulk-lifecycle")
+    def bulk_lifecycle(self, request):
+        """Publish, schedule or discard drafts of many pages at once.
+
+        Body::
+
+            {
+                "action": "publish" | "schedule" | "discard_draft",
+                "pages": [{"id": 1, "languages": ["en", "it"]}, {"id": 2}],
+                "publish_at": "<ISO 8601 datetime>",  # schedule only
+                "comment": "..."  # publish only
+            }
+
+        ``id`` must be an integer and ``languages`` a non-empty list of
+        language codes; it defaults to the active language. Runs in a single
+        transaction through the ``PageQuerySet.bulk_*`` methods.
+        """
+        body = request.data if isinstance(request.data, dict) else {}
+        bulk_action = body.get("action")
+        if bulk_action not in BULK_LIFECYCLE_ACTIONS:
+            return Response(
+                {"action": f"Expected one of {', '.join(BULK_LIFECYCLE_ACTIONS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        languages = {}
+        for item in body.get("pages") or []:
+            item = item if isinstance(item, dict) else {"id": item}
+            pk, codes = item.get("id"), item.get("languages")
+            if codes is None:
+                codes = [self.active_language]
+            # ``bool`` is an ``int`` subclass: ``true`` is no page id.
+            valid_id = isinstance(pk, int) and not isinstance(pk, bool)
+            valid_codes = (
+                isinstance(codes, list)
+                and bool(codes)
+                and all(isinstance(code, str) for code in codes)
+                and set(codes) <= set(LANGUAGE_CODES)
+            )
+            if not valid_id or not valid_codes:
+                return Response(
+                    {"pages": f"Invalid item: {item}."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            languages[pk] = codes
+        if not languages:
+            return Response(
+                {"pages": "This field is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        pages = self.get_queryset().filter(pk__in=languages)
+        if bulk_action == "publish":
+            comment = body.get("comment", "") or ""
+            count = pages.bulk_publish(languages, comment=comment)
+        elif bulk_action == "schedule":
+            raw = body.get("publish_at")
+            dt = parse_datetime(raw) if isinstance(raw, str) else None
+            if dt is None:
+                return Response(
+                    {"publish_at": "Invalid datetime."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            count = pages.bulk_schedule(dt, languages)
+        else:
+            count = pages.bulk_discard_drafts(languages)
+        return Response({"action": bulk_action, "count": count})
+
     @action(detail=True, methods=["get"], url_path="preview")
     def preview(self, request, pk=None):
         """Author/admin-only JSON preview: live page + draft overlay.
@@ -171,6 +272,7 @@ class PageViewSet(GetUserLanguageMixin, BulkDeleteMixin, BaseModelViewset):
         return Response(self.get_serializer(page).data)
 
 
+@span("route")
 def _resolve_route_request(permalink: str) -> tuple[UrlNode, dict | None]:
     """Resolve a request permalink to its ``UrlNode`` and, when the request
     form differs from the canonical form, a ``{redirect, status: 301}``
@@ -183,6 +285,9 @@ def _resolve_route_request(permalink: str) -> tuple[UrlNode, dict | None]:
     trailing-slash, bare-lang-prefix, and lang-sub-path-no-slash mismatches
     at once.
 
+    The node comes from the in-memory route table (see
+    :mod:`camomilla.routing`), already carrying its page.
+
     Raises ``Http404`` when no ``UrlNode`` matches. Public-vs-preview
     policy (``is_public`` gate, ``publish_if_due`` materialisation, draft
     overlay) is the caller's responsibility.
@@ -198,7 +303,9 @@ def _resolve_route_request(permalink: str) -> tuple[UrlNode, dict | None]:
         if decomposed_permalink == "/"
         else decomposed_permalink.rstrip("/")
     )
-    node: UrlNode = get_object_or_404(UrlNode, permalink=lookup_path)
+    node = resolve_url_node(lookup_path)
+    if node is None:
+        raise Http404("No UrlNode matches the given query.")
     full_requested_path = (
         permalink if permalink.startswith("/") else "/" + permalink
     )
@@ -212,7 +319,6 @@ def _resolve_route_request(permalink: str) -> tuple[UrlNode, dict | None]:
 
 
 @api_view(["GET"])
-@staff_excluded_cache(PAGE_ROUTER_CACHE)
 @permission_classes(
     [
         permissions.AllowAny,
@@ -232,12 +338,37 @@ def pages_router(request, permalink=""):
     auth-required, bypasses ``is_public`` and overlays the Draft) and by
     ``PageViewSet.preview`` / ``PageViewSet.render_preview`` (page-id
     routed, used by the admin Draft Inspector).
+
+    Payloads are cached for ``CAMOMILLA.API.PAGES.ROUTER_CACHE`` seconds
+    (staff users bypass the cache), tagged with every row they were built
+    from (see :mod:`camomilla.tagged_cache`) and capped at the next
+    lifecycle transition, so edits and publishes show up immediately.
+    Conditional requests (``If-None-Match`` / ``If-Modified-Since``) get a
+    ``304 Not Modified`` from the cache, or once the route is resolved,
+    before ``RouteSerializer`` runs (see :mod:`camomilla.conditional`).
     """
     redirect_obj = UrlRedirect.find_redirect_from_url(f"/{permalink}")
     if redirect_obj:
         redirected = redirect_obj.redirect()
         return Response({"redirect": redirected.url, "status": redirected.status_code})
 
+    # Resolved once, by whichever of validators and build runs first.
+    route = lru_cache(maxsize=None)(partial(_resolve_public_route, permalink))
+    return tagged_response(
+        request,
+        public_cache_key(request, "pages-router", PAGE_ROUTER_CACHE),
+        lambda: _public_route_payload(request, *route()),
+        PAGE_ROUTER_CACHE,
+        validators=lambda: page_validators(request, route()[1], "pages-router"),
+    )
+
+
+def _resolve_public_route(permalink: str):
+    """``(node, page, canonical)`` of the public page at ``permalink``.
+
+    Publishes the page's due draft first; raises ``Http404`` when the
+    page isn't public.
+    """
     node, canonical = _resolve_route_request(permalink)
     page = node.page
 
@@ -256,12 +387,13 @@ def pages_router(request, permalink=""):
     # on the way in.
     if not page.is_public:
         raise Http404("Page is not public")
+    return node, page, canonical
 
-    if canonical is not None:
-        return Response(canonical)
 
-    data = RouteSerializer(node, context={"request": request}).data
-    return Response(data)
+def _public_route_payload(request, node, page, canonical) -> dict:
+    if canonical is not None:
+        return canonical
+    return RouteSerializer(node, context={"request": request}).data
 
 
 @api_view(["GET"])
@@ -0,0 +1,300 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:58
+
+import camomilla.fields.json
+import camomilla.models.menu
+import camomilla.storages.optimize
+import django.db.models.deletion
+import djsuperadmin.mixins
+import structured.fields
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Menu',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(default=uuid.uuid4, max_length=200, unique=True)),
+                ('available_classes', models.JSONField(default=dict, editable=False)),
+                ('enabled', models.BooleanField(default=True)),
+                ('nodes', structured.fields.StructuredJSONField(default=list, schema=camomilla.models.menu.MenuNode)),
+                ('nodes_it', structured.fields.StructuredJSONField(default=list, null=True, schema=camomilla.models.menu.MenuNode)),
+                ('nodes_en', structured.fields.StructuredJSONField(default=list, null=True, schema=camomilla.models.menu.MenuNode)),
+            ],
+            options={
+                'verbose_name': 'menu',
+                'verbose_name_plural': 'menus',
+            },
+        ),
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('name_it', models.CharField(max_length=200, null=True, unique=True)),
+                ('name_en', models.CharField(max_length=200, null=True, unique=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='UrlNode',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('permalink', models.CharField(max_length=400, null=True, unique=True)),
+                ('permalink_it', models.CharField(max_length=400, null=True, unique=True)),
+                ('permalink_en', models.CharField(max_length=400, null=True, unique=True)),
+                ('related_name', models.CharField(max_length=200)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Content',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identifier', models.CharField(max_length=255)),
+                ('content', models.TextField(default='')),
+                ('content_it', models.TextField(default='', null=True)),
+                ('content_en', models.TextField(default='', null=True)),
+                ('object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'abstract': False,
+                'unique_together': {('identifier', 'content_type', 'object_id')},
+            },
+            bases=(djsuperadmin.mixins.DjSuperAdminMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ContentVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='camomilla.content')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='MediaFolder',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('slug', models.SlugField(blank=True, editable=False, max_length=200, null=True)),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('path', models.TextField(blank=True, editable=False, null=True)),
+                ('updir', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='child_folders', to='camomilla.mediafolder')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Media',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alt_text', models.CharField(blank=True, max_length=200, null=True)),
+                ('alt_text_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('alt_text_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('title', models.CharField(blank=True, max_length=200, null=True)),
+                ('title_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('title_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('description_it', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('file', models.FileField(storage=camomilla.storages.optimize.OptimizedStorage(), upload_to='')),
+                ('thumbnail', models.ImageField(blank=True, max_length=500, null=True, upload_to='thumbnails')),
+                ('created', models.DateTimeField(auto_now=True)),
+                ('size', models.IntegerField(blank=True, default=0, editable=False, null=True)),
+                ('mime_type', models.CharField(blank=True, editable=False, max_length=128, null=True)),
+                ('image_props', camomilla.fields.json.JSONField(blank=True, default=dict, editable=False)),
+                ('renditions', camomilla.fields.json.JSONField(blank=True, default=dict, editable=False)),
+                ('renditions_config', camomilla.fields.json.JSONField(blank=True, default=list, null=True)),
+                ('folder', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media_folder', to='camomilla.mediafolder')),
+            ],
+            options={
+                'ordering': ['-pk'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Page',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200, null=True)),
+                ('title_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('title_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('description_it', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('og_description', models.TextField(blank=True, null=True)),
+                ('og_description_it', models.TextField(blank=True, null=True)),
+                ('og_description_en', models.TextField(blank=True, null=True)),
+                ('og_title', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_title_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_title_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_type', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_type_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_type_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_url', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_url_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_url_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('canonical', models.CharField(blank=True, max_length=200, null=True)),
+                ('canonical_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('canonical_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('keywords', models.CharField(blank=True, max_length=200, null=True)),
+                ('keywords_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('keywords_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('identifier', models.CharField(default=uuid.uuid4, max_length=200, null=True, unique=True)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_updated_at', models.DateTimeField(auto_now=True)),
+                ('breadcrumbs_title', models.CharField(blank=True, max_length=128, null=True)),
+                ('breadcrumbs_title_it', models.CharField(blank=True, max_length=128, null=True)),
+                ('breadcrumbs_title_en', models.CharField(blank=True, max_length=128, null=True)),
+                ('template', models.CharField(blank=True, max_length=500, null=True)),
+                ('template_data', models.JSONField(blank=True, default=dict)),
+                ('template_data_it', models.JSONField(blank=True, default=dict, null=True)),
+                ('template_data_en', models.JSONField(blank=True, default=dict, null=True)),
+                ('ordering', models.PositiveIntegerField(default=0)),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+                ('published_at_it', models.DateTimeField(blank=True, null=True)),
+                ('published_at_en', models.DateTimeField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('indexable', models.BooleanField(default=True)),
+                ('indexable_it', models.BooleanField(default=True)),
+                ('indexable_en', models.BooleanField(default=True)),
+                ('autopermalink', models.BooleanField(default=True)),
+                ('autopermalink_it', models.BooleanField(default=True)),
+                ('autopermalink_en', models.BooleanField(default=True)),
+                ('og_image', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_og_images', to='camomilla.media')),
+                ('parent_page', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_child_pages', to='camomilla.page')),
+                ('url_node', models.OneToOneField(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='camomilla.urlnode')),
+            ],
+            options={
+                'verbose_name': 'Page',
+                'verbose_name_plural': 'Pages',
+                'ordering': ('ordering',),
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Article',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200, null=True)),
+                ('title_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('title_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('description_it', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('og_description', models.TextField(blank=True, null=True)),
+                ('og_description_it', models.TextField(blank=True, null=True)),
+                ('og_description_en', models.TextField(blank=True, null=True)),
+                ('og_title', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_title_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_title_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_type', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_type_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_type_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_url', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_url_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('og_url_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('canonical', models.CharField(blank=True, max_length=200, null=True)),
+                ('canonical_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('canonical_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('keywords', models.CharField(blank=True, max_length=200, null=True)),
+                ('keywords_it', models.CharField(blank=True, max_length=200, null=True)),
+                ('keywords_en', models.CharField(blank=True, max_length=200, null=True)),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('identifier', models.CharField(default=uuid.uuid4, max_length=200, null=True, unique=True)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_updated_at', models.DateTimeField(auto_now=True)),
+                ('breadcrumbs_title', models.CharField(blank=True, max_length=128, null=True)),
+                ('breadcrumbs_title_it', models.CharField(blank=True, max_length=128, null=True)),
+                ('breadcrumbs_title_en', models.CharField(blank=True, max_length=128, null=True)),
+                ('template', models.CharField(blank=True, max_length=500, null=True)),
+                ('template_data', models.JSONField(blank=True, default=dict)),
+                ('template_data_it', models.JSONField(blank=True, default=dict, null=True)),
+                ('template_data_en', models.JSONField(blank=True, default=dict, null=True)),
+                ('ordering', models.PositiveIntegerField(default=0)),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+                ('published_at_it', models.DateTimeField(blank=True, null=True)),
+                ('published_at_en', models.DateTimeField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('indexable', models.BooleanField(default=True)),
+                ('indexable_it', models.BooleanField(default=True)),
+                ('indexable_en', models.BooleanField(default=True)),
+                ('autopermalink', models.BooleanField(default=True)),
+                ('autopermalink_it', models.BooleanField(default=True)),
+                ('autopermalink_en', models.BooleanField(default=True)),
+                ('content', models.TextField(default='')),
+                ('content_it', models.TextField(default='', null=True)),
+                ('content_en', models.TextField(default='', null=True)),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_authored_articles', to=settings.AUTH_USER_MODEL)),
+                ('parent_page', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_child_pages', to='camomilla.article')),
+                ('highlight_image', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_highlight_images', to='camomilla.media')),
+                ('og_image', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_og_images', to='camomilla.media')),
+                ('tags', models.ManyToManyField(blank=True, related_name='%(app_label)s_%(class)s_tags', to='camomilla.tag')),
+                ('url_node', models.OneToOneField(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s', to='camomilla.urlnode')),
+            ],
+            options={
+                'ordering': ['ordering'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Draft',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('language', models.CharField(blank=True, default='', max_length=10)),
+                ('serialized', models.JSONField(blank=True, default=dict)),
+                ('scheduled_for', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drafts', to='contenttypes.contenttype')),
+                ('created_by', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Draft',
+                'verbose_name_plural': 'Drafts',
+                'ordering': ('-updated_at',),
+                'indexes': [models.Index(fields=['scheduled_for'], name='camomilla_d_schedul_a4ce18_idx')],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id', 'language'), name='unique_draft_per_page_language')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UrlRedirect',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language_code', models.CharField(max_length=10, null=True)),
+                ('from_url', models.CharField(max_length=400)),
+                ('to_url', models.CharField(max_length=400)),
+                ('permanent', models.BooleanField(default=True)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_updated_at', models.DateTimeField(auto_now=True)),
+                ('url_node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='redirects', to='camomilla.urlnode')),
+            ],
+            options={
+                'verbose_name': 'Redirect',
+                'verbose_name_plural': 'Redirects',
+                'indexes': [models.Index(fields=['from_url', 'language_code'], name='camomilla_u_from_ur_7de5b4_idx')],
+                'unique_together': {('from_url', 'language_code')},
+            },
+        ),
+    ]
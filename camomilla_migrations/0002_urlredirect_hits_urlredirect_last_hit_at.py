@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("camomilla", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="urlredirect",
+            name="hits",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="urlredirect",
+            name="last_hit_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("camomilla", "0002_urlredirect_hits_urlredirect_last_hit_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="urlnode",
+            name="date_updated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="urlnode",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="urlnode",
+            name="indexable",
+            field=models.BooleanField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="urlnode",
+            name="indexable_en",
+            field=models.BooleanField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="urlnode",
+            name="indexable_it",
+            field=models.BooleanField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="urlnode",
+            name="published_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="urlnode",
+            name="published_at_en",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="urlnode",
+            name="published_at_it",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="urlnode",
+            index=models.Index(
+                fields=["published_at_it", "deleted_at"],
+                name="camomilla_urlnode_pub_it",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="urlnode",
+            index=models.Index(
+                fields=["published_at_en", "deleted_at"],
+                name="camomilla_urlnode_pub_en",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("camomilla", "0003_urlnode_date_updated_at_urlnode_deleted_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="urlnode",
+            name="tree_path",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:06
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("camomilla", "0004_urlnode_tree_path"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="media",
+            name="alt_text_en",
+        ),
+        migrations.RemoveField(
+            model_name="media",
+            name="alt_text_it",
+        ),
+        migrations.RemoveField(
+            model_name="media",
+            name="description_en",
+        ),
+        migrations.RemoveField(
+            model_name="media",
+            name="description_it",
+        ),
+        migrations.RemoveField(
+            model_name="media",
+            name="title_en",
+        ),
+        migrations.RemoveField(
+            model_name="media",
+            name="title_it",
+        ),
+        migrations.RemoveField(
+            model_name="tag",
+            name="name_en",
+        ),
+        migrations.RemoveField(
+            model_name="tag",
+            name="name_it",
+        ),
+    ]
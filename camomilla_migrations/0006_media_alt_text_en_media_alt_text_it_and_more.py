@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "camomilla",
+            "0005_remove_media_alt_text_en_remove_media_alt_text_it_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="media",
+            name="alt_text_en",
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="alt_text_it",
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="description_en",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="description_it",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="title_en",
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="title_it",
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="name_en",
+            field=models.CharField(max_length=200, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="name_it",
+            field=models.CharField(max_length=200, null=True, unique=True),
+        ),
+    ]
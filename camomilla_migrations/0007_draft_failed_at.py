@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("camomilla", "0006_media_alt_text_en_media_alt_text_it_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="draft",
+            name="failed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -50,6 +50,7 @@ export default defineConfig({
           { text: 'Use Modeltranslation', link: '/How to/Use Modeltranslation/' },
           { text: 'Use API', link: '/How to/Use API/' },
           { text: 'Use Astro Integration', link: '/How to/Use Astro Integration/' },
+          { text: 'Use Caching and Performance', link: '/How to/Use Caching and Performance/' },
           { text: 'Use Settings', link: '/How to/Use Settings/' },
         ],
       },
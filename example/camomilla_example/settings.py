@@ -225,6 +225,8 @@ REST_FRAMEWORK = {
 }
 
 CAMOMILLA = {
+    # Single process with LocMemCache: turn the routing indexes on anyway.
+    "ROUTER": {"ROUTE_TABLE": {"ENABLE": True}},
     "RENDER": {
         "REGISTERED_TEMPLATES_APPS": [
             "website",
@@ -21,8 +21,7 @@ from django.conf.urls.i18n import i18n_patterns
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.static import serve as staticserve
-from django.contrib.sitemaps.views import sitemap
-from camomilla.sitemap import camomilla_sitemaps
+from camomilla.sitemap import sitemap
 
 
 urlpatterns = [
@@ -32,12 +31,8 @@ urlpatterns = [
     path("api/camomilla/", include("camomilla.urls")),
     path("api/models/", include("camomilla.model_api")),
     path("", include("structured.urls")),
-    path(
-        "sitemap.xml",
-        sitemap,
-        {"sitemaps": camomilla_sitemaps},
-        name="django.contrib.sitemaps.views.sitemap",
-    ),
+    path("sitemap.xml", sitemap, name="camomilla-sitemap"),
+    path("sitemap-<int:shard>.xml", sitemap, name="camomilla-sitemap-shard"),
 ]
 
 
@@ -0,0 +1,459 @@
+"""Bulk-create a production-sized synthetic dataset for load testing.
+
+Run via:
+
+    uv run python manage.py seed_scale                        # 10k pages, 5k articles...
+    uv run python manage.py seed_scale --pages 100000 --depth 10 --menu-nodes 5000
+    uv run python manage.py seed_scale --prefix run2           # a second dataset alongside
+
+Where ``seed_demo`` saves a handful of hand-written rows one by one, this
+command writes every table with ``bulk_create``: pages never go through
+``AbstractPage.save``, so their permalinks are composed here, level by
+level, and the url node columns ``save`` maintains (visibility, tree
+path) are filled in bulk afterwards. What it builds, all under the
+``--prefix`` slug so several datasets can coexist:
+
+* page trees ``--depth`` levels deep, in every language, with a mix of
+  published, scheduled, unpublished and trashed pages;
+* article trees with tags, and custom pages hung under the pages (a page
+  model whose parent is another model);
+* pending and scheduled drafts, redirects to random pages;
+* a menu with ``--menu-nodes`` nodes, in every language;
+* media with small synthetic images and their thumbnails. Renditions are
+  left to ``python manage.py regenerate_renditions``.
+
+Caches and the route table are cleared at the end, since bulk writes
+don't send the signals that invalidate them.
+"""
+
+from datetime import timedelta
+from io import BytesIO
+from itertools import cycle
+from random import Random
+from time import perf_counter
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from camomilla import settings
+from camomilla.models import (
+    AbstractPage,
+    Article,
+    Media,
+    MediaFolder,
+    Menu,
+    Page,
+    Tag,
+    URL_NODE_RELATED_NAME,
+    UrlNode,
+    UrlRedirect,
+)
+from camomilla.models.draft import NO_LANGUAGE, Draft
+from camomilla.settings import THUMBNAIL_FOLDER, THUMBNAIL_HEIGHT, THUMBNAIL_WIDTH
+from camomilla.testing import reset_caches
+from camomilla.tree import page_tree_relations, rebuild_tree_paths
+from camomilla.types import LinkTypes
+from camomilla.utils import localized_fieldname, set_nofallbacks
+from example.website.models import CustomPageMetaModel
+
+
+# Title of a page in each language, by model. Slugified into permalinks.
+TITLES = {
+    Page: {"en": "{prefix} page {index}", "it": "{prefix} pagina {index}"},
+    Article: {"en": "{prefix} article {index}", "it": "{prefix} articolo {index}"},
+    CustomPageMetaModel: {"en": "{prefix} custom {index}"},
+}
+
+# ``(lifecycle, weight)`` of the generated pages.
+LIFECYCLES = (
+    ("published", 85),
+    ("scheduled", 5),
+    ("unpublished", 5),
+    ("trashed", 5),
+)
+
+# Pages at the root of each tree, as a share of the model's pages.
+ROOTS_SHARE = 0.02
+# Children per menu node.
+MENU_FANOUT = 8
+# Tags of each article.
+TAGS_PER_ARTICLE = 3
+MEDIA_FOLDERS = 10
+IMAGE_SIZE = (640, 400)
+
+
+def _languages():
+    if settings.ENABLE_TRANSLATIONS:
+        return list(settings.LANGUAGE_CODES)
+    return [None]
+
+
+class Command(BaseCommand):
+    help = "Bulk-create a large synthetic dataset (pages, drafts, redirects, menus, media) for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pages", type=int, default=10000, help="Pages in the page trees."
+        )
+        parser.add_argument(
+            "--depth", type=int, default=8, help="Levels of the page trees."
+        )
+        parser.add_argument("--articles", type=int, default=5000)
+        parser.add_argument(
+            "--custom-pages",
+            type=int,
+            default=1000,
+            help="CustomPageMetaModel rows, each under a random page.",
+        )
+        parser.add_argument("--drafts", type=int, default=500, help="Pending drafts.")
+        parser.add_argument("--scheduled-drafts", type=int, default=200)
+        parser.add_argument("--redirects", type=int, default=5000)
+        parser.add_argument("--menu-nodes", type=int, default=2000)
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--media", type=int, default=500)
+        parser.add_argument(
+            "--prefix",
+            default="scale",
+            help="Slug every generated row is named after; use another one to seed again.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    # ------------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------------
+
+    def handle(self, *args, **options):
+        self.prefix = options["prefix"]
+        self.rng = Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        if options["depth"] < 1:
+            raise CommandError("--depth must be at least 1.")
+        if UrlNode._base_manager.filter(
+            permalink__startswith=f"/{self.prefix}-"
+        ).exists():
+            raise CommandError(
+                f"A dataset with the {self.prefix!r} prefix exists: pass another --prefix or flush the database."
+            )
+        self.started = perf_counter()
+        with transaction.atomic():
+            pages = self._step(
+                "pages",
+                lambda: self._create_pages(Page, options["pages"], options["depth"]),
+            )
+            articles = self._step(
+                "articles",
+                lambda: self._create_pages(
+                    Article, options["articles"], min(options["depth"], 3)
+                ),
+            )
+            self._step(
+                "custom pages",
+                lambda: self._create_pages(
+                    CustomPageMetaModel, options["custom_pages"], 1, parents=pages
+                ),
+            )
+            self._step("tree paths", rebuild_tree_paths)
+            self._step("url nodes", UrlNode.objects.sync_visibility)
+            tags = self._step("tags", lambda: self._create_tags(options["tags"]))
+            self._step("article tags", lambda: self._tag_articles(articles, tags))
+            self._step(
+                "drafts",
+                lambda: self._create_drafts(
+                    pages + articles, options["drafts"], options["scheduled_drafts"]
+                ),
+            )
+            self._step(
+                "redirects",
+                lambda: self._create_redirects(pages + articles, options["redirects"]),
+            )
+            self._step(
+                "menu nodes", lambda: self._create_menu(pages, options["menu_nodes"])
+            )
+            self._step("media", lambda: self._create_media(options["media"]))
+        reset_caches()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded the {self.prefix!r} dataset in {perf_counter() - self.started:.1f}s."
+            )
+        )
+
+    def _step(self, label, create):
+        started = perf_counter()
+        result = create()
+        count = result if isinstance(result, int) else len(result)
+        self.stdout.write(f"  {count:>8} {label:<14} {perf_counter() - started:6.1f}s")
+        return result
+
+    # ------------------------------------------------------------------
+    # Pages — built level by level, parents before their children
+    # ------------------------------------------------------------------
+
+    def _title(self, model, index, lang):
+        titles = TITLES[model]
+        return titles.get(lang, titles["en"]).format(prefix=self.prefix, index=index)
+
+    def _lifecycle(self, page, model):
+        lifecycle = self.rng.choices(
+            [name for name, _ in LIFECYCLES], [weight for _, weight in LIFECYCLES]
+        )[0]
+        published_at = {
+            "published": self.now - timedelta(days=self.rng.randint(1, 1000)),
+            "scheduled": self.now + timedelta(days=self.rng.randint(1, 60)),
+            "unpublished": None,
+            "trashed": self.now - timedelta(days=self.rng.randint(1, 1000)),
+        }[lifecycle]
+        for lang in _languages():
+            setattr(
+                page, localized_fieldname("published_at", lang, model), published_at
+            )
+        if lifecycle == "trashed":
+            page.deleted_at = self.now
+
+    def _build_page(self, model, index, relation, parent):
+        page = model(ordering=index)
+        if parent is not None:
+            setattr(page, relation.field_name, parent)
+        node = UrlNode(related_name=URL_NODE_RELATED_NAME % page.model_info)
+        for lang in _languages():
+            title = self._title(model, index, lang)
+            setattr(page, localized_fieldname("title", lang, model), title)
+            parent_permalink = None
+            if parent is not None:
+                parent_permalink = (
+                    getattr(
+                        parent.url_node, localized_fieldname("permalink", lang, UrlNode)
+                    )
+                    or ""
+                )
+            setattr(
+                node,
+                localized_fieldname("permalink", lang, UrlNode),
+                AbstractPage.compose_permalink(title, parent_permalink),
+            )
+        self._lifecycle(page, model)
+        page.url_node = node
+        return page
+
+    def _create_pages(self, model, count, depth, parents=None):
+        """``count`` pages of ``model`` in ``depth`` levels.
+
+        The first level hangs under ``parents`` when given, else it is
+        made of roots (a small share of the pages).
+        """
+        if count <= 0:
+            return []
+        relation = next(
+            relation for relation in page_tree_relations() if relation.model is model
+        )
+        if parents is None:
+            level_sizes = [max(int(count * ROOTS_SHARE), 1)]
+            if depth > 1:
+                rest = count - level_sizes[0]
+                level_sizes += [rest // (depth - 1)] * (depth - 1)
+                level_sizes[-1] += rest % (depth - 1)
+        else:
+            level_sizes = [count // depth] * depth
+            level_sizes[-1] += count % depth
+        created, previous, index = [], parents, 0
+        for size in level_sizes:
+            level = []
+            for _ in range(size):
+                parent = self.rng.choice(previous) if previous else None
+                level.append(self._build_page(model, index, relation, parent))
+                index += 1
+            nodes = UrlNode.objects.bulk_create(
+                [page.url_node for page in level], batch_size=self.batch_size
+            )
+            for page, node in zip(level, nodes):
+                page.url_node = node
+            model.objects.bulk_create(level, batch_size=self.batch_size)
+            created += level
+            previous = level or previous
+        return created
+
+    # ------------------------------------------------------------------
+    # Tags
+    # ------------------------------------------------------------------
+
+    def _create_tags(self, count):
+        tags = []
+        for index in range(count):
+            tag = Tag()
+            for lang in _languages():
+                name = "tag" if lang in (None, "en") else f"tag {lang}"
+                setattr(
+                    tag,
+                    localized_fieldname("name", lang, Tag),
+                    f"{self.prefix} {name} {index}",
+                )
+            tags.append(tag)
+        return Tag.objects.bulk_create(tags, batch_size=self.batch_size)
+
+    def _tag_articles(self, articles, tags):
+        if not tags:
+            return 0
+        field = Article._meta.get_field("tags")
+        through = field.remote_field.through
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        rows = [
+            through(**{f"{source}_id": article.pk, f"{target}_id": tag.pk})
+            for article in articles
+            for tag in self.rng.sample(tags, min(TAGS_PER_ARTICLE, len(tags)))
+        ]
+        through.objects.bulk_create(rows, batch_size=self.batch_size)
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # Drafts — at most one per page and language
+    # ------------------------------------------------------------------
+
+    def _create_drafts(self, pages, pending, scheduled):
+        languages = [lang or NO_LANGUAGE for lang in _languages()]
+        slots = [(page, lang) for page in pages for lang in languages]
+        picked = self.rng.sample(slots, min(pending + scheduled, len(slots)))
+        content_types = ContentType.objects.get_for_models(
+            *{type(page) for page in pages}
+        )
+        drafts = []
+        for position, (page, lang) in enumerate(picked):
+            title = f"{self._title(type(page), page.ordering, lang or 'en')} (pending)"
+            drafts.append(
+                Draft(
+                    content_type=content_types[type(page)],
+                    object_id=page.pk,
+                    language=lang,
+                    serialized=(
+                        {"translations": {lang: {"title": title}}}
+                        if lang
+                        else {"title": title}
+                    ),
+                    scheduled_for=(
+                        self.now + timedelta(hours=self.rng.randint(1, 24 * 60))
+                        if position >= pending
+                        else None
+                    ),
+                )
+            )
+        return Draft.objects.bulk_create(drafts, batch_size=self.batch_size)
+
+    # ------------------------------------------------------------------
+    # Redirects — through the importer, which tells the redirect index
+    # ------------------------------------------------------------------
+
+    def _create_redirects(self, pages, count):
+        if not pages:
+            return 0
+        languages = cycle(_languages())
+        imported = 0
+        for start in range(0, count, self.batch_size):
+            records = []
+            for index in range(start, min(start + self.batch_size, count)):
+                lang = next(languages)
+                target = self.rng.choice(pages).url_node
+                records.append(
+                    {
+                        "from_url": f"/{self.prefix}-old/{index}",
+                        "to_url": getattr(
+                            target, localized_fieldname("permalink", lang, UrlNode)
+                        ),
+                        "language_code": lang,
+                    }
+                )
+            imported += UrlRedirect.objects.bulk_import(
+                records, batch_size=self.batch_size
+            ).imported
+        return imported
+
+    # ------------------------------------------------------------------
+    # Menu — MENU_FANOUT children per node, breadth first
+    # ------------------------------------------------------------------
+
+    def _create_menu(self, pages, count):
+        links = [
+            (
+                {
+                    "link_type": LinkTypes.relational,
+                    "url_node": self.rng.choice(pages).url_node_id,
+                }
+                if pages and index % 5
+                else {
+                    "link_type": LinkTypes.static,
+                    "static": f"https://example.com/{index}",
+                }
+            )
+            for index in range(count)
+        ]
+        menu = Menu(key=f"{self.prefix}-main")
+        for lang in _languages():
+            nodes = [
+                {
+                    "title": f"{self._title(Page, index, lang or 'en')}",
+                    "link": link,
+                    "nodes": [],
+                }
+                for index, link in enumerate(links)
+            ]
+            for index, node in enumerate(nodes[MENU_FANOUT:], start=MENU_FANOUT):
+                nodes[(index - MENU_FANOUT) // MENU_FANOUT]["nodes"].append(node)
+            set_nofallbacks(menu, "nodes", nodes[:MENU_FANOUT], language=lang)
+        menu.save()
+        return count
+
+    # ------------------------------------------------------------------
+    # Media — synthetic images written straight to the storage
+    # ------------------------------------------------------------------
+
+    def _image(self, size):
+        color = tuple(self.rng.randrange(256) for _ in range(3))
+        image = Image.new("RGB", size, color)
+        image.paste(
+            tuple(255 - channel for channel in color),
+            (size[0] // 4, size[1] // 4, size[0] // 2, size[1] // 2),
+        )
+        buffer = BytesIO()
+        image.save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def _create_media(self, count):
+        root = MediaFolder.objects.create(title=f"{self.prefix} media")
+        folders = [root] + [
+            MediaFolder.objects.create(
+                title=f"{self.prefix} folder {index}", updir=root
+            )
+            for index in range(MEDIA_FOLDERS - 1)
+        ]
+        media = []
+        for index in range(count):
+            name = f"{self.prefix}/image-{index}.png"
+            content = self._image(IMAGE_SIZE)
+            item = Media(
+                file=default_storage.save(name, ContentFile(content)),
+                thumbnail=default_storage.save(
+                    f"{THUMBNAIL_FOLDER}/{self.prefix}/image-{index}_thumb.png",
+                    ContentFile(self._image((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT))),
+                ),
+                size=len(content),
+                mime_type="image/png",
+                image_props={
+                    "width": IMAGE_SIZE[0],
+                    "height": IMAGE_SIZE[1],
+                    "format": "PNG",
+                    "mode": "RGB",
+                },
+                folder=folders[index % len(folders)],
+            )
+            for lang in _languages():
+                setattr(
+                    item,
+                    localized_fieldname("title", lang, Media),
+                    f"{self.prefix} image {index} {lang or ''}".strip(),
+                )
+            media.append(item)
+        return Media.objects.bulk_create(media, batch_size=self.batch_size)
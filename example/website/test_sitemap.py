@@ -15,8 +15,9 @@ def test_sitemap_xml_contains_pages():
     )
 
     client = Client()
-    response = client.get(reverse("django.contrib.sitemaps.views.sitemap"))
+    response = client.get(reverse("camomilla-sitemap"))
     assert response.status_code == 200
-    assert b"<urlset" in response.content
-    assert b"/test-page-1" in response.content
-    assert b"/test-page-2" in response.content
+    content = b"".join(response.streaming_content)
+    assert b"<urlset" in content
+    assert b"/test-page-1" in content
+    assert b"/test-page-2" in content
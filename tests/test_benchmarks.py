@@ -0,0 +1,16 @@
+import pytest
+
+from benchmarks.dataset import seed
+from benchmarks.run import measure
+from benchmarks.scenarios import scenarios
+
+
+@pytest.mark.django_db
+def test_every_scenario_runs(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        dataset = seed(5)
+    for scenario in scenarios(dataset):
+        if scenario.name == "media.upload":
+            continue
+        result = measure(scenario, dataset.size, iterations=1, warmup=0)
+        assert result["iterations"] == 1 and result["p50"] > 0
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import activate
+from rest_framework.test import APIClient
+
+from camomilla.models import Draft, Page
+from camomilla.preview import reversion_available
+from .utils.api import login_superuser
+
+URL = "/api/camomilla/pages/bulk-lifecycle/"
+
+
+@pytest.fixture
+def api():
+    activate("en")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token " + login_superuser())
+    return client
+
+
+def _page_with_drafts(title, languages=("en",)):
+    page = Page.objects.create(
+        title_en=title,
+        title_it=title,
+        published_at_en=timezone.now() - timedelta(days=1),
+    )
+    for language in languages:
+        Draft.objects.create(
+            content_object=page,
+            language=language,
+            serialized={"translations": {language: {"title": f"{title} {language}"}}},
+        )
+    return page
+
+
+@pytest.mark.django_db
+def test_bulk_publish_applies_drafts_per_page_and_language(api):
+    first = _page_with_drafts("first", languages=("en", "it"))
+    second = _page_with_drafts("second")
+    untouched = _page_with_drafts("untouched")
+    if reversion_available():
+        from reversion.models import Revision
+
+        revisions = Revision.objects.count()
+
+    response = api.post(
+        URL,
+        {
+            "action": "publish",
+            "pages": [{"id": first.pk, "languages": ["en", "it"]}, second.pk],
+            "comment": "Launch",
+        },
+        format="json",
+    )
+    assert response.status_code == 200, response.content
+    assert response.json() == {"action": "publish", "count": 3}
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.title_en, first.title_it) == ("first en", "first it")
+    assert first.published_at_it is not None
+    assert second.title_en == "second en"
+    assert list(Draft.objects.values_list("object_id", flat=True)) == [untouched.pk]
+    if reversion_available():
+        assert Revision.objects.count() == revisions + 1
+        assert Revision.objects.latest("pk").comment == "Launch"
+
+
+@pytest.mark.django_db
+def test_bulk_schedule_and_discard(api):
+    live = _page_with_drafts("live")
+    never_public = Page.objects.create(title_en="hidden")
+    when = timezone.now() + timedelta(days=2)
+
+    response = api.post(
+        URL,
+        {
+            "action": "schedule",
+            "pages": [live.pk, never_public.pk],
+            "publish_at": when.isoformat(),
+        },
+        format="json",
+    )
+    assert response.status_code == 200, response.content
+    assert Draft.objects.get(object_id=live.pk).scheduled_for == when
+    never_public.refresh_from_db()
+    assert never_public.published_at_en == when
+
+    response = api.post(
+        URL, {"action": "discard_draft", "pages": [live.pk]}, format="json"
+    )
+    assert response.status_code == 200
+    assert not Draft.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_lifecycle_validates_its_body(api):
+    page = _page_with_drafts("page")
+    for body in (
+        {"action": "delete", "pages": [page.pk]},
+        {"action": "publish", "pages": []},
+        {"action": "publish", "pages": [{"id": page.pk, "languages": ["xx"]}]},
+        {"action": "publish", "pages": [{"id": page.pk, "languages": 5}]},
+        {"action": "publish", "pages": [{"id": page.pk, "languages": "en"}]},
+        {"action": "publish", "pages": [{"id": page.pk, "languages": [["en"]]}]},
+        {"action": "publish", "pages": [{"id": page.pk, "languages": []}]},
+        {"action": "publish", "pages": [True]},
+        {"action": "publish", "pages": [{"id": False}]},
+        {"action": "schedule", "pages": [page.pk], "publish_at": "tomorrow"},
+    ):
+        assert api.post(URL, body, format="json").status_code == 400
+    assert Draft.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_publish_saves_each_page_once(monkeypatch):
+    fresh = Page.objects.create(title_en="fresh")
+    Draft.objects.create(
+        content_object=fresh,
+        language="en",
+        serialized={"translations": {"en": {"title": "fresh en"}}},
+    )
+    bare = Page.objects.create(title_en="bare")
+    saves = []
+    original_save = Page.save
+
+    def save(self, *args, **kwargs):
+        saves.append(self.pk)
+        return original_save(self, *args, **kwargs)
+
+    monkeypatch.setattr(Page, "save", save)
+    activate("en")
+    assert Page.objects.filter(pk__in=[fresh.pk, bare.pk]).bulk_publish() == 2
+    assert sorted(saves) == [fresh.pk, bare.pk]
+    fresh.refresh_from_db()
+    assert fresh.title_en == "fresh en" and fresh.published_at_en is not None
+
+
+@pytest.mark.django_db
+def test_bulk_schedule_counts_what_it_scheduled():
+    live = _page_with_drafts("live")
+    no_draft = Page.objects.create(
+        title_en="no draft", published_at_en=timezone.now() - timedelta(days=1)
+    )
+    never_public = Page.objects.create(title_en="hidden")
+    when = timezone.now() + timedelta(days=2)
+    activate("en")
+    pages = Page.objects.filter(pk__in=[live.pk, no_draft.pk, never_public.pk])
+    # ``no_draft`` is live with nothing pending: skipped.
+    assert pages.bulk_schedule(when) == 2
@@ -0,0 +1,167 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+from rest_framework.test import APIClient
+
+from camomilla import settings
+from camomilla.models import Content, Menu, Page
+from camomilla.routing import route_table
+from camomilla.utils.cache import bump_version
+from camomilla.views import pages as pages_views
+
+api = APIClient()
+client = Client()
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+    route_table.invalidate()
+
+
+@pytest.fixture
+def page(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return Page.objects.create(
+            title_en="Validated",
+            template="website/pages/default.html",
+            published_at=timezone.now() - timedelta(days=1),
+        )
+
+
+def _get(http, url, django_capture_on_commit_callbacks, **headers):
+    with django_capture_on_commit_callbacks(execute=True):
+        return http.get(url, headers=headers)
+
+
+@pytest.mark.django_db
+def test_pages_router_answers_304_without_queries(
+    page, django_capture_on_commit_callbacks
+):
+    url = "/api/camomilla/pages-router/validated/"
+    first = _get(api, url, django_capture_on_commit_callbacks)
+    assert first.status_code == 200
+    etag = first["ETag"]
+    assert etag.startswith('"') and first["Last-Modified"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = _get(api, url, django_capture_on_commit_callbacks, if_none_match=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert len(ctx) == 0
+
+    response = _get(
+        api,
+        url,
+        django_capture_on_commit_callbacks,
+        if_modified_since=first["Last-Modified"],
+    )
+    assert response.status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        page.description_en = "Changed"
+        page.save()
+    response = _get(api, url, django_capture_on_commit_callbacks, if_none_match=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_menus_router_answers_304_until_the_menu_changes(
+    django_capture_on_commit_callbacks,
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        menu = Menu.objects.create(key="conditional")
+    url = "/api/camomilla/menus-router/conditional"
+    etag = _get(api, url, django_capture_on_commit_callbacks)["ETag"]
+    with CaptureQueriesContext(connection) as ctx:
+        response = _get(api, url, django_capture_on_commit_callbacks, if_none_match=etag)
+    assert response.status_code == 304
+    assert len(ctx) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        menu.enabled = False
+        menu.save()
+    response = _get(api, url, django_capture_on_commit_callbacks, if_none_match=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_html_fetch_answers_304_from_the_html_cache(
+    page, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(settings, "HTML_CACHE_ENABLE", True)
+    bump_version("pages-html")
+    # The first render creates the menus it displays.
+    _get(client, "/validated/", django_capture_on_commit_callbacks)
+    first = _get(client, "/validated/", django_capture_on_commit_callbacks)
+    assert first.status_code == 200
+    etag = first["ETag"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/validated/", headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert not response.content
+    assert len(ctx) == 0
+    assert client.get("/validated/", headers={"if-none-match": '"other"'}).status_code == 200
+
+
+@pytest.mark.django_db
+def test_html_fetch_answers_304_without_the_html_cache(
+    page, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(settings, "HTML_CACHE_ENABLE", False)
+    # The first render creates the menus it displays.
+    _get(client, "/validated/", django_capture_on_commit_callbacks)
+    first = _get(client, "/validated/", django_capture_on_commit_callbacks)
+    assert first.status_code == 200
+    etag = first["ETag"]
+    assert etag.startswith('"') and first["Last-Modified"]
+
+    # Answered before the context is built and the template rendered.
+    with CaptureQueriesContext(connection) as ctx:
+        response = _get(client, "/validated/", django_capture_on_commit_callbacks, if_none_match=etag)
+    assert response.status_code == 304
+    assert len(ctx) == 1
+    assert not response.content
+    assert response["ETag"] == etag
+    assert client.get("/validated/", headers={"if-none-match": '"other"'}).status_code == 200
+
+
+@pytest.mark.django_db
+def test_pages_router_answers_304_before_serializing_uncached(
+    page, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(pages_views, "PAGE_ROUTER_CACHE", None)
+    url = "/api/camomilla/pages-router/validated/"
+    first = _get(api, url, django_capture_on_commit_callbacks)
+    assert first.status_code == 200
+    etag = first["ETag"]
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("serialized a payload the client holds")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(pages_views, "RouteSerializer", unexpected)
+        response = _get(api, url, django_capture_on_commit_callbacks, if_none_match=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+    # Content blocks stamp the page they belong to.
+    with django_capture_on_commit_callbacks(execute=True):
+        Content.objects.create(
+            identifier="hero",
+            content="Hello",
+            content_type=ContentType.objects.get_for_model(Page),
+            object_id=page.pk,
+        )
+    response = _get(api, url, django_capture_on_commit_callbacks, if_none_match=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert response.json()["contents"]["hero"]["content"] == "Hello"
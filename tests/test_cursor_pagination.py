@@ -0,0 +1,134 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils.translation import activate
+from rest_framework.test import APIClient
+
+from camomilla.models import Page
+from camomilla.utils.pagination import KeysetPaginator
+from example.website.models import CustomArgumentsRegisterModel, TestModel
+
+from .utils.api import login_superuser
+
+
+@pytest.fixture
+def api(db):
+    activate("en")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token " + login_superuser())
+    return client
+
+
+def _walk(api, url, key="id"):
+    """Follow the ``next`` cursors from ``url``; returns the pages of ``key``s."""
+    pages, response = [], api.get(url).json()
+    while True:
+        pages.append([item[key] for item in response["items"]])
+        if not response["paginator"]["has_next"]:
+            return pages, response
+        response = api.get(f"{url}&cursor={response['paginator']['next']}").json()
+
+
+def test_cursor_pages_follow_the_list_ordering(api):
+    ids = [TestModel.objects.create(title=f"model {index}").pk for index in range(5)]
+    pages, last = _walk(api, "/api/models/test-model/?items=2&pagination=cursor")
+    assert pages == [ids[4:2:-1], ids[2:0:-1], ids[:1]]
+    assert last["paginator"] == {
+        "next": None,
+        "previous": last["paginator"]["previous"],
+        "has_next": False,
+        "has_previous": True,
+        "page_size": 2,
+    }
+    previous = api.get(
+        f"/api/models/test-model/?items=2&cursor={last['paginator']['previous']}"
+    ).json()
+    assert [item["id"] for item in previous["items"]] == ids[2:0:-1]
+    assert previous["paginator"]["has_next"] and previous["paginator"]["has_previous"]
+    first = api.get(
+        f"/api/models/test-model/?items=2&cursor={previous['paginator']['previous']}"
+    ).json()
+    assert [item["id"] for item in first["items"]] == ids[4:2:-1]
+    assert first["paginator"]["previous"] is None
+
+
+def test_cursor_pagination_skips_the_count(api):
+    for index in range(5):
+        TestModel.objects.create(title=f"model {index}")
+    first = api.get("/api/models/test-model/?items=2&pagination=cursor").json()
+    with CaptureQueriesContext(connection) as queries:
+        response = api.get(
+            f"/api/models/test-model/?items=2&cursor={first['paginator']['next']}"
+        )
+    assert response.status_code == 200
+    sql = " ".join(query["sql"] for query in queries).upper()
+    assert "COUNT(" not in sql and "OFFSET" not in sql
+
+
+def test_cursor_pagination_with_sort_filters_and_nulls(api):
+    # Ties and NULLs in the sort column: the pk breaks the ties.
+    titles = ["b", None, "a", "b", None, "c", "b", "a"]
+    pages = {
+        Page.objects.create(title_en=f"page {index}", breadcrumbs_title_en=title).pk
+        for index, title in enumerate(titles)
+    }
+    Page.objects.create(title_en="filtered out", breadcrumbs_title_en="a")
+    base = "/api/camomilla/pages/?items=3&pagination=cursor&fltr=title__startswith=page"
+    for order in ("asc", "desc"):
+        walked, _ = _walk(api, f"{base}&sort=breadcrumbs_title&order={order}")
+        ids = [pk for page in walked for pk in page]
+        assert sorted(ids) == sorted(pages)
+        expected = (
+            Page.objects.filter(pk__in=pages)
+            .order_by("breadcrumbs_title", "-pk")
+            .values_list("pk", "breadcrumbs_title_en")
+        )
+        # NULLs last on the way up, first on the way down.
+        expected = sorted(
+            expected, key=lambda row: (row[1] is None, row[1] or "", -row[0])
+        )
+        if order == "desc":
+            expected.reverse()
+        assert ids == [pk for pk, _ in expected]
+
+
+def test_cursor_pagination_with_search(api):
+    for index in range(4):
+        CustomArgumentsRegisterModel.objects.create(name=f"match {index}")
+        CustomArgumentsRegisterModel.objects.create(name=f"other {index}")
+    walked, _ = _walk(
+        api,
+        "/api/models/custom-arguments-register-model/?items=3&pagination=cursor&search=match",
+        key="name",
+    )
+    assert walked == [["match 3", "match 2", "match 1"], ["match 0"]]
+
+
+def test_invalid_cursor_gives_the_first_page(api):
+    for index in range(3):
+        TestModel.objects.create(title=f"model {index}")
+    first = api.get("/api/models/test-model/?items=2&pagination=cursor").json()
+    for cursor in ("garbage", "eyJvIjpbXX0", first["paginator"]["next"][:-2]):
+        response = api.get(f"/api/models/test-model/?items=2&cursor={cursor}")
+        assert response.status_code == 200
+        assert response.json() == first
+
+
+def test_pagination_mode_per_viewset(api, monkeypatch):
+    for index in range(3):
+        TestModel.objects.create(title=f"model {index}")
+    viewset = resolve("/api/models/test-model/").func.cls
+    monkeypatch.setattr(viewset, "pagination_mode", "cursor")
+    paginator = api.get("/api/models/test-model/?items=2").json()["paginator"]
+    assert "count" not in paginator and paginator["has_next"]
+    paginator = api.get("/api/models/test-model/?items=2&pagination=page").json()[
+        "paginator"
+    ]
+    assert paginator["count"] == 3
+
+
+@pytest.mark.django_db
+def test_keyset_needs_plain_field_ordering():
+    assert KeysetPaginator.supports(TestModel.objects.order_by("title", "-pk"))
+    assert not KeysetPaginator.supports(TestModel.objects.order_by("?"))
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+
+from camomilla.due_drafts import due_drafts
+from camomilla.models import Page
+from camomilla.models.draft import Draft
+from camomilla.utils.cache import bump_version
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+    bump_version("drafts")
+
+
+@pytest.fixture
+def page(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return Page.objects.create(
+            title_en="Live", published_at=timezone.now() - timedelta(days=1)
+        )
+
+
+def _draft(page, scheduled_for, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return Draft.objects.create(
+            content_object=page,
+            language="en",
+            serialized={"translations": {"en": {"title": "Drafted"}}},
+            scheduled_for=scheduled_for,
+        )
+
+
+@pytest.mark.django_db
+def test_publish_if_due_skips_the_query_while_nothing_is_due(
+    page, django_capture_on_commit_callbacks
+):
+    assert page.publish_if_due() is False
+    with CaptureQueriesContext(connection) as ctx:
+        assert page.publish_if_due() is False
+    assert len(ctx) == 0
+
+    draft = _draft(
+        page, timezone.now() + timedelta(hours=1), django_capture_on_commit_callbacks
+    )
+    assert due_drafts.next_due() == pytest.approx(draft.scheduled_for.timestamp())
+    with CaptureQueriesContext(connection) as ctx:
+        assert page.publish_if_due() is False
+    assert len(ctx) == 0
+
+
+@pytest.mark.django_db
+def test_due_drafts_are_published_once_the_watermark_passes(
+    page, django_capture_on_commit_callbacks
+):
+    _draft(page, timezone.now() - timedelta(minutes=1), django_capture_on_commit_callbacks)
+    assert due_drafts.may_be_due()
+    with django_capture_on_commit_callbacks(execute=True):
+        assert page.publish_if_due() is True
+    assert page.title_en == "Drafted"
+    # Publishing consumed the draft: the watermark is gone with it.
+    assert due_drafts.next_due() is None
+    assert not due_drafts.may_be_due()
+
+
+@pytest.mark.django_db
+def test_uncommitted_drafts_are_seen_by_the_writing_thread(page):
+    Draft.objects.create(
+        content_object=page,
+        language="en",
+        serialized={"translations": {"en": {"title": "Drafted"}}},
+        scheduled_for=timezone.now() - timedelta(minutes=1),
+    )
+    assert due_drafts.may_be_due()
+    assert page.publish_if_due() is True
+
+
+@pytest.mark.django_db
+def test_failing_draft_doesnt_pin_the_watermark(
+    page, django_capture_on_commit_callbacks
+):
+    draft = _draft(
+        page, timezone.now() - timedelta(minutes=1), django_capture_on_commit_callbacks
+    )
+    Draft.objects.filter(pk=draft.pk).update(serialized={"ordering": "not a number"})
+    with django_capture_on_commit_callbacks(execute=True):
+        assert page.publish_if_due() is False
+    assert Draft.objects.get(pk=draft.pk).failed_at is not None
+    assert due_drafts.next_due() is None
+    with CaptureQueriesContext(connection) as ctx:
+        assert page.publish_if_due() is False
+    assert len(ctx) == 0
+
+
+@pytest.mark.django_db
+def test_drafts_of_deleted_pages_dont_count(page, django_capture_on_commit_callbacks):
+    _draft(page, timezone.now() - timedelta(minutes=1), django_capture_on_commit_callbacks)
+    with django_capture_on_commit_callbacks(execute=True):
+        page.delete()
+    assert not Draft.objects.exists()
+
+    # Orphans left behind by deletes that skipped the signals.
+    other = Page.objects.create(title_en="Other")
+    _draft(other, timezone.now() - timedelta(minutes=1), django_capture_on_commit_callbacks)
+    Page.objects.filter(pk=other.pk)._raw_delete("default")
+    bump_version("drafts")
+    assert Draft.objects.exists()
+    assert due_drafts.next_due() is None
+    assert not due_drafts.may_be_due()
@@ -0,0 +1,98 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+
+from camomilla import settings
+from camomilla.models import Menu, Page
+from camomilla.utils.cache import bump_version
+
+client = Client()
+TEMPLATE = "website/pages/default.html"
+
+
+@pytest.fixture(autouse=True)
+def html_cache(monkeypatch):
+    activate("en")
+    monkeypatch.setattr(settings, "HTML_CACHE_ENABLE", True)
+    bump_version("pages-html")
+
+
+@pytest.fixture
+def page(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return Page.objects.create(
+            title_en="Cached",
+            template=TEMPLATE,
+            published_at=timezone.now() - timedelta(days=1),
+        )
+
+
+@pytest.mark.django_db
+def test_public_renders_are_served_from_cache(page, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        # The first render creates the menus it displays.
+        first = client.get("/cached/")
+    assert b"Cached" in first.content
+    first = client.get("/cached/")
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get("/cached/")
+    assert second.content == first.content
+    assert len(ctx) == 0
+    # Query strings bypass the cache.
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/cached/?utm_source=x")
+    assert len(ctx) > 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        page.title_en = "Renamed"
+        page.autopermalink_en = False
+        page.save()
+    assert b"Renamed" in client.get("/cached/").content
+
+
+@pytest.mark.django_db
+def test_entries_expire_at_the_next_scheduled_publish(
+    page, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        page.save_draft(
+            {"translations": {"en": {"title": "Swapped"}}},
+            scheduled_for=timezone.now() + timedelta(seconds=1),
+        )
+    with django_capture_on_commit_callbacks(execute=True):
+        assert b"Cached" in client.get("/cached/").content
+    assert b"Cached" in client.get("/cached/").content
+    time.sleep(1.1)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.get("/cached/")
+    assert b"Swapped" in response.content
+
+
+@pytest.mark.django_db
+def test_only_site_wide_changes_drop_every_entry(
+    page, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        client.get("/cached/")
+    client.get("/cached/")
+
+    # Another page doesn't touch this page's entry.
+    with django_capture_on_commit_callbacks(execute=True):
+        Page.objects.create(title_en="Elsewhere", published_at=timezone.now())
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/cached/")
+    # Only the next lifecycle transition is recomputed, the page isn't read.
+    assert not any('"camomilla_page"' in query["sql"] for query in ctx.captured_queries)
+
+    # Menus are rendered by every page.
+    with django_capture_on_commit_callbacks(execute=True):
+        Menu.objects.first().save()
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/cached/")
+    assert any('"camomilla_page"' in query["sql"] for query in ctx.captured_queries)
@@ -0,0 +1,112 @@
+import logging
+from datetime import timedelta
+
+import pytest
+from django.test import Client, override_settings
+from django.utils import timezone
+from django.utils.translation import activate
+
+from camomilla import settings
+from camomilla.instrumentation import RequestTrace, _trace, current_trace, span
+from camomilla.models import Page
+from camomilla.routing import route_table
+
+MIDDLEWARE = ["camomilla.instrumentation.InstrumentationMiddleware"]
+
+client = Client()
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+    route_table.invalidate()
+
+
+@pytest.fixture
+def page(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return Page.objects.create(
+            title_en="Traced",
+            template="website/pages/default.html",
+            published_at=timezone.now() - timedelta(days=1),
+        )
+
+
+def _metrics(response):
+    return {
+        metric.split(";")[0]: metric
+        for metric in response["Server-Timing"].split(", ")
+    }
+
+
+def test_spans_are_free_outside_of_a_traced_request(monkeypatch):
+    def no_span(self, name):
+        raise AssertionError("untraced spans must not open a stage")
+
+    monkeypatch.setattr(RequestTrace, "span", no_span)
+
+    @span("work")
+    def work(value):
+        return value * 2
+
+    assert current_trace() is None
+    with span("route"):
+        assert current_trace() is None
+    assert work(2) == 4
+
+
+def test_decorated_spans_record_their_stage():
+    @span("work")
+    def work():
+        with span("inner"):
+            return current_trace().current
+
+    trace = RequestTrace()
+    token = _trace.set(trace)
+    try:
+        assert work() == "inner"
+        with pytest.raises(ZeroDivisionError), span("failing"):
+            1 / 0
+    finally:
+        _trace.reset(token)
+    assert {"work", "inner", "failing"} <= set(trace.stages)
+    assert trace.stack == []
+
+
+@pytest.mark.django_db
+def test_server_timing_reports_the_stages(page, caplog):
+    with override_settings(MIDDLEWARE=MIDDLEWARE), caplog.at_level(
+        logging.INFO, logger="camomilla.instrumentation"
+    ):
+        response = client.get("/traced/")
+    assert response.status_code == 200
+    metrics = _metrics(response)
+    assert {"cm-route", "cm-publish", "cm-context", "cm-template", "db", "total"} <= (
+        set(metrics)
+    )
+    assert 'desc="' in metrics["cm-route"]
+    record = next(r for r in caplog.records if r.getMessage().startswith("GET /traced/"))
+    assert record.timing["queries"] > 0
+    assert record.timing["stages"]["route"]["queries"] > 0
+
+
+@pytest.mark.django_db
+def test_the_router_serialization_is_a_stage(page):
+    with override_settings(MIDDLEWARE=MIDDLEWARE):
+        response = client.get("/api/camomilla/pages-router/traced/")
+    assert response.status_code == 200
+    assert {"cm-route", "cm-serialize"} <= set(_metrics(response))
+
+
+@pytest.mark.django_db
+def test_slow_queries_are_logged_with_their_stage(page, caplog, monkeypatch):
+    monkeypatch.setattr(settings, "INSTRUMENTATION_SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(settings, "INSTRUMENTATION_SERVER_TIMING", False)
+    with override_settings(MIDDLEWARE=MIDDLEWARE), caplog.at_level(
+        logging.WARNING, logger="camomilla.instrumentation"
+    ):
+        response = client.get("/traced/")
+    assert "Server-Timing" not in response
+    assert {r.stage for r in caplog.records if r.levelno == logging.WARNING} >= {
+        "route"
+    }
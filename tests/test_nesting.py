@@ -0,0 +1,48 @@
+import pytest
+from django.utils.translation import activate
+
+from camomilla import settings
+from camomilla.models import Page
+from camomilla.serializers.fields.related import LazySerializer
+from camomilla.serializers.utils import build_standard_model_serializer
+
+
+@pytest.fixture
+def chain():
+    activate("en")
+    root = Page.objects.create(title_en="root")
+    child = Page.objects.create(title_en="child", parent_page=root)
+    grandchild = Page.objects.create(title_en="grandchild", parent_page=child)
+    return root, child, grandchild
+
+
+def _serialize(page):
+    return build_standard_model_serializer(Page, depth=10)(page).data
+
+
+@pytest.mark.django_db
+def test_nested_serializers_are_built_lazily(chain):
+    serializer = build_standard_model_serializer(Page, depth=10)(chain[2])
+    assert isinstance(serializer.fields["parent_page"]._serializer, LazySerializer)
+    data = serializer.data
+    assert data["parent_page"]["parent_page"]["id"] == chain[0].pk
+
+
+@pytest.mark.django_db
+def test_cycles_are_rendered_as_primary_keys(chain):
+    root, child, grandchild = chain
+    # A cycle that validation would refuse, written behind its back.
+    Page.objects.filter(pk=root.pk).update(parent_page=grandchild)
+    root.refresh_from_db()
+    data = _serialize(root)
+    assert data["parent_page"]["id"] == grandchild.pk
+    assert data["parent_page"]["parent_page"]["id"] == child.pk
+    assert data["parent_page"]["parent_page"]["parent_page"] == root.pk
+
+
+@pytest.mark.django_db
+def test_nesting_budget_falls_back_to_primary_keys(chain, monkeypatch):
+    monkeypatch.setattr(settings, "API_NESTING_BUDGET", 1)
+    data = _serialize(chain[2])
+    assert data["parent_page"]["id"] == chain[1].pk
+    assert data["parent_page"]["parent_page"] == chain[0].pk
@@ -0,0 +1,39 @@
+import pytest
+from rest_framework.test import APIClient
+
+from camomilla.serializers import ArticleSerializer
+from camomilla.serializers.mixins import optimize
+from camomilla.serializers.mixins.optimize import optimization_plan
+from .utils.api import login_superuser
+
+
+def test_plans_are_memoized_per_serializer_and_params():
+    plan = optimization_plan(ArticleSerializer, "title,tags,highlight_image__file")
+    assert plan.prefetch_related == {"tags"}
+    assert plan.select_related == {"highlight_image"}
+    assert optimization_plan(ArticleSerializer, "title,tags,highlight_image__file") is plan
+    assert optimization_plan(ArticleSerializer, "title", "all") is not plan
+
+
+def test_the_plan_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(optimize, "MAX_OPTIMIZATION_PLANS", 0)
+    plan = optimization_plan(ArticleSerializer, "unbounded")
+    assert optimization_plan(ArticleSerializer, "unbounded") is not plan
+
+
+@pytest.mark.django_db
+def test_get_requests_reuse_the_plan(monkeypatch):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token " + login_superuser())
+    calls = []
+    extract = optimize.recursive_extract_optimizations
+    monkeypatch.setattr(
+        optimize,
+        "recursive_extract_optimizations",
+        lambda *args, **kwargs: calls.append(args) or extract(*args, **kwargs),
+    )
+    for _ in range(3):
+        response = client.get("/api/camomilla/articles/?fields=id,title,tags__name")
+        assert response.status_code == 200
+    # Nested relations recurse with an explicit ``max_depth``.
+    assert len([args for args in calls if len(args) == 2]) == 1
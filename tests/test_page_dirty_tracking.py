@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import activate
+
+from camomilla.models import Page, UrlNode
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+
+
+def _saved(page, **changes):
+    page = Page.objects.get(pk=page.pk)
+    for attr, value in changes.items():
+        setattr(page, attr, value)
+    with CaptureQueriesContext(connection) as ctx:
+        page.save()
+    return page, [
+        query["sql"] for query in ctx.captured_queries if "SAVEPOINT" not in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_unrelated_save_skips_the_url_node_pipeline():
+    parent = Page.objects.create(title_en="Parent")
+    page = Page.objects.create(title_en="Child", parent_page=parent)
+    page, queries = _saved(page, ordering=3, template_data={"hero": "x"})
+    # The page update and the visibility columns mirrored on its node.
+    assert len(queries) == 2
+    assert not any(sql.startswith("SELECT") for sql in queries)
+    assert page.permalink_en == "/parent/child"
+    assert Page.objects.get(pk=page.pk).ordering == 3
+
+
+@pytest.mark.django_db
+def test_permalink_sources_still_rebuild_the_url_node():
+    parent = Page.objects.create(title_en="Parent")
+    other = Page.objects.create(title_en="Other")
+    page = Page.objects.create(title_en="Child", parent_page=parent)
+
+    page, _ = _saved(page, title_en="Renamed")
+    assert UrlNode.objects.get(pk=page.url_node_id).permalink_en == "/parent/renamed"
+
+    page, _ = _saved(page, parent_page=other)
+    node = UrlNode.objects.get(pk=page.url_node_id)
+    assert node.permalink_en == "/other/renamed"
+    assert node.tree_path == f"/{other.url_node_id}/{node.pk}/"
+
+    page, _ = _saved(page, autopermalink_en=False, permalink_en="/by-hand")
+    assert UrlNode.objects.get(pk=page.url_node_id).permalink_en == "/by-hand"
+
+
+@pytest.mark.django_db
+def test_deferred_sources_count_as_changed_when_set():
+    page = Page.objects.create(title_en="Deferred")
+    page = Page.objects.only("pk", "url_node").get(pk=page.pk)
+    assert not page.permalink_sources_changed()
+    page.title_en = "Loaded later"
+    assert page.permalink_sources_changed()
+    page.save()
+    assert UrlNode.objects.get(pk=page.url_node_id).permalink_en == "/loaded-later"
+
+
+@pytest.mark.django_db
+def test_partial_reload_keeps_unsaved_source_changes():
+    page = Page.objects.create(title_en="Before")
+    page = Page.objects.defer("ordering").get(pk=page.pk)
+    page.title_en = "After"
+    # Loading the deferred column reloads that field alone.
+    assert page.ordering == 0
+    page.refresh_from_db(fields=["template_data"])
+    assert page.permalink_sources_changed()
+    page.save()
+    assert UrlNode.objects.get(pk=page.url_node_id).permalink_en == "/after"
+    page.refresh_from_db(fields=["title_en"])
+    assert not page.permalink_sources_changed()
@@ -0,0 +1,146 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+
+from camomilla.models import Page, UrlNode, UrlRedirect
+from camomilla.routing import resolve_url_node, route_table
+from camomilla.tree import move_subtree
+from example.website.models import CustomPageMetaModel
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+    route_table.invalidate()
+    yield
+    route_table.invalidate()
+
+
+def _permalink(page):
+    return UrlNode._base_manager.get(pk=page.url_node_id).permalink_en
+
+
+def _tree(root_title, children):
+    root = Page.objects.create(title_en=root_title, title_it=f"{root_title} it")
+    kids = [
+        Page.objects.create(title_en=f"Kid {index}", parent_page=root)
+        for index in range(children)
+    ]
+    grandkid = Page.objects.create(title_en="Grandkid", parent_page=kids[0])
+    return root, kids, grandkid
+
+
+@pytest.mark.django_db
+def test_rename_rebuilds_descendants_in_bulk():
+    root, kids, grandkid = _tree("Docs", 3)
+    root.title_en = "Guide"
+    root.save()
+    assert _permalink(kids[2]) == "/guide/kid-2"
+    assert _permalink(grandkid) == "/guide/kid-0/grandkid"
+    # Untouched language, untouched permalinks.
+    assert UrlNode._base_manager.get(pk=kids[0].url_node_id).permalink_it == "/docs-it/"
+    assert set(
+        UrlRedirect.objects.filter(language_code="en").values_list("from_url", "to_url")
+    ) == {
+        ("/docs", "/guide"),
+        ("/docs/kid-0", "/guide/kid-0"),
+        ("/docs/kid-1", "/guide/kid-1"),
+        ("/docs/kid-2", "/guide/kid-2"),
+        ("/docs/kid-0/grandkid", "/guide/kid-0/grandkid"),
+    }
+
+
+@pytest.mark.django_db
+def test_rename_queries_do_not_grow_with_descendants():
+    def rename(children):
+        root, *_ = _tree(f"Root {children}", children)
+        root.title_en = f"Renamed {children}"
+        with CaptureQueriesContext(connection) as ctx:
+            root.save()
+        return len(ctx.captured_queries)
+
+    assert rename(2) == rename(12)
+
+
+@pytest.mark.django_db
+def test_rebuild_resolves_collisions():
+    Page.objects.create(title_en="Kid 0", parent_page=Page.objects.create(title_en="Guide"))
+    root, kids, grandkid = _tree("Docs", 1)
+    root.title_en = "Guide"
+    root.save()
+    # ``/guide`` is taken: the root gets a random slug and the subtree follows.
+    assert _permalink(root) != "/guide"
+    assert _permalink(kids[0]) == f"{_permalink(root)}/kid-0"
+    assert _permalink(grandkid) == f"{_permalink(root)}/kid-0/grandkid"
+
+
+@pytest.mark.django_db
+def test_rebuild_disambiguates_within_the_subtree():
+    root = Page.objects.create(title_en="Docs")
+    Page.objects.create(title_en="Other")
+    clash = Page.objects.create(title_en="Other", parent_page=root)
+    sibling = Page.objects.create(title_en="Same", parent_page=root)
+    root.title_en = "Guide"
+    root.save()
+    assert _permalink(clash) == "/guide/other"
+    assert _permalink(sibling) == "/guide/same"
+    sibling.title_en = "Other"
+    sibling.save()
+    assert _permalink(sibling).startswith("/guide/")
+    assert _permalink(sibling) != "/guide/other"
+
+
+@pytest.mark.django_db
+def test_rebuild_follows_children_of_other_page_models():
+    root = Page.objects.create(title_en="Docs")
+    custom = CustomPageMetaModel.objects.create(title="Custom", custom_parent_page=root)
+    assert _permalink(custom) == "/docs/custom"
+    root.title_en = "Guide"
+    root.save()
+    assert _permalink(custom) == "/guide/custom"
+
+
+@pytest.mark.django_db
+def test_manual_permalinks_stop_the_rebuild():
+    root = Page.objects.create(title_en="Docs")
+    manual = Page.objects.create(
+        title_en="Manual", permalink_en="/fixed", autopermalink_en=False, parent_page=root
+    )
+    below = Page.objects.create(title_en="Below", parent_page=manual)
+    root.title_en = "Guide"
+    root.save()
+    assert _permalink(manual) == "/fixed"
+    assert _permalink(below) == "/fixed/below"
+
+
+@pytest.mark.django_db
+def test_move_subtree():
+    docs, kids, grandkid = _tree("Docs", 2)
+    blog = Page.objects.create(title_en="Blog")
+    move_subtree(kids[0], blog)
+    kids[0].refresh_from_db()
+    assert kids[0].parent_page == blog
+    assert _permalink(kids[0]) == "/blog/kid-0"
+    assert _permalink(grandkid) == "/blog/kid-0/grandkid"
+    assert UrlRedirect.objects.filter(
+        from_url="/docs/kid-0/grandkid", to_url="/blog/kid-0/grandkid"
+    ).exists()
+    move_subtree(kids[0], None)
+    assert _permalink(grandkid) == "/kid-0/grandkid"
+    with pytest.raises(ValueError):
+        move_subtree(docs, kids[1])
+    with pytest.raises(ValueError):
+        move_subtree(kids[0], grandkid)
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_route_table_follows_subtree_rebuild():
+    root = Page.objects.create(title_en="Docs", published_at=timezone.now())
+    Page.objects.create(title_en="Kid", parent_page=root, published_at=timezone.now())
+    assert resolve_url_node("/docs/kid") is not None
+    root.title_en = "Guide"
+    root.save()
+    assert resolve_url_node("/docs/kid") is None
+    assert resolve_url_node("/guide/kid") is not None
@@ -0,0 +1,120 @@
+import sys
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+from rest_framework.test import APIClient
+
+from camomilla import settings
+from camomilla.models import Page
+from camomilla.tree import TreeEntry, page_tree, render_page_tree
+from example.website.models import CustomPageMetaModel
+
+from .utils.api import login_superuser
+
+client = APIClient()
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+
+
+def _find(nodes, title):
+    return next(node for node in nodes if node["title"] == title)
+
+
+@pytest.fixture
+def site(django_capture_on_commit_callbacks):
+    client.credentials(HTTP_AUTHORIZATION="Token " + login_superuser())
+    with django_capture_on_commit_callbacks(execute=True):
+        docs = Page.objects.create(
+            title_en="Docs", title_it="Documenti", published_at=timezone.now()
+        )
+        second = Page.objects.create(title_en="Second", parent_page=docs, ordering=2)
+        first = Page.objects.create(title_en="First", parent_page=docs, ordering=1)
+        deep = Page.objects.create(title_en="Deep", parent_page=first)
+        custom = CustomPageMetaModel.objects.create(
+            title="Custom", custom_parent_page=docs, ordering=3
+        )
+    return docs, first, second, deep, custom
+
+
+@pytest.mark.django_db
+def test_tree_nests_every_page_model(site):
+    docs, first, second, deep, custom = site
+    response = client.get("/api/camomilla/pages/tree/?depth=2")
+    assert response.status_code == 200
+    node = _find(response.json(), "Docs")
+    assert node["status"] == "PUB"
+    assert node["permalink"] == "/docs"
+    assert [child["title"] for child in node["children"]] == ["First", "Second", "Custom"]
+    assert node["children"][2]["model"] == "website.custompagemetamodel"
+    # Cut at depth 2: expandable with another request rooted there.
+    assert node["children"][0]["children"] is None
+    assert node["children"][0]["children_count"] == 1
+
+    response = client.get(f"/api/camomilla/pages/tree/?root={first.url_node_id}")
+    assert [child["id"] for child in response.json()] == [deep.pk]
+
+    response = client.get("/api/camomilla/pages/tree/?language=it&depth=1")
+    assert _find(response.json(), "Documenti")["children"] is None
+
+    assert client.get("/api/camomilla/pages/tree/?depth=deep").status_code == 400
+
+
+@pytest.mark.django_db
+def test_tree_is_cached_until_a_page_changes(site, django_capture_on_commit_callbacks):
+    docs, first, *_ = site
+    page_tree.get("en")
+    with CaptureQueriesContext(connection) as ctx:
+        page_tree.get("en")
+    assert len(ctx) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.title_en = "Renamed"
+        first.save()
+    response = client.get("/api/camomilla/pages/tree/")
+    children = _find(response.json(), "Docs")["children"]
+    assert [child["title"] for child in children] == ["Renamed", "Second", "Custom"]
+
+
+@pytest.mark.django_db
+def test_tree_isnt_cached_without_a_shared_cache(
+    site, monkeypatch, django_capture_on_commit_callbacks
+):
+    # The test cache is a LocMemCache: other workers would never hear of
+    # the next change, so every request builds the tree.
+    monkeypatch.setattr(settings, "ROUTE_TABLE_ENABLE", None)
+    docs, first, *_ = site
+    page_tree.get("en")
+    with CaptureQueriesContext(connection) as ctx:
+        page_tree.get("en")
+    assert len(ctx) > 0
+
+    # A change committed by another worker (no counter bump reaches us).
+    Page.objects.filter(pk=first.pk).update(title_en="Elsewhere")
+    children = _find(render_page_tree(page_tree.get("en")), "Docs")["children"]
+    assert children[0]["title"] == "Elsewhere"
+
+
+def test_render_goes_deeper_than_the_recursion_limit():
+    levels = sys.getrecursionlimit() + 100
+    tree = {
+        (level or None): [
+            TreeEntry(
+                level + 1, "page", level + 1, level or None, 0, "", None, None, None
+            )
+        ]
+        for level in range(levels)
+    }
+    nodes, count = render_page_tree(tree), 0
+    while nodes:
+        count += 1
+        nodes = nodes[0]["children"]
+    assert count == levels
+    cut = render_page_tree(tree, depth=2)
+    assert cut[0]["children"][0]["children"] is None
+    assert cut[0]["children"][0]["children_count"] == 1
@@ -0,0 +1,84 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from camomilla.models import Article, Tag
+from camomilla.serializers import ArticleSerializer
+from camomilla.serializers.mixins.optimize import optimization_plan
+from .utils.api import login_superuser
+
+
+def test_default_plans_walk_the_nested_serializers():
+    plan = optimization_plan(ArticleSerializer, action="list")
+    assert {"author", "og_image__folder"} <= plan.select_related
+    # Relations back to a model on the branch are prefetched, level by level.
+    assert {"tags", "author__groups", "parent_page", "parent_page__tags"} <= (
+        plan.prefetch_related
+    )
+    assert plan.only == set()
+    # Explicit ``fields`` keep planning just the relations they name.
+    assert optimization_plan(ArticleSerializer, "tags").select_related == set()
+
+
+def _add_articles(count):
+    author = get_user_model().objects.first()
+    tags = [Tag.objects.get_or_create(name=f"tag {i}")[0] for i in range(3)]
+    for i in range(count):
+        parent = Article.objects.create(title_en=f"parent {i}", author=author)
+        parent.tags.set(tags)
+        article = Article.objects.create(
+            title_en=f"article {i}", parent_page=parent, author=author
+        )
+        article.tags.set(tags)
+
+
+def _count_list_queries(client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/camomilla/articles/")
+    assert response.status_code == 200
+    return len(queries), response.json()
+
+
+@pytest.mark.django_db
+def test_list_queries_do_not_grow_with_the_page_size():
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token " + login_superuser())
+    _add_articles(2)
+    few, rows = _count_list_queries(client)
+    assert len(rows) == 4
+    _add_articles(6)
+    many, rows = _count_list_queries(client)
+    assert len(rows) == 16
+    assert many == few
+    # Breadcrumbs come from the ancestors loaded for the whole list.
+    child = next(row for row in rows if row["title"] == "article 5")
+    assert [crumb["title"] for crumb in child["breadcrumbs"]] == [
+        "parent 5",
+        "article 5",
+    ]
+
+
+def test_page_lists_default_to_the_breadcrumbs_list_serializer():
+    from rest_framework import serializers
+
+    from camomilla.serializers.mixins.page import PageListSerializer
+
+    class Custom(serializers.ListSerializer):
+        pass
+
+    class PlainMeta(ArticleSerializer):
+        class Meta(ArticleSerializer.Meta):
+            pass
+
+    class CustomMeta(ArticleSerializer):
+        class Meta(ArticleSerializer.Meta):
+            list_serializer_class = Custom
+
+    listed = PlainMeta(many=True, allow_empty=False, context={"x": 1})
+    assert type(listed) is PageListSerializer
+    assert listed.allow_empty is False and listed.child.context == {"x": 1}
+    # The subclass' Meta is left alone.
+    assert not hasattr(PlainMeta.Meta, "list_serializer_class")
+    assert type(CustomMeta(many=True)) is Custom
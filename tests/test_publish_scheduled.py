@@ -0,0 +1,169 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+
+from camomilla.management.commands import camomilla_publish_scheduled
+from camomilla.models import Page
+from camomilla.models.draft import Draft
+from camomilla.preview import publish_due_drafts, resolve_scheduled_pages
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+
+
+def _scheduled_page(title, language="en", minutes=-1):
+    page = Page.objects.create(
+        title_en=title, published_at=timezone.now() - timedelta(days=1)
+    )
+    Draft.objects.create(
+        content_object=page,
+        language=language,
+        serialized={"translations": {language: {"title": f"{title} v2"}}},
+        scheduled_for=timezone.now() + timedelta(minutes=minutes),
+    )
+    return page
+
+
+@pytest.mark.django_db
+def test_due_pages_are_loaded_in_one_query_per_model():
+    _scheduled_page("first")
+    # Warms the content type cache.
+    list(resolve_scheduled_pages())
+    with CaptureQueriesContext(connection) as ctx:
+        assert len(list(resolve_scheduled_pages())) == 1
+    single = len(ctx)
+    _scheduled_page("second", language="it")
+    _scheduled_page("third")
+    _scheduled_page("later", minutes=60)
+    with CaptureQueriesContext(connection) as ctx:
+        resolved = list(resolve_scheduled_pages())
+    assert len(ctx) == single
+    assert sorted(language for _, language in resolved) == ["en", "en", "it"]
+
+
+@pytest.mark.django_db
+def test_publish_due_drafts_claims_a_batch_and_reports_latency():
+    pages = [_scheduled_page(title) for title in ("one", "two", "three")]
+    it_page = _scheduled_page("quattro", language="it")
+
+    results = publish_due_drafts(batch_size=3)
+    assert len(results) == 3
+    assert all(result.error is None for result in results)
+    assert all(result.lag >= 60 and result.duration >= 0 for result in results)
+
+    results = publish_due_drafts(batch_size=3)
+    assert [result.page.pk for result in results] == [it_page.pk]
+    assert not Draft.objects.exists()
+    for page in pages:
+        page.refresh_from_db()
+        assert page.title_en.endswith(" v2")
+    it_page.refresh_from_db()
+    assert it_page.title_it == "quattro v2"
+    assert it_page.title_en == "quattro"
+
+
+@pytest.mark.django_db
+def test_daemon_publishes_until_interrupted(monkeypatch):
+    page = _scheduled_page("daemon")
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(camomilla_publish_scheduled.time, "sleep", sleep)
+    # The test database connection must survive the worker loop.
+    monkeypatch.setattr(
+        camomilla_publish_scheduled, "close_old_connections", lambda: None
+    )
+    out = StringIO()
+    call_command("camomilla_publish_scheduled", "--daemon", "--poll", "5", stdout=out)
+
+    page.refresh_from_db()
+    assert page.title_en == "daemon v2"
+    assert "lag" in out.getvalue() and "Stopped." in out.getvalue()
+    assert sleeps == [5]
+
+
+def _failing_draft(title, minutes=-2):
+    page = Page.objects.create(
+        title_en=title, published_at=timezone.now() - timedelta(days=1)
+    )
+    return Draft.objects.create(
+        content_object=page,
+        language="en",
+        serialized={"ordering": "not a number"},
+        scheduled_for=timezone.now() + timedelta(minutes=minutes),
+    )
+
+
+@pytest.mark.django_db
+def test_stuck_drafts_dont_hold_the_batch():
+    failing = [_failing_draft(f"failing {index}") for index in range(2)]
+    orphan = Draft.objects.create(
+        content_object=Page.objects.create(title_en="gone"),
+        language="en",
+        scheduled_for=timezone.now() - timedelta(minutes=3),
+    )
+    Page.objects.filter(pk=orphan.object_id)._raw_delete("default")
+    page = _scheduled_page("behind")
+
+    results = publish_due_drafts(batch_size=2)
+    assert [result.page.pk for result in results] == [d.object_id for d in failing]
+    assert all(result.error is not None for result in results)
+    assert Draft.objects.filter(failed_at__isnull=False).count() == 2
+
+    results = publish_due_drafts(batch_size=2)
+    assert [(result.page.pk, result.error) for result in results] == [(page.pk, None)]
+    assert publish_due_drafts(batch_size=2) == []
+    # Past the back-off, failed drafts are claimed again.
+    assert len(publish_due_drafts(batch_size=2, retry_after=0)) == 2
+
+    draft = Draft.objects.get(pk=failing[0].pk)
+    draft.serialized = {"ordering": 3}
+    draft.save(update_fields=["serialized"])
+    assert Draft.objects.get(pk=draft.pk).failed_at is None
+
+
+@pytest.mark.django_db
+def test_daemon_keeps_going_after_a_full_failed_batch(monkeypatch):
+    for index in range(2):
+        _failing_draft(f"failing {index}")
+    page = _scheduled_page("behind")
+    monkeypatch.setattr(
+        camomilla_publish_scheduled.time,
+        "sleep",
+        lambda seconds: (_ for _ in ()).throw(KeyboardInterrupt),
+    )
+    monkeypatch.setattr(
+        camomilla_publish_scheduled, "close_old_connections", lambda: None
+    )
+    err = StringIO()
+    call_command(
+        "camomilla_publish_scheduled",
+        "--daemon",
+        "--batch-size",
+        "2",
+        stdout=StringIO(),
+        stderr=err,
+    )
+    page.refresh_from_db()
+    assert page.title_en == "behind v2"
+    assert err.getvalue().count("Failed to publish") == 2
+
+
+@pytest.mark.django_db
+def test_cron_marks_failed_drafts():
+    draft = _failing_draft("failing")
+    err = StringIO()
+    call_command("camomilla_publish_scheduled", stdout=StringIO(), stderr=err)
+    assert "Failed to publish" in err.getvalue()
+    assert Draft.objects.get(pk=draft.pk).failed_at is not None
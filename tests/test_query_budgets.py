@@ -0,0 +1,132 @@
+from datetime import timedelta
+from itertools import count
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import Client
+from django.utils import timezone
+from django.utils.translation import activate
+from rest_framework.test import APIClient
+
+from camomilla.models import Media, Menu, Page
+from camomilla.testing import assert_constant_queries
+from camomilla.types import LinkTypes
+from .utils.api import login_superuser
+
+client = Client()
+serial = count()
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+
+
+@pytest.fixture
+def commit(django_capture_on_commit_callbacks):
+    return lambda: django_capture_on_commit_callbacks(execute=True)
+
+
+@pytest.fixture
+def home(commit):
+    with commit():
+        return Page.objects.create(
+            title_en="Budget",
+            template="website/pages/default.html",
+            published_at=timezone.now() - timedelta(days=1),
+        )
+
+
+@pytest.fixture
+def seed_pages(home, commit):
+    """Adds published children, with a content each, under ``home``."""
+
+    def seed(rows):
+        with commit():
+            for _ in range(rows):
+                page = Page.objects.create(
+                    title_en=f"child {next(serial)}",
+                    parent_page=home,
+                    published_at=home.published_at,
+                )
+                home.contents.create(identifier=f"content {page.pk}", content="t")
+
+    return seed
+
+
+@pytest.fixture
+def api():
+    api = APIClient()
+    api.credentials(HTTP_AUTHORIZATION="Token " + login_superuser())
+    return api
+
+
+@pytest.mark.django_db
+def test_pages_router(seed_pages):
+    assert_constant_queries(
+        lambda: APIClient().get("/api/camomilla/pages-router/budget/"),
+        seed_pages,
+        name="pages-router",
+    )
+
+
+@pytest.mark.django_db
+def test_fetch(seed_pages):
+    assert_constant_queries(lambda: client.get("/budget/"), seed_pages, name="fetch")
+
+
+@pytest.mark.django_db
+def test_menus_router(seed_pages, commit):
+    menu = Menu.objects.create(key="budget")
+
+    def seed(rows):
+        seed_pages(rows)
+        menu.nodes = [
+            {
+                "title": page.title,
+                "link": {
+                    "link_type": LinkTypes.relational,
+                    "url_node": page.url_node_id,
+                },
+            }
+            for page in Page.objects.exclude(parent_page=None)
+        ]
+        with commit():
+            menu.save()
+
+    assert_constant_queries(
+        lambda: APIClient().get("/api/camomilla/menus-router/budget"),
+        seed,
+        name="menus-router",
+    )
+
+
+@pytest.mark.django_db
+def test_page_list(seed_pages, api):
+    assert_constant_queries(
+        lambda: api.get("/api/camomilla/pages/"), seed_pages, name="page list"
+    )
+
+
+@pytest.mark.django_db
+def test_media_list(api):
+    def seed(rows):
+        for _ in range(rows):
+            name = f"budget-{next(serial)}.txt"
+            Media.objects.create(title=name, file=ContentFile(b"budget", name=name))
+
+    assert_constant_queries(
+        lambda: api.get("/api/camomilla/media/"), seed, name="media list"
+    )
+
+
+@pytest.mark.django_db
+def test_admin_page_changelist(seed_pages):
+    admin = Client()
+    admin.force_login(User.objects.create_superuser("budget", "b@b.com", "budget"))
+    assert_constant_queries(
+        lambda: admin.get("/admin/camomilla/page/"),
+        seed_pages,
+        name="admin page changelist",
+    )
@@ -0,0 +1,339 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import activate
+from rest_framework.test import APIClient
+
+from camomilla import settings as camomilla_settings
+from camomilla.models import Page, UrlRedirect
+from camomilla.routing import find_redirect, redirect_index
+
+DUMMY_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+@pytest.fixture(autouse=True)
+def fresh_redirect_index():
+    redirect_index.invalidate()
+    yield
+    redirect_index.invalidate()
+
+
+def _page(**kwargs):
+    return Page.objects.create(**kwargs)
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_redirect_index_answers_from_memory():
+    page = _page(title="About")
+    UrlRedirect.objects.create(
+        language_code="en",
+        from_url="/old-about",
+        to_url="/about",
+        url_node=page.url_node,
+    )
+    activate("en")
+    redirect_index.refresh()
+    with CaptureQueriesContext(connection) as ctx:
+        assert UrlRedirect.find_redirect_from_url("/missing") is None
+        found = UrlRedirect.find_redirect_from_url("/old-about/")
+        assert found.redirect_to == "/about/"
+        assert found.permanent is True
+    assert len(ctx.captured_queries) == 0
+    assert UrlRedirect.find_redirect_from_url("/it/old-about") is None
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_redirect_index_follows_signals_and_generated_redirects():
+    activate("en")
+    page = _page(title="About")
+    redirect = UrlRedirect.objects.create(
+        language_code="en",
+        from_url="/old-about",
+        to_url="/about",
+        url_node=page.url_node,
+    )
+    assert UrlRedirect.find_redirect_from_url("/old-about").permanent is True
+    redirect.permanent = False
+    redirect.save()
+    assert UrlRedirect.find_redirect_from_url("/old-about").permanent is False
+
+    # Renames write redirects through ``bulk_create`` / ``update``.
+    page.title = "About us"
+    page.save()
+    assert UrlRedirect.find_redirect_from_url("/about").to_url == "/about-us"
+    assert UrlRedirect.find_redirect_from_url("/old-about").to_url == "/about-us"
+
+    redirect.delete()
+    assert UrlRedirect.find_redirect_from_url("/old-about") is None
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_pages_router_uses_redirect_index():
+    page = _page(title="About")
+    UrlRedirect.objects.create(
+        language_code="en",
+        from_url="/old-about",
+        to_url="/about",
+        url_node=page.url_node,
+    )
+    response = APIClient().get("/api/camomilla/pages-router/old-about/")
+    assert response.json() == {"redirect": "/about/", "status": 301}
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_bulk_import_upserts_and_reports_skipped_rows():
+    about = _page(title_en="About", title_it="Chi siamo")
+    _page(title="Contacts")
+    UrlRedirect.objects.create(
+        language_code="en", from_url="/legacy", to_url="/about", url_node=about.url_node
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        result = UrlRedirect.objects.bulk_import(
+            [
+                {"from_url": "/legacy/", "to_url": "/contacts"},
+                {"from_url": "/it/vecchio", "to_url": "/chi-siamo", "permanent": "0"},
+                {"from_url": "/nowhere", "to_url": "/missing"},
+                {"from_url": "/loop", "to_url": "/loop/"},
+                {"from_url": "", "to_url": "/about"},
+                {"from_url": "/x", "to_url": "/about", "language_code": "xx"},
+            ],
+            language_code=None,
+        )
+    # One lookup per language, then the upsert.
+    assert len(ctx.captured_queries) <= 5
+    assert result.imported == 2
+    assert [index for index, _ in result.skipped] == [2, 3, 4, 5]
+    assert UrlRedirect.objects.count() == 2
+
+    activate("en")
+    assert UrlRedirect.find_redirect_from_url("/legacy").to_url == "/contacts"
+    italian = UrlRedirect.find_redirect_from_url("/it/vecchio")
+    assert italian.redirect_to == "/it/chi-siamo/"
+    assert italian.permanent is False
+    assert italian.url_node_id == about.url_node_id
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_bulk_import_without_conflict_target(monkeypatch):
+    monkeypatch.setattr(
+        connection.features, "supports_update_conflicts_with_target", False
+    )
+    about = _page(title="About")
+    _redirect("/legacy", "/elsewhere", about.url_node)
+    records = [
+        {"from_url": "/legacy", "to_url": "/about"},
+        {"from_url": "/new", "to_url": "/about"},
+    ]
+    for __ in range(2):
+        assert (
+            UrlRedirect.objects.bulk_import(records, language_code="en").imported == 2
+        )
+    redirects = dict(UrlRedirect.objects.values_list("from_url", "to_url"))
+    assert redirects == {"/legacy": "/about", "/new": "/about"}
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+@override_settings(CACHES=DUMMY_CACHE)
+def test_redirects_without_counters_query_the_database(monkeypatch):
+    monkeypatch.setattr(camomilla_settings, "ROUTE_TABLE_ENABLE", True)
+    node = _page(title="Target").url_node
+    _redirect("/old", "/target", node)
+    assert redirect_index.refresh() is False
+    assert find_redirect("/old", "en").to_url == "/target"
+    _redirect("/older", "/target", node)
+    assert find_redirect("/older", "en").to_url == "/target"
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_redirect_maintenance_deletes_send_signals():
+    from django.db.models.signals import post_delete
+
+    node = _page(title="Target").url_node
+    _redirect("/a", "/target", node)
+    _redirect("/a/", "/target", node)
+    _redirect("/x", "/y", node)
+    _redirect("/y", "/x", node)
+    deleted = []
+
+    def receiver(sender, instance, **kwargs):
+        deleted.append(instance.from_url)
+
+    post_delete.connect(receiver, sender=UrlRedirect)
+    try:
+        assert UrlRedirect.objects.deduplicate() == 1
+        assert UrlRedirect.objects.flatten_chains(break_cycles=True).broken == 2
+    finally:
+        post_delete.disconnect(receiver, sender=UrlRedirect)
+    assert sorted(deleted) == ["/a", "/x", "/y"]
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_import_redirects_command(tmp_path):
+    _page(title="About")
+    csv_file = tmp_path / "redirects.csv"
+    csv_file.write_text("from_url,to_url\n/old-about,/about\n/gone,/nope\n")
+    call_command("camomilla_import_redirects", str(csv_file), "--dry-run")
+    assert UrlRedirect.objects.count() == 0
+    call_command("camomilla_import_redirects", str(csv_file), "--temporary")
+    assert UrlRedirect.objects.get(from_url="/old-about").permanent is False
+
+    ndjson_file = tmp_path / "redirects.ndjson"
+    ndjson_file.write_text(
+        json.dumps({"from_url": "/old-about", "to_url": "/about", "permanent": True})
+        + "\n"
+    )
+    call_command("camomilla_import_redirects", str(ndjson_file))
+    assert UrlRedirect.objects.get(from_url="/old-about").permanent is True
+
+
+def _redirect(from_url, to_url, url_node, language_code="en", **kwargs):
+    return UrlRedirect.objects.create(
+        language_code=language_code,
+        from_url=from_url,
+        to_url=to_url,
+        url_node=url_node,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_renames_flatten_chains_without_history():
+    activate("en")
+    page = _page(title_en="One", title_it="Uno")
+    page.title_en = "Two"
+    page.save()
+    page.title_en = "Three"
+    page.title_it = "Tre"
+    page.save()
+    assert not hasattr(page.url_node, "_previous_permalinks")
+    redirects = {
+        (r.language_code, r.from_url): r.to_url for r in UrlRedirect.objects.all()
+    }
+    assert redirects == {
+        ("en", "/one"): "/three",
+        ("en", "/two"): "/three",
+        ("it", "/uno"): "/tre",
+    }
+    # Moving back onto an old permalink drops the redirect shadowing it.
+    page.title_en = "One"
+    page.save()
+    assert UrlRedirect.find_redirect_from_url("/one") is None
+    assert UrlRedirect.find_redirect_from_url("/three").to_url == "/one"
+
+
+@pytest.mark.parametrize("native_upsert", [True, False])
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_renames_upsert_without_duplicates(monkeypatch, native_upsert):
+    # MySQL can't target the conflict; NULL languages never conflict.
+    monkeypatch.setattr(
+        connection.features, "supports_update_conflicts_with_target", native_upsert
+    )
+    node = _page(title="Target").url_node
+    other = _page(title="Other").url_node
+    for language in ("en", None):
+        _redirect("/old", "/elsewhere", other, language_code=language)
+        renamed = {language: ("/old", "/target")}
+        assert UrlRedirect.objects.redirect_renames_many({node: renamed}) == 1
+        assert UrlRedirect.objects.redirect_renames_many({node: renamed}) == 1
+        redirect = UrlRedirect.objects.get(from_url="/old", language_code=language)
+        assert (redirect.to_url, redirect.url_node) == ("/target", node)
+    assert UrlRedirect.objects.count() == 2
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_flatten_chains_and_cycles():
+    node = _page(title="Target").url_node
+    _redirect("/a", "/b", node)
+    _redirect("/b/", "/c", node)
+    _redirect("/c", "/target", node)
+    _redirect("/x", "/y", node)
+    _redirect("/y", "/x/", node)
+    _redirect("/into-loop", "/x", node)
+    _redirect("/a", "/elsewhere", node, language_code="it")
+
+    report = UrlRedirect.objects.flatten_chains()
+    assert report.flattened == 2
+    assert report.cycles == [("en", ["/x", "/y"])]
+    assert report.broken == 0
+    redirects = {
+        (r.language_code, r.from_url): r.to_url for r in UrlRedirect.objects.all()
+    }
+    assert redirects[("en", "/a")] == "/target"
+    assert redirects[("en", "/b/")] == "/target"
+    assert redirects[("en", "/into-loop")] == "/x"
+    assert redirects[("it", "/a")] == "/elsewhere"
+
+    report = UrlRedirect.objects.flatten_chains(break_cycles=True)
+    assert report.flattened == 0 and report.broken == 2
+    assert not UrlRedirect.objects.filter(from_url__in=["/x", "/y"]).exists()
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_deduplicate_trailing_slashes():
+    node = _page(title="Target").url_node
+    _redirect("/old/", "/first", node)
+    _redirect("/old", "/second", node)
+    _redirect("/lonely/", "/target", node)
+    assert UrlRedirect.objects.deduplicate() == 1
+    redirects = {r.from_url: r.to_url for r in UrlRedirect.objects.all()}
+    assert redirects == {"/old": "/second", "/lonely": "/target"}
+    activate("en")
+    assert UrlRedirect.find_redirect_from_url("/lonely/").to_url == "/target"
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_hits_are_buffered_and_feed_pruning():
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from camomilla.routing import redirect_hits
+
+    redirect_hits.flush()
+    node = _page(title="Target").url_node
+    used = _redirect("/used", "/target", node)
+    unused = _redirect("/unused", "/target", node)
+    _redirect("/recent", "/target", node)
+    UrlRedirect.objects.filter(pk__in=[used.pk, unused.pk]).update(
+        date_created=timezone.now() - timedelta(days=400)
+    )
+    activate("en")
+    with CaptureQueriesContext(connection) as ctx:
+        for __ in range(3):
+            UrlRedirect.find_redirect_from_url("/used").redirect()
+    assert not [q for q in ctx.captured_queries if "UPDATE" in q["sql"]]
+    assert redirect_hits.flush() == 3
+    used.refresh_from_db()
+    assert used.hits == 3 and used.last_hit_at is not None
+
+    call_command("camomilla_redirects", "--prune", "--dry-run")
+    assert UrlRedirect.objects.count() == 3
+    call_command("camomilla_redirects", "--prune", "--retention-days", "365")
+    assert set(UrlRedirect.objects.values_list("from_url", flat=True)) == {
+        "/used",
+        "/recent",
+    }
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_hits_flush_in_batches(monkeypatch):
+    from camomilla.routing import redirect_hits
+
+    redirect_hits.flush()
+    monkeypatch.setattr(camomilla_settings, "REDIRECTS_HITS_FLUSH_SIZE", 2)
+    node = _page(title="Target").url_node
+    first = _redirect("/first", "/target", node)
+    second = _redirect("/second", "/target", node)
+    redirect_hits.record(first.pk)
+    redirect_hits.record(first.pk)
+    assert len(redirect_hits) == 1
+    redirect_hits.record(second.pk)
+    assert len(redirect_hits) == 0
+    assert dict(UrlRedirect.objects.values_list("from_url", "hits")) == {
+        "/first": 2,
+        "/second": 1,
+    }
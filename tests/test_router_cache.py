@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+from rest_framework.test import APIClient
+
+from camomilla import settings
+from camomilla.models import Content, Page
+from camomilla.routing import route_table
+from camomilla.tagged_cache import tag_version_timeout, tagged_cache
+
+client = APIClient()
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+    route_table.invalidate()
+
+
+@pytest.fixture
+def page(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return Page.objects.create(
+            title_en="Tagged", published_at=timezone.now() - timedelta(days=1)
+        )
+
+
+def _get(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.get("/api/camomilla/pages-router/tagged/")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_router_payloads_are_cached_until_a_dependency_changes(
+    page, django_capture_on_commit_callbacks
+):
+    assert _get(django_capture_on_commit_callbacks)["title"] == "Tagged"
+    with CaptureQueriesContext(connection) as ctx:
+        assert _get(django_capture_on_commit_callbacks)["title"] == "Tagged"
+    assert len(ctx) == 0
+
+    # A new content block invalidates the page it belongs to.
+    with django_capture_on_commit_callbacks(execute=True):
+        content = Content.objects.create(
+            identifier="hero",
+            content="Hello",
+            content_type=ContentType.objects.get_for_model(Page),
+            object_id=page.pk,
+        )
+    assert _get(django_capture_on_commit_callbacks)["contents"]["hero"]["content"] == "Hello"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        content.content = "Hi"
+        content.save()
+    assert _get(django_capture_on_commit_callbacks)["contents"]["hero"]["content"] == "Hi"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        page.description_en = "Fresh"
+        page.save()
+    assert _get(django_capture_on_commit_callbacks)["description"] == "Fresh"
+
+
+@pytest.mark.django_db
+def test_unrelated_changes_keep_the_entry(page, django_capture_on_commit_callbacks):
+    _get(django_capture_on_commit_callbacks)
+    with django_capture_on_commit_callbacks(execute=True):
+        Page.objects.create(title_en="Elsewhere", published_at=timezone.now())
+    with CaptureQueriesContext(connection) as ctx:
+        _get(django_capture_on_commit_callbacks)
+    # Only the next lifecycle transition is recomputed, the page isn't read.
+    assert not any('"camomilla_page"' in query["sql"] for query in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_only_tracked_models_queue_bumps(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks() as callbacks:
+        with transaction.atomic():
+            User.objects.create(username="untracked")
+            assert not tagged_cache.in_uncommitted_change()
+            Page.objects.create(title_en="Tracked")
+            assert tagged_cache.in_uncommitted_change()
+    assert callbacks
+
+
+@pytest.mark.django_db
+def test_tags_of_a_transaction_are_bumped_in_one_batch(
+    page, monkeypatch, django_capture_on_commit_callbacks
+):
+    batches = []
+    monkeypatch.setattr(
+        "camomilla.tagged_cache.bump_versions",
+        lambda namespaces, timeout: batches.append((set(namespaces), timeout)),
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            content = Content.objects.create(
+                identifier="hero",
+                content_type=ContentType.objects.get_for_model(Page),
+                object_id=page.pk,
+            )
+            page.description_en = "Batched"
+            page.save()
+    assert len(batches) == 1
+    namespaces, timeout = batches[0]
+    assert "tag:camomilla.page:%s" % page.pk in namespaces
+    assert "tag:camomilla.content:%s" % content.pk in namespaces
+    # Versions outlive the entries built from them, but do expire.
+    assert timeout == tag_version_timeout()
+    assert timeout > settings.PAGE_ROUTER_CACHE
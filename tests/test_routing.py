@@ -0,0 +1,154 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+from rest_framework.test import APIClient
+
+from camomilla import settings
+from camomilla.models import Page
+from camomilla.routing import resolve_url_node, route_table
+from camomilla.routing.base import NOT_BUILT, indexes_enabled
+
+DUMMY_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+SHARED_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "t",
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_route_table():
+    route_table.invalidate()
+    yield
+    route_table.invalidate()
+
+
+def _public_page(**kwargs):
+    return Page.objects.create(published_at=timezone.now(), **kwargs)
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_route_table_miss_costs_no_query():
+    _public_page(title="About")
+    route_table.refresh()
+    activate("en")
+    with CaptureQueriesContext(connection) as ctx:
+        assert resolve_url_node("/missing") is None
+    assert len(ctx.captured_queries) == 0
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_route_table_hit_costs_one_query():
+    page = _public_page(title="About")
+    route_table.refresh()
+    activate("en")
+    with CaptureQueriesContext(connection) as ctx:
+        node = resolve_url_node("/about")
+        assert node.page == page
+        assert node.page.is_public
+    assert len(ctx.captured_queries) == 1
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_route_table_is_per_language():
+    page = Page.objects.create(title_en="About", title_it="Chi siamo")
+    activate("it")
+    assert resolve_url_node("/chi-siamo").page == page
+    assert resolve_url_node("/about") is None
+    activate("en")
+    assert resolve_url_node("/about").page == page
+    entry = route_table.lookup("/about")
+    assert entry.page_id == page.pk
+    assert entry.related_name == "camomilla_page"
+    assert entry.is_public is False
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_route_table_follows_renames_and_deletes():
+    activate("en")
+    page = _public_page(title="About")
+    assert resolve_url_node("/about") is not None
+    generation = route_table._generation
+
+    page.title = "About us"
+    page.save()
+    assert resolve_url_node("/about") is None
+    assert resolve_url_node("/about-us").page == page
+    # Refreshed incrementally from the changelog, not rebuilt.
+    assert route_table._generation > generation
+
+    page.delete()
+    assert resolve_url_node("/about-us") is None
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_stale_route_falls_back_to_database():
+    activate("en")
+    page = _public_page(title="About")
+    assert resolve_url_node("/about") is not None
+    # Bypass signals: the table still routes /about to the page.
+    Page.objects.filter(pk=page.pk).update(url_node=None)
+    node = resolve_url_node("/about")
+    assert node is not None and node.pk == page.url_node_id
+    assert route_table._generation is NOT_BUILT
+    # The next lookup rebuilds and skips the now orphan node.
+    assert resolve_url_node("/about") is None
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_pages_router_uses_route_table():
+    _public_page(title="About")
+    client = APIClient()
+    response = client.get("/api/camomilla/pages-router/about/")
+    assert response.status_code == 200
+    assert response.json()["id"] == 1
+    assert client.get("/api/camomilla/pages-router/nope/").status_code == 404
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_route_table_reads_own_uncommitted_writes():
+    from django.db import transaction
+
+    activate("en")
+    route_table.refresh()
+    with transaction.atomic():
+        page = _public_page(title="Fresh")
+        assert resolve_url_node("/fresh").page == page
+    with CaptureQueriesContext(connection) as ctx:
+        assert resolve_url_node("/missing") is None
+    # Committed: back on the table, which reloaded the node.
+    assert len(ctx.captured_queries) == 2
+    assert resolve_url_node("/fresh").page == page
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+@override_settings(CACHES=DUMMY_CACHE)
+def test_route_table_without_counters_queries_the_database(monkeypatch):
+    # DummyCache keeps no generation: the table can't tell it is stale.
+    monkeypatch.setattr(settings, "ROUTE_TABLE_ENABLE", True)
+    assert not indexes_enabled()
+    activate("en")
+    page = _public_page(title="About")
+    assert route_table.refresh() is False
+    assert resolve_url_node("/about").page == page
+    assert resolve_url_node("/missing") is None
+    assert route_table._generation is NOT_BUILT
+    client = APIClient()
+    assert client.get("/api/camomilla/pages-router/about/").status_code == 200
+    assert client.get("/about/").status_code == 200
+
+
+def test_route_table_needs_a_shared_cache_by_default(monkeypatch):
+    monkeypatch.setattr(settings, "ROUTE_TABLE_ENABLE", None)
+    assert not indexes_enabled()
+    with override_settings(CACHES=SHARED_CACHE):
+        assert indexes_enabled()
+    monkeypatch.setattr(settings, "ROUTE_TABLE_ENABLE", True)
+    assert indexes_enabled()
+    monkeypatch.setattr(settings, "ROUTE_TABLE_ENABLE", False)
+    with override_settings(CACHES=SHARED_CACHE):
+        assert not indexes_enabled()
@@ -0,0 +1,104 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client
+from django.utils.translation import activate
+
+from camomilla.models import (
+    Article,
+    Draft,
+    Media,
+    MediaFolder,
+    Menu,
+    Page,
+    UrlNode,
+    UrlRedirect,
+)
+from camomilla.tree import stale_tree_paths
+from example.website.models import CustomPageMetaModel
+
+
+def _seed(**options):
+    defaults = {
+        "pages": 60,
+        "depth": 4,
+        "articles": 20,
+        "custom_pages": 5,
+        "drafts": 6,
+        "scheduled_drafts": 4,
+        "redirects": 10,
+        "menu_nodes": 30,
+        "tags": 5,
+        "media": 2,
+        "stdout": StringIO(),
+    }
+    call_command("seed_scale", **{**defaults, **options})
+
+
+@pytest.fixture
+def media_cleanup():
+    yield
+    # Deleting the rows removes their files.
+    for media in Media.objects.all():
+        media.delete()
+    MediaFolder.objects.all().delete()
+
+
+@pytest.mark.django_db
+def test_seed_scale_builds_consistent_trees(media_cleanup):
+    _seed()
+    assert Page.objects.count() == 60
+    assert Article.objects.count() == 20
+    assert (
+        CustomPageMetaModel.objects.filter(custom_parent_page__isnull=False).count()
+        == 5
+    )
+    deepest = max(UrlNode.objects.all(), key=lambda node: node.tree_path.count("/"))
+    assert deepest.tree_path.count("/") - 1 == 4
+    assert stale_tree_paths() == []
+    assert UrlNode.objects.out_of_sync() == []
+    assert Draft.objects.pending().count() == 6
+    assert Draft.objects.scheduled().count() == 4
+    assert UrlRedirect.objects.count() == 10
+    assert Media.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_seed_scale_pages_are_routable(media_cleanup):
+    _seed()
+    client = Client()
+    activate("en")
+    page = (
+        Page.objects.public()
+        .filter(url_node__tree_path__regex=r"^/\d+/\d+/\d+/\d+/$")
+        .first()
+    )
+    response = client.get(f"/api/camomilla/pages-router{page.permalink}/")
+    assert response.status_code == 200
+    assert len(response.json()["breadcrumbs"]) == 4
+    redirect = UrlRedirect.objects.filter(language_code="en").first()
+    response = client.get(f"/api/camomilla/pages-router{redirect.from_url}")
+    assert response.json()["redirect"] == redirect.to_url + "/"
+    response = client.get("/api/camomilla/menus-router/scale-main")
+    assert response.status_code == 200
+    menu = Menu.objects.get(key="scale-main")
+    assert len(menu.nodes) == 8
+
+
+@pytest.mark.django_db
+def test_seed_scale_refuses_an_existing_prefix(media_cleanup):
+    _seed(pages=3, depth=2, articles=0, custom_pages=0, media=0, menu_nodes=0)
+    with pytest.raises(CommandError):
+        _seed(pages=3, depth=2)
+    _seed(
+        pages=3,
+        depth=2,
+        articles=0,
+        custom_pages=0,
+        media=0,
+        menu_nodes=0,
+        prefix="other",
+    )
+    assert Page.objects.count() == 6
@@ -0,0 +1,45 @@
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from django.utils.translation import activate
+
+from camomilla.models import Page
+from camomilla.serializers.page import RouteSerializer
+from camomilla.serializers.utils import (
+    _built_fields,
+    build_standard_model_serializer,
+    get_editable_bases,
+    get_standard_bases,
+)
+
+
+def test_generated_serializers_are_memoized():
+    first = build_standard_model_serializer(Page, depth=10)
+    assert build_standard_model_serializer(Page, depth=10) is first
+    assert build_standard_model_serializer(Page, depth=2) is not first
+    draft = build_standard_model_serializer(
+        Page, bases=get_editable_bases(Page.get_serializer()), name_suffix="Draft"
+    )
+    assert draft is not first
+    assert draft.__name__ == "PageDraftSerializer"
+
+
+def test_registry_is_cleared_when_settings_change():
+    first = build_standard_model_serializer(Page, depth=10)
+    with override_settings(CAMOMILLA_REGISTRY_PROBE=True):
+        assert build_standard_model_serializer(Page, depth=10) is not first
+
+
+@pytest.mark.django_db
+def test_cached_fields_serialize_like_fresh_ones():
+    activate("en")
+    page = Page.objects.create(title_en="Registry", published_at=timezone.now())
+    serializer = build_standard_model_serializer(
+        Page, depth=10, bases=(Page.get_serializer(),) + get_standard_bases()
+    )
+    fresh = serializer(page).data
+    assert any(key[0] is serializer for key in _built_fields)
+    assert serializer(page).data == fresh
+    assert RouteSerializer(page.url_node).data == RouteSerializer(page.url_node).data
+    # Every instance still gets its own field objects.
+    assert serializer(page).fields["title"] is not serializer(page).fields["title"]
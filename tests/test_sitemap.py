@@ -15,8 +15,155 @@ def test_sitemap_xml_contains_pages():
     )
 
     client = Client()
-    response = client.get(reverse("django.contrib.sitemaps.views.sitemap"))
+    response = client.get(reverse("camomilla-sitemap"))
     assert response.status_code == 200
-    assert b"<urlset" in response.content
-    assert b"/test-page-1" in response.content
-    assert b"/test-page-2" in response.content
+    content = b"".join(response.streaming_content)
+    assert b"<urlset" in content
+    assert b"/test-page-1" in content
+    assert b"/test-page-2" in content
+
+
+def _sitemap(client, url="/sitemap.xml"):
+    response = client.get(url)
+    assert response.status_code == 200
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_sitemap_lists_public_languages_with_alternates():
+    now = timezone.now()
+    Page.objects.create(
+        title_en="About", title_it="Chi siamo", published_at_en=now, published_at_it=now
+    )
+    Page.objects.create(title_en="Only en", published_at_en=now)
+    Page.objects.create(title_en="Hidden", published_at_en=now, indexable=False)
+    Page.objects.create(title_en="Draft")
+    content = _sitemap(Client())
+    assert content.count("<url>") == 3
+    assert "<loc>http://testserver/about/</loc>" in content
+    assert "<loc>http://testserver/it/chi-siamo/</loc>" in content
+    assert 'hreflang="it" href="http://testserver/it/chi-siamo/"' in content
+    assert 'hreflang="x-default" href="http://testserver/about/"' in content
+    assert "<loc>http://testserver/only-en/</loc><lastmod>" in content
+    assert "hidden" not in content and "draft" not in content
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_sitemap_queries_do_not_grow_with_pages():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for index in range(10):
+        Page.objects.create(title=f"Page {index}", published_at=timezone.now())
+    client = Client()
+    with CaptureQueriesContext(connection) as ctx:
+        content = _sitemap(client)
+    assert content.count("<url>") == 10
+    # Shard count, then the node rows: no page is loaded.
+    assert len(ctx.captured_queries) == 2
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_sitemap_shards_into_an_index(monkeypatch):
+    from camomilla import settings
+
+    # Two languages: one node per shard.
+    monkeypatch.setattr(settings, "SITEMAP_SHARD_SIZE", 2)
+    for title in ("One", "Two", "Three"):
+        Page.objects.create(title=title, published_at=timezone.now())
+    client = Client()
+    index = _sitemap(client)
+    assert "<sitemapindex" in index
+    assert "<loc>http://testserver/sitemap-3.xml</loc>" in index
+    shard = _sitemap(client, "/sitemap-2.xml")
+    assert "/two/" in shard and "/one/" not in shard and "/three/" not in shard
+    assert client.get("/sitemap-4.xml").status_code == 404
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_sitemap_command_only_rewrites_changed_shards(monkeypatch, tmp_path):
+    import gzip
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    from camomilla import settings
+
+    monkeypatch.setattr(settings, "SITEMAP_SHARD_SIZE", 2)
+    pages = [
+        Page.objects.create(title=title, published_at=timezone.now())
+        for title in ("One", "Two", "Three")
+    ]
+
+    def run():
+        out = StringIO()
+        call_command(
+            "camomilla_sitemap", output=str(tmp_path), base_url="https://example.com", stdout=out
+        )
+        return out.getvalue()
+
+    assert "3 shards, 3 written" in run()
+    index = (tmp_path / "sitemap.xml").read_text()
+    assert "<loc>https://example.com/sitemap-2.xml.gz</loc>" in index
+    with gzip.open(tmp_path / "sitemap-1.xml.gz") as shard:
+        assert b"<loc>https://example.com/one/</loc>" in shard.read()
+    assert "0 written, 3 unchanged" in run()
+
+    pages[1].title = "Second"
+    pages[1].save()
+    assert "1 written, 2 unchanged" in run()
+    with gzip.open(tmp_path / "sitemap-2.xml.gz") as shard:
+        assert b"/second/" in shard.read()
+
+    pages[2].trash()
+    assert "2 shards, 0 written, 2 unchanged, 1 removed" in run()
+    assert not (tmp_path / "sitemap-3.xml.gz").exists()
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_sitemap_shards_reuse_the_bounds_of_the_index(monkeypatch):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from camomilla import settings
+
+    monkeypatch.setattr(settings, "SITEMAP_SHARD_SIZE", 2)
+    for title in ("One", "Two", "Three", "Four"):
+        Page.objects.create(title=title, published_at=timezone.now())
+    client = Client()
+    _sitemap(client)
+    with CaptureQueriesContext(connection) as ctx:
+        shard = _sitemap(client, "/sitemap-4.xml")
+    assert "/four/" in shard and "/three/" not in shard
+    # Only the node rows: the bounds aren't walked again, nor offset.
+    assert len(ctx.captured_queries) == 1
+    assert "OFFSET" not in ctx.captured_queries[0]["sql"]
+
+    # A new node is picked up.
+    Page.objects.create(title="Five", published_at=timezone.now())
+    assert "/five/" in _sitemap(client, "/sitemap-5.xml")
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_sitemap_command_rewrites_shards_when_page_hooks_change(monkeypatch, tmp_path):
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    from camomilla import settings
+
+    monkeypatch.setattr(settings, "SITEMAP_SHARD_SIZE", 2)
+    for title in ("One", "Two"):
+        Page.objects.create(title=title, published_at=timezone.now())
+
+    def run():
+        out = StringIO()
+        call_command(
+            "camomilla_sitemap", output=str(tmp_path), base_url="https://example.com", stdout=out
+        )
+        return out.getvalue()
+
+    assert "2 shards, 2 written" in run()
+    monkeypatch.setattr(Page, "priority", 0.9, raising=False)
+    assert "2 shards, 2 written" in run()
+    assert "0 written, 2 unchanged" in run()
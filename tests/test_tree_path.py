@@ -0,0 +1,137 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import activate
+
+from camomilla.models import Page, UrlNode
+from camomilla.routing import route_table
+from camomilla.tree import move_subtree, stale_tree_paths
+from example.website.models import CustomPageMetaModel
+
+
+@pytest.fixture(autouse=True)
+def english():
+    activate("en")
+    route_table.invalidate()
+    yield
+    route_table.invalidate()
+
+
+def _path(page):
+    return UrlNode._base_manager.get(pk=page.url_node_id).tree_path
+
+
+def _chain(depth, prefix="Level"):
+    pages = [Page.objects.create(title_en=f"{prefix} 0")]
+    for index in range(1, depth):
+        pages.append(
+            Page.objects.create(title_en=f"{prefix} {index}", parent_page=pages[-1])
+        )
+    return pages
+
+
+@pytest.mark.django_db
+def test_tree_path_follows_parents_across_models():
+    root = Page.objects.create(title_en="Root")
+    custom = CustomPageMetaModel.objects.create(title="Custom", custom_parent_page=root)
+    assert _path(root) == f"/{root.url_node_id}/"
+    assert _path(custom) == f"/{root.url_node_id}/{custom.url_node_id}/"
+
+
+@pytest.mark.django_db
+def test_moving_a_page_moves_its_subtree_paths():
+    root, child, grandkid = _chain(3)
+    other = Page.objects.create(title_en="Other")
+    move_subtree(child, other)
+    assert _path(grandkid) == (
+        f"/{other.url_node_id}/{child.url_node_id}/{grandkid.url_node_id}/"
+    )
+    child.parent_page = None
+    child.save()
+    assert _path(grandkid) == f"/{child.url_node_id}/{grandkid.url_node_id}/"
+
+
+@pytest.mark.django_db
+def test_subtree_moved_too_deep_loses_its_paths(monkeypatch):
+    root, child, grandkid = _chain(3)
+    deep = _chain(4, "Deep")
+    expected = _path(deep[-1]) + f"{child.url_node_id}/"
+    # Postgres and MySQL would reject the overflowing rewrite.
+    monkeypatch.setattr(
+        UrlNode._meta.get_field("tree_path"), "max_length", len(expected)
+    )
+    child.parent_page = deep[-1]
+    child.save()
+    assert _path(child) == expected
+    assert _path(grandkid) == ""
+    assert stale_tree_paths() == []
+    child.parent_page = None
+    child.save()
+    # Unknown paths aren't moved back: rebuilding restores them.
+    call_command("camomilla_rebuild_tree")
+    assert _path(grandkid) == f"/{child.url_node_id}/{grandkid.url_node_id}/"
+
+
+@pytest.mark.django_db
+def test_breadcrumbs_queries_do_not_grow_with_depth():
+    def breadcrumbs(depth):
+        leaf = Page.objects.get(pk=_chain(depth, f"Depth {depth}")[-1].pk)
+        with CaptureQueriesContext(connection) as ctx:
+            crumbs = leaf.breadcrumbs
+        assert [crumb["title"] for crumb in crumbs] == [
+            f"Depth {depth} {index}" for index in range(depth)
+        ]
+        return len(ctx)
+
+    assert breadcrumbs(2) == breadcrumbs(6)
+
+
+@pytest.mark.django_db
+def test_subtree_filters():
+    root, child, grandkid = _chain(3)
+    sibling = Page.objects.create(title_en="Sibling", parent_page=root)
+    Page.objects.create(title_en="Elsewhere")
+    assert set(Page.objects.descendants_of(root)) == {child, grandkid, sibling}
+    assert Page.objects.descendants_of(child, include_self=True).count() == 2
+    assert list(Page.objects.ancestors_of(grandkid).order_by("pk")) == [root, child]
+    node = UrlNode._base_manager.get(pk=child.url_node_id)
+    assert set(UrlNode.objects.descendants_of(node).values_list("pk", flat=True)) == {
+        grandkid.url_node_id
+    }
+    assert list(UrlNode.objects.ancestors_of(node).values_list("pk", flat=True)) == [
+        root.url_node_id
+    ]
+
+
+@pytest.mark.django_db
+def test_deleting_a_parent_detaches_set_null_children():
+    root, parent = _chain(2)
+    custom = CustomPageMetaModel.objects.create(
+        title="Custom", custom_parent_page=parent
+    )
+    parent.delete()
+    assert _path(root) == f"/{root.url_node_id}/"
+    assert _path(custom) == f"/{custom.url_node_id}/"
+    assert stale_tree_paths() == []
+
+
+@pytest.mark.django_db
+def test_rebuild_tree_command():
+    root, child, grandkid = _chain(3)
+    UrlNode._base_manager.update(tree_path="")
+    with pytest.raises(CommandError):
+        call_command("camomilla_rebuild_tree", verify=True)
+    # Unknown paths: breadcrumbs fall back to walking the parents.
+    leaf = Page.objects.get(pk=grandkid.pk)
+    assert [crumb["title"] for crumb in leaf.breadcrumbs] == [
+        "Level 0",
+        "Level 1",
+        "Level 2",
+    ]
+    call_command("camomilla_rebuild_tree")
+    call_command("camomilla_rebuild_tree", verify=True)
+    assert _path(grandkid) == (
+        f"/{root.url_node_id}/{child.url_node_id}/{grandkid.url_node_id}/"
+    )
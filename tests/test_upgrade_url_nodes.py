@@ -0,0 +1,95 @@
+"""Tests for the upgrades backfilling the columns denormalized on ``UrlNode``.
+
+The operations run against the live app registry here: its models carry the
+same columns the historical ones have once the ``AddField`` ops ran.
+"""
+
+import pytest
+from django.apps import apps
+from django.db import migrations, models
+from django.utils import timezone
+
+from camomilla.models import Article, Page, UrlNode
+from camomilla.tree import stale_tree_paths
+from camomilla.upgrades.injection import inject_upgrade_operations
+from camomilla.upgrades.migrations import (
+    BackfillUrlNodeTreePaths,
+    BackfillUrlNodeVisibility,
+)
+from example.website.models import CustomPageMetaModel
+
+
+@pytest.mark.django_db
+def test_visibility_backfill_copies_every_page_model():
+    live = Page.objects.create(title_en="Live", published_at=timezone.now())
+    trashed = Page.objects.create(title_en="Trashed", published_at=timezone.now())
+    trashed.trash()
+    Article.objects.create(title_en="Article", published_at_it=timezone.now())
+    # An install that predates the columns: they exist, empty.
+    UrlNode.objects.update(
+        published_at=None,
+        published_at_en=None,
+        published_at_it=None,
+        indexable=None,
+        indexable_en=None,
+        indexable_it=None,
+        deleted_at=None,
+        date_updated_at=None,
+    )
+    assert len(UrlNode.objects.out_of_sync()) == 3
+    assert not UrlNode.objects.public().exists()
+
+    BackfillUrlNodeVisibility().run(apps, None, "camomilla")
+
+    assert UrlNode.objects.out_of_sync() == []
+    assert list(UrlNode.objects.public().values_list("pk", flat=True)) == [
+        live.url_node_id
+    ]
+
+
+def test_visibility_backfill_is_injected_after_the_new_columns():
+    m = migrations.Migration("0003_urlnode_visibility", "camomilla")
+    m.operations = [
+        migrations.AddField("urlnode", "published_at", models.DateTimeField(null=True)),
+        migrations.AddField("urlnode", "indexable_en", models.BooleanField(null=True)),
+        migrations.AlterField("page", "title", models.CharField(max_length=10)),
+    ]
+    assert inject_upgrade_operations(m) == ["BackfillUrlNodeVisibility"]
+    assert isinstance(m.operations[-1], BackfillUrlNodeVisibility)
+    assert inject_upgrade_operations(m) == []
+
+    unrelated = migrations.Migration("0004_other", "camomilla")
+    unrelated.operations = [
+        migrations.AddField("page", "published_at", models.DateTimeField(null=True))
+    ]
+    assert inject_upgrade_operations(unrelated) == []
+
+
+@pytest.mark.django_db
+def test_tree_path_backfill_follows_parents_across_models():
+    root = Page.objects.create(title_en="Root")
+    child = Page.objects.create(title_en="Child", parent_page=root)
+    custom = CustomPageMetaModel.objects.create(
+        title="Custom", custom_parent_page=child
+    )
+    UrlNode.objects.update(tree_path="")
+    assert len(stale_tree_paths()) == 3
+
+    BackfillUrlNodeTreePaths().run(apps, None, "camomilla")
+
+    assert stale_tree_paths() == []
+    assert UrlNode.objects.get(pk=custom.url_node_id).tree_path == (
+        f"/{root.url_node_id}/{child.url_node_id}/{custom.url_node_id}/"
+    )
+
+
+def test_tree_path_backfill_is_injected_after_the_column():
+    m = migrations.Migration("0004_urlnode_tree_path", "camomilla")
+    m.operations = [
+        migrations.AddField(
+            "urlnode", "tree_path", models.CharField(max_length=255, default="")
+        ),
+    ]
+    assert inject_upgrade_operations(m) == ["BackfillUrlNodeTreePaths"]
+    assert isinstance(m.operations[-1], BackfillUrlNodeTreePaths)
+    assert inject_upgrade_operations(m) == []
@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from camomilla.managers import prefetch_pages
+from camomilla.models import Article, Menu, Page, UrlNode
+
+
+def _pages(count):
+    for index in range(count):
+        Page.objects.create(title=f"Page {index}", published_at=timezone.now())
+        Article.objects.create(title=f"Article {index}", published_at=timezone.now())
+
+
+@pytest.mark.django_db
+def test_with_pages_loads_one_query_per_page_model():
+    _pages(3)
+    with CaptureQueriesContext(connection) as ctx:
+        nodes = list(UrlNode.objects.with_pages())
+        pages = [node.page for node in nodes]
+        assert all(page.url_node is node for page, node in zip(pages, nodes))
+    # Nodes, then one IN query for pages and one for articles.
+    assert len(ctx.captured_queries) == 3
+    assert {type(page) for page in pages} == {Page, Article}
+    assert [page.url_node_id for page in pages] == [node.pk for node in nodes]
+
+
+@pytest.mark.django_db
+def test_prefetch_pages_on_a_list():
+    _pages(2)
+    nodes = list(UrlNode.objects.all())
+    with CaptureQueriesContext(connection) as ctx:
+        assert prefetch_pages(nodes) == nodes
+        for node in nodes:
+            node.page
+    assert len(ctx.captured_queries) == 2
+    with CaptureQueriesContext(connection) as ctx:
+        prefetch_pages(nodes)
+    assert len(ctx.captured_queries) == 0
+
+
+@pytest.mark.django_db
+def test_sitemap_queries_do_not_grow_with_pages(django_capture_on_commit_callbacks):
+    client = Client()
+    url = reverse("camomilla-sitemap")
+    # Committed node changes drop the stored shard bounds.
+    with django_capture_on_commit_callbacks(execute=True):
+        _pages(1)
+    with CaptureQueriesContext(connection) as small:
+        b"".join(client.get(url).streaming_content)
+    with django_capture_on_commit_callbacks(execute=True):
+        _pages(5)
+    with CaptureQueriesContext(connection) as large:
+        content = b"".join(client.get(url).streaming_content)
+    assert b"/article-5" not in content and b"/article-4" in content
+    assert len(large.captured_queries) == len(small.captured_queries)
+
+
+@pytest.mark.django_db
+def test_menu_links_hydrate_pages_in_batch():
+    def menu_with_links(key, count):
+        nodes = [
+            {
+                "title": f"Link {index}",
+                "link": {"link_type": "RE", "url_node": page.url_node_id},
+            }
+            for index, page in enumerate(Page.objects.all()[:count])
+        ]
+        Menu.objects.create(key=key, nodes=nodes)
+
+    _pages(6)
+    menu_with_links("small", 1)
+    menu_with_links("large", 6)
+    counts = {}
+    for key in ("small", "large"):
+        with CaptureQueriesContext(connection) as ctx:
+            links = [node.link for node in Menu.objects.get(key=key).nodes]
+            assert all(isinstance(link.page, Page) for link in links)
+        counts[key] = len(ctx.captured_queries)
+    assert counts["large"] == counts["small"]
@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import activate
+
+from camomilla.models import Page, UrlNode
+
+
+@pytest.mark.django_db
+def test_visibility_is_mirrored_on_save_publish_and_trash():
+    page = Page.objects.create(title_en="About", title_it="Chi siamo")
+    node = UrlNode.objects.get(pk=page.url_node_id)
+    assert node.published_at_en is None and node.published_at_it is None
+    assert node.deleted_at is None
+    assert node.date_updated_at == page.date_updated_at
+
+    activate("it")
+    page.publish()
+    node = UrlNode.objects.get(pk=page.url_node_id)
+    assert node.published_at_it == page.published_at_it
+    assert node.published_at_en is None
+    assert node.status == "PUB" and node.is_public
+    activate("en")
+    node = UrlNode.objects.get(pk=page.url_node_id)
+    assert node.status == "DRF" and not node.is_public
+
+    page.trash()
+    node = UrlNode.objects.get(pk=page.url_node_id)
+    assert node.deleted_at == page.deleted_at
+    assert node.status == "TRS"
+    page.restore()
+    assert UrlNode.objects.get(pk=page.url_node_id).deleted_at is None
+
+
+@pytest.mark.django_db
+def test_public_nodes_need_no_join():
+    public = Page.objects.create(title="Public", published_at=timezone.now())
+    Page.objects.create(title="Draft")
+    Page.objects.create(title="Trashed", published_at=timezone.now()).trash()
+    activate("en")
+    with CaptureQueriesContext(connection) as ctx:
+        nodes = list(UrlNode.objects.public())
+    assert [node.pk for node in nodes] == [public.url_node_id]
+    assert "JOIN" not in ctx.captured_queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_sync_url_nodes_command():
+    page = Page.objects.create(title="About")
+    now = timezone.now()
+    # Bypasses ``save``: the node doesn't know.
+    Page.objects.filter(pk=page.pk).update(published_at_en=now, indexable_en=False)
+    with pytest.raises(CommandError, match="1 url nodes out of sync"):
+        call_command("camomilla_sync_url_nodes", "--verify")
+    call_command("camomilla_sync_url_nodes")
+    call_command("camomilla_sync_url_nodes", "--verify")
+    node = UrlNode.objects.get(pk=page.url_node_id)
+    assert node.published_at_en == now
+    assert node.indexable_en is False